@@ -0,0 +1,64 @@
+"""比較完整解碼與縮小解碼（PIL draft）計算 pHash 的耗時與 hash 偏差。
+
+用法：
+    python benchmarks/bench_phash_decode.py --dir /volume1/photo/2024 --limit 200 --draft-size 128
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from syno_photo_tidy.utils import image_utils  # noqa: E402
+from syno_photo_tidy.utils.hamming_index import hamming_distance  # noqa: E402
+
+JPEG_EXTENSIONS = {".jpg", ".jpeg"}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, required=True, help="含 JPEG 的相片資料夾")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--draft-size", type=int, default=128)
+    args = parser.parse_args()
+
+    paths = sorted(path for path in args.dir.rglob("*") if path.suffix.lower() in JPEG_EXTENSIONS)[: args.limit]
+    if not paths:
+        print("找不到 JPEG 檔案。")
+        return 1
+
+    timings = {None: 0.0, args.draft_size: 0.0}
+    values: dict[int | None, list[int | None]] = {None: [], args.draft_size: []}
+    for draft_size in timings:
+        started = time.perf_counter()
+        for path in paths:
+            value, _error = image_utils.compute_image_hash_value(str(path), draft_size)
+            values[draft_size].append(value)
+        timings[draft_size] = time.perf_counter() - started
+
+    distances = [
+        hamming_distance(full, draft)
+        for full, draft in zip(values[None], values[args.draft_size])
+        if full is not None and draft is not None
+    ]
+    print(f"檔案數: {len(paths)}")
+    print(f"完整解碼 耗時 {timings[None]:8.2f}s")
+    print(
+        f"縮小解碼 耗時 {timings[args.draft_size]:8.2f}s  "
+        f"加速 {timings[None] / max(timings[args.draft_size], 1e-9):5.1f}x"
+    )
+    if distances:
+        histogram: dict[int, int] = {}
+        for distance in distances:
+            histogram[distance] = histogram.get(distance, 0) + 1
+        print(f"Hamming 偏差 平均 {sum(distances) / len(distances):.2f}  最大 {max(distances)}")
+        print("分布: " + "  ".join(f"{distance}:{count}" for distance, count in sorted(histogram.items())))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,8 @@
+from multiprocessing import freeze_support
+
 from .main import main
 
 if __name__ == "__main__":
+    # pHash 使用 ProcessPoolExecutor；PyInstaller 打包的 exe 需要此呼叫
+    freeze_support()
     main()
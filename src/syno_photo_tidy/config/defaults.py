@@ -21,6 +21,12 @@ DEFAULT_CONFIG = {
         "algorithms": ["sha256", "md5"],
         "chunk_size_kb": 1024,
         "parallel_workers": 4,
+        "read_order": "default",
+        "verify_mode": "hash",
+    },
+    "io": {
+        "device_workers": {},
+        "page_cache_hints": False,
     },
     "file_ops": {
         "copy_chunk_size_kb": 1024,
@@ -29,6 +35,25 @@ DEFAULT_CONFIG = {
     },
     "phash": {
         "threshold": 8,
+        "engine": "numpy",
+        "block_size": 512,
+        "workers": 1,
+        "draft_decode": True,
+        "draft_size": 128,
+        "verify_sample": 0,
+        "source": "full",
+        "index_path": "",
+        "match_archive": False,
+        "candidate_strategy": "exhaustive",
+        "time_window_sec": 600,
+        "validate_strategy": False,
+        "cascade": False,
+        "prefilter_hash": "dhash",
+        "prefilter_threshold": 12,
+        "prefilter_draft_size": 32,
+        "confirm_hash": "phash",
+        "clustering": "greedy",
+        "max_diameter": 0,
     },
     "rename": {
         "enabled": True,
@@ -41,10 +66,18 @@ DEFAULT_CONFIG = {
         "unknown_folder": "unknown",
         "sequence_digits": 3,
     },
+    "plan": {
+        "fuse_moves": False,
+        "workers": 0,
+    },
+    "library": {
+        "index_path": "",
+    },
     "thumbnail": {
         "max_size_kb": 120,
         "max_dimension_px": 640,
         "min_dimension_px": 320,
+        "fast_classify": False,
     },
     "progress": {
         "ui_update_interval_ms": 250,
@@ -68,6 +68,8 @@ def validate_config(config: dict[str, Any]) -> list[str]:
     algorithms = hash_config.get("algorithms")
     chunk_size_kb = hash_config.get("chunk_size_kb")
     parallel_workers = hash_config.get("parallel_workers", 1)
+    read_order = hash_config.get("read_order", "default")
+    verify_mode = hash_config.get("verify_mode", "hash")
 
     if not isinstance(algorithms, list) or not algorithms:
         add_error("hash.algorithms", "必須是非空清單")
@@ -81,6 +83,21 @@ def validate_config(config: dict[str, Any]) -> list[str]:
         add_error("hash.chunk_size_kb", "必須是正整數")
     if not isinstance(parallel_workers, int) or parallel_workers <= 0:
         add_error("hash.parallel_workers", "必須是正整數")
+    if read_order not in {"default", "inode", "directory"}:
+        add_error("hash.read_order", "必須是 default、inode 或 directory")
+    if verify_mode not in {"hash", "bytes"}:
+        add_error("hash.verify_mode", "必須是 hash 或 bytes")
+
+    io_config = config.get("io", {})
+    device_workers = io_config.get("device_workers", {})
+    if not isinstance(device_workers, dict) or any(
+        not isinstance(key, str) or not isinstance(value, int) or value <= 0
+        for key, value in device_workers.items()
+    ):
+        add_error("io.device_workers", "必須是路徑對應正整數的字典")
+    page_cache_hints = io_config.get("page_cache_hints", False)
+    if not isinstance(page_cache_hints, bool):
+        add_error("io.page_cache_hints", "必須是布林值")
 
     file_ops = config.get("file_ops", {})
     copy_chunk_size_kb = file_ops.get("copy_chunk_size_kb", 1024)
@@ -99,6 +116,52 @@ def validate_config(config: dict[str, Any]) -> list[str]:
         add_error("phash.threshold", "必須是整數")
     elif not (0 <= threshold <= 16):
         add_error("phash.threshold", "必須介於 0 到 16")
+    if phash.get("engine", "numpy") not in {"numpy", "bktree"}:
+        add_error("phash.engine", "必須是 numpy 或 bktree")
+    block_size = phash.get("block_size", 512)
+    if not isinstance(block_size, int) or block_size <= 0:
+        add_error("phash.block_size", "必須是正整數")
+    phash_workers = phash.get("workers", 1)
+    if not isinstance(phash_workers, int) or phash_workers < 0:
+        add_error("phash.workers", "必須是非負整數")
+    if not isinstance(phash.get("draft_decode", True), bool):
+        add_error("phash.draft_decode", "必須是布林值")
+    draft_size = phash.get("draft_size", 128)
+    if not isinstance(draft_size, int) or draft_size < 32:
+        add_error("phash.draft_size", "必須是不小於 32 的整數")
+    verify_sample = phash.get("verify_sample", 0)
+    if not isinstance(verify_sample, int) or verify_sample < 0:
+        add_error("phash.verify_sample", "必須是非負整數")
+    if phash.get("source", "full") not in {"full", "exif_thumbnail"}:
+        add_error("phash.source", "必須是 full 或 exif_thumbnail")
+    if not isinstance(phash.get("index_path", ""), str):
+        add_error("phash.index_path", "必須是字串")
+    if not isinstance(phash.get("match_archive", False), bool):
+        add_error("phash.match_archive", "必須是布林值")
+    if phash.get("candidate_strategy", "exhaustive") not in {"exhaustive", "time_window"}:
+        add_error("phash.candidate_strategy", "必須是 exhaustive 或 time_window")
+    time_window_sec = phash.get("time_window_sec", 600)
+    if not isinstance(time_window_sec, int) or time_window_sec < 0:
+        add_error("phash.time_window_sec", "必須是非負整數")
+    if not isinstance(phash.get("validate_strategy", False), bool):
+        add_error("phash.validate_strategy", "必須是布林值")
+    if not isinstance(phash.get("cascade", False), bool):
+        add_error("phash.cascade", "必須是布林值")
+    if phash.get("prefilter_hash", "dhash") not in {"ahash", "dhash"}:
+        add_error("phash.prefilter_hash", "必須是 ahash 或 dhash")
+    prefilter_threshold = phash.get("prefilter_threshold", 12)
+    if not isinstance(prefilter_threshold, int) or not 0 <= prefilter_threshold <= 64:
+        add_error("phash.prefilter_threshold", "必須是 0 到 64 的整數")
+    prefilter_draft_size = phash.get("prefilter_draft_size", 32)
+    if not isinstance(prefilter_draft_size, int) or prefilter_draft_size < 8:
+        add_error("phash.prefilter_draft_size", "必須是不小於 8 的整數")
+    if phash.get("confirm_hash", "phash") not in {"phash", "whash"}:
+        add_error("phash.confirm_hash", "必須是 phash 或 whash")
+    if phash.get("clustering", "greedy") not in {"greedy", "union_find"}:
+        add_error("phash.clustering", "必須是 greedy 或 union_find")
+    max_diameter = phash.get("max_diameter", 0)
+    if not isinstance(max_diameter, int) or not 0 <= max_diameter <= 64:
+        add_error("phash.max_diameter", "必須是 0 到 64 的整數")
 
     thumbnail = config.get("thumbnail", {})
     max_size_kb = thumbnail.get("max_size_kb")
@@ -111,6 +174,8 @@ def validate_config(config: dict[str, Any]) -> list[str]:
         add_error("thumbnail.max_dimension_px", "必須是正整數")
     if not isinstance(min_dimension_px, int) or min_dimension_px <= 0:
         add_error("thumbnail.min_dimension_px", "必須是正整數")
+    if not isinstance(thumbnail.get("fast_classify", False), bool):
+        add_error("thumbnail.fast_classify", "必須是布林值")
 
     rename = config.get("rename", {})
     enabled = rename.get("enabled", True)
@@ -137,6 +202,17 @@ def validate_config(config: dict[str, Any]) -> list[str]:
     if not isinstance(archive_sequence_digits, int) or archive_sequence_digits <= 0:
         add_error("archive.sequence_digits", "必須是正整數")
 
+    plan = config.get("plan", {})
+    if not isinstance(plan.get("fuse_moves", False), bool):
+        add_error("plan.fuse_moves", "必須是布林值")
+    plan_workers = plan.get("workers", 0)
+    if not isinstance(plan_workers, int) or plan_workers < 0:
+        add_error("plan.workers", "必須是非負整數")
+
+    library = config.get("library", {})
+    if not isinstance(library.get("index_path", ""), str):
+        add_error("library.index_path", "必須是字串")
+
     progress = config.get("progress", {})
     ui_update_interval_ms = progress.get("ui_update_interval_ms", 250)
     heartbeat_interval_sec = progress.get("heartbeat_interval_sec", 2.0)
@@ -15,6 +15,7 @@ from .manifest import (
 )
 from .live_photo_matcher import LivePhotoMatcher
 from .pipeline import Pipeline
+from .plan_optimizer import PlanOptimizer
 from .renamer import Renamer
 from .resume_manager import ResumeManager, ValidationResult, build_actions_from_manifest
 from .rollback import RollbackRunner
@@ -36,6 +37,7 @@ __all__ = [
     "LivePhotoMatcher",
     "load_manifest_with_status",
     "Pipeline",
+    "PlanOptimizer",
     "Renamer",
     "ResumeManager",
     "RollbackRunner",
@@ -11,6 +11,7 @@ from ..config import ConfigManager
 from ..models import ActionItem, FileInfo, ManifestEntry
 from ..utils.logger import get_logger
 from .manifest import generate_op_id
+from .plan_optimizer import format_lineage
 
 
 @dataclass
@@ -36,7 +37,7 @@ class ActionPlanner:
         plan: list[ActionItem] = []
         screenshot_files = sorted(
             [item for item in keepers if item.is_screenshot],
-            key=lambda item: (item.timestamp_locked, item.path.name.lower(), str(item.path).lower()),
+            key=lambda item: (item.timestamp_sort_key, item.path.name.lower(), str(item.path).lower()),
         )
         if bool(self.config.get("group_screenshots", False)):
             enable_rename = bool(self.config.get("enable_rename", False))
@@ -149,7 +150,7 @@ class ActionPlanner:
         destination_template = str(
             self.config.get("screenshots_dest", "KEEP/Screenshots/{YYYY}-{MM}/")
         )
-        year_month = self._parse_year_month(file_info.timestamp_locked)
+        year_month = self._year_month(file_info)
         relative_template = destination_template.replace("{YYYY}", year_month[0]).replace("{MM}", year_month[1])
         target_dir = output_root / relative_template
         try:
@@ -159,22 +160,16 @@ class ActionPlanner:
         return target_dir / relative_name
 
     def _build_screenshot_name(self, file_info: FileInfo, sequence: int) -> str:
-        timestamp = self._parse_datetime(file_info.timestamp_locked)
+        timestamp = file_info.timestamp_datetime
         if timestamp is None:
             timestamp = datetime(1970, 1, 1, 0, 0, 0)
         return f"IMG_{timestamp:%Y%m%d_%H%M%S}_{sequence:04d}{file_info.path.suffix.lower()}"
 
-    def _parse_year_month(self, timestamp: str) -> tuple[str, str]:
-        parsed = self._parse_datetime(timestamp)
+    def _year_month(self, file_info: FileInfo) -> tuple[str, str]:
+        parsed = file_info.timestamp_datetime
         if parsed is None:
             return "unknown", "unknown"
-        return parsed.strftime("%Y"), parsed.strftime("%m")
-
-    def _parse_datetime(self, value: str) -> datetime | None:
-        try:
-            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            return None
+        return f"{parsed.year:04d}", f"{parsed.month:02d}"
 
     def build_manifest_entries(
         self,
@@ -185,6 +180,7 @@ class ActionPlanner:
         entries: list[ManifestEntry] = []
         for entry in plan:
             file_info = entry.src_file or lookup.get(entry.src_path)
+            fused_from, via_path = format_lineage(entry)
             dst_path = entry.dst_path if entry.dst_path else entry.src_path
             op_id = generate_op_id(
                 entry.action,
@@ -216,6 +212,8 @@ class ActionPlanner:
                     pair_confidence=file_info.pair_confidence if file_info else None,
                     is_screenshot=file_info.is_screenshot if file_info else False,
                     screenshot_evidence=file_info.screenshot_evidence if file_info else None,
+                    fused_from=fused_from,
+                    via_path=via_path,
                 )
             )
         return entries
@@ -3,14 +3,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
 import os
 from pathlib import Path
 from typing import Iterable, List
 
 from ..config import ConfigManager
 from ..models import ActionItem, FileInfo
+from ..utils.dir_index import DirectoryIndex
 from ..utils.logger import get_logger
+from ..utils.name_allocator import NameAllocator
+from ..utils.plan_shards import run_shards, shard_by_directory
 
 
 @dataclass
@@ -26,77 +28,82 @@ class Archiver:
         self.root_folder = str(config.get("archive.root_folder", "KEEP"))
         self.unknown_folder = str(config.get("archive.unknown_folder", "unknown"))
         self.sequence_digits = int(config.get("archive.sequence_digits", 3))
+        workers = int(config.get("plan.workers", 0))
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
 
     def generate_plan(
         self,
         files: Iterable[FileInfo],
         output_root: Path,
         progress_callback=None,
+        directory_index: DirectoryIndex | None = None,
     ) -> ArchiveResult:
         if not self.enabled:
             return ArchiveResult(plan=[], skipped=list(files))
+        directory_index = directory_index or DirectoryIndex(self.logger)
 
-        plan: list[ActionItem] = []
+        # 衝突狀態只與目的資料夾有關：依目的資料夾分片並行規劃，再依輸入順序合併
         skipped: list[FileInfo] = []
-        planned_names: dict[Path, set[str]] = {}
-
-        processed = 0
+        targets: list[tuple[Path, FileInfo]] = []
         for item in files:
-            target = self._build_target_path(item, output_root, planned_names)
-            if target is None:
+            parent = self._target_directory(item, output_root)
+            if self._is_same_path(parent / item.path.name, item.path):
                 skipped.append(item)
                 continue
-            plan.append(
-                ActionItem(
-                    action="ARCHIVE",
-                    reason="ARCHIVE",
-                    src_path=item.path,
-                    dst_path=target,
+            targets.append((parent, item))
+
+        def plan_shard(entries: list[tuple[int, FileInfo]]) -> list[tuple[int, ActionItem]]:
+            allocator = NameAllocator(directory_index, self.sequence_digits)
+            planned: set[str] = set()
+            planned_items: list[tuple[int, ActionItem]] = []
+            for position, item in entries:
+                target = allocator.allocate(targets[position][0], item.path.name, planned=planned, src_path=item.path)
+                planned_items.append(
+                    (
+                        position,
+                        ActionItem(
+                            action="ARCHIVE",
+                            reason="ARCHIVE",
+                            src_path=item.path,
+                            dst_path=target,
+                            src_file=item,
+                        ),
+                    )
                 )
-            )
-            processed += 1
+            return planned_items
+
+        processed = 0
+
+        def on_shard_done(results: list[tuple[int, ActionItem]]) -> None:
+            nonlocal processed
+            processed += len(results)
             if progress_callback is not None:
                 progress_callback(processed)
 
+        shard_results = run_shards(
+            shard_by_directory(targets),
+            plan_shard,
+            workers=self.workers,
+            on_shard_done=on_shard_done,
+        )
+        plan = [
+            action
+            for _, action in sorted(
+                (result for results in shard_results for result in results),
+                key=lambda result: result[0],
+            )
+        ]
         return ArchiveResult(plan=plan, skipped=skipped)
 
-    def _build_target_path(
-        self,
-        item: FileInfo,
-        output_root: Path,
-        planned_names: dict[Path, set[str]],
-    ) -> Path | None:
-        year, month = self._parse_timestamp(item.timestamp_locked)
-        parent = output_root / self.root_folder / year / month
-        candidate = self._build_candidate(parent, item.path.name, 0)
-        if self._is_same_path(candidate, item.path):
-            return None
-
-        planned = planned_names.setdefault(parent, set())
-        seq = 0
-        while True:
-            key = os.path.normcase(candidate.name)
-            if key not in planned and not (candidate.exists() and not self._is_same_path(candidate, item.path)):
-                planned.add(key)
-                return candidate
-            seq += 1
-            candidate = self._build_candidate(parent, item.path.name, seq)
-
-    def _parse_timestamp(self, timestamp: str) -> tuple[str, str]:
-        try:
-            dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-            return dt.strftime("%Y"), dt.strftime("%m")
-        except ValueError:
-            return self.unknown_folder, self.unknown_folder
+    def _target_directory(self, item: FileInfo, output_root: Path) -> Path:
+        year, month = self._year_month(item)
+        return output_root / self.root_folder / year / month
 
-    def _build_candidate(self, parent: Path, filename: str, seq: int) -> Path:
-        if seq == 0:
-            name = filename
-        else:
-            stem = Path(filename).stem
-            ext = Path(filename).suffix
-            name = f"{stem}_{seq:0{self.sequence_digits}d}{ext}"
-        return parent / name
+    def _year_month(self, item: FileInfo) -> tuple[str, str]:
+        dt = item.timestamp_datetime
+        if dt is None:
+            return self.unknown_folder, self.unknown_folder
+        return f"{dt.year:04d}", f"{dt.month:02d}"
 
     def _is_same_path(self, left: Path, right: Path) -> bool:
         return os.path.normcase(str(left)) == os.path.normcase(str(right))
@@ -3,17 +3,29 @@
 from __future__ import annotations
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import sqlite3
 import threading
 import time
 from typing import Callable, Iterable, List, Optional
 
 from ..config import ConfigManager
-from ..models import FileInfo
-from ..utils import hash_calc
+from ..models import FileInfo, ManifestEntry, ProgressEvent, ProgressEventType
+from ..utils import byte_compare, hash_calc, path_utils
+from ..utils.cancel import CancelledError, CancellationToken
+from ..utils.io_scheduler import IOScheduler
+from ..utils.library_index import LibraryIndex
 from ..utils.logger import get_logger
 
 
+HASH_PHASE_NAME = "Hashing"
+# 逐位元組比對需同時開啟群組內所有檔案；超過此數量的群組改用 hash 比對
+MAX_BYTE_COMPARE_MEMBERS = 256
+
+
 @dataclass
 class DedupeGroup:
     hash_value: str
@@ -21,19 +33,38 @@ class DedupeGroup:
     duplicates: List[FileInfo]
 
 
+@dataclass
+class LibraryMatch:
+    item: FileInfo
+    library_path: Path
+
+
 @dataclass
 class DedupeResult:
     keepers: List[FileInfo]
     duplicates: List[FileInfo]
     groups: List[DedupeGroup]
+    library_matches: List[LibraryMatch] = field(default_factory=list)
 
 
 class ExactDeduper:
-    def __init__(self, config: ConfigManager, logger=None) -> None:
+    READ_ORDERS = {"default", "inode", "directory"}
+    VERIFY_MODES = {"hash", "bytes"}
+
+    def __init__(self, config: ConfigManager, logger=None, io_scheduler: IOScheduler | None = None) -> None:
         self.logger = logger or get_logger(self.__class__.__name__)
+        self.io_scheduler = io_scheduler or IOScheduler.from_config(config, self.logger)
         self.algorithms = self._load_algorithms(config)
         self.chunk_size_kb = int(config.get("hash.chunk_size_kb", 1024))
-        self.parallel_workers = int(config.get("hash.parallel_workers", 1))
+        self.page_cache_hints = bool(config.get("io.page_cache_hints", False))
+        self.read_order = str(config.get("hash.read_order", "default")).lower()
+        if self.read_order not in self.READ_ORDERS:
+            self.read_order = "default"
+        self.verify_mode = str(config.get("hash.verify_mode", "hash")).lower()
+        if self.verify_mode not in self.VERIFY_MODES:
+            self.verify_mode = "hash"
+        self.library_index_path = str(config.get("library.index_path", "") or "").strip()
+        self.archive_root_folder = str(config.get("archive.root_folder", "KEEP"))
         self.progress_bytes_threshold = int(config.get("progress.bytes_update_threshold", 1048576))
         self.progress_emit_interval_sec = float(config.get("progress.ui_update_interval_ms", 250)) / 1000.0
 
@@ -42,7 +73,10 @@ class ExactDeduper:
         files: Iterable[FileInfo],
         progress_callback=None,
         bytes_progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        progress_event_callback: Optional[Callable[[ProgressEvent], None]] = None,
     ) -> DedupeResult:
+        """progress_event_callback 可能由多個 hash worker 執行緒呼叫，必須是執行緒安全的。"""
         groups: dict[str, List[FileInfo]] = {}
         keepers: List[FileInfo] = []
         duplicates: List[FileInfo] = []
@@ -54,45 +88,91 @@ class ExactDeduper:
                 keepers.append(item)
                 continue
             size_groups.setdefault(item.size_bytes, []).append(item)
+        # 與圖庫中檔案同大小者一律計算 SHA-256，即使在本次來源中大小唯一
+        library_sizes = self._library_sizes()
 
+        # 每個 job 是一組指向同一 inode 的 hardlink，只需讀取第一個成員
+        hash_jobs: list[list[FileInfo]] = []
+        compare_groups: list[list[list[FileInfo]]] = []
         processed = 0
-        hash_total_bytes = sum(
-            item.size_bytes
-            for items in size_groups.values()
-            if len(items) > 1
-            for item in items
-        )
+        for size, items in size_groups.items():
+            in_library = size in library_sizes
+            if len(items) == 1 and not in_library:
+                keepers.extend(items)
+                continue
+            inode_groups = self._group_by_inode(items)
+            if len(inode_groups) == 1 and not in_library:
+                identity = self._file_identity(items[0])
+                groups[f"{items[0].size_bytes}:inode:{identity[0]}:{identity[1]}"] = list(items)
+                processed += len(items)
+                if progress_callback is not None:
+                    progress_callback(processed)
+                continue
+            if self.verify_mode == "bytes" and len(inode_groups) <= MAX_BYTE_COMPARE_MEMBERS and not in_library:
+                compare_groups.append(inode_groups)
+                continue
+            hash_jobs.extend(inode_groups)
+
+        hash_jobs = self._order_jobs(hash_jobs)
+        hash_total_bytes = sum(job[0].size_bytes for job in hash_jobs)
+        hash_total_bytes += sum(job[0].size_bytes for jobs in compare_groups for job in jobs)
+        total_jobs = len(hash_jobs) + sum(len(jobs) for jobs in compare_groups)
         aggregator = _HashProgressAggregator(
             total_bytes=max(0, hash_total_bytes),
             callback=bytes_progress_callback,
             bytes_threshold=self.progress_bytes_threshold,
             emit_interval_sec=self.progress_emit_interval_sec,
+            event_callback=progress_event_callback,
+            op_type="compare" if self.verify_mode == "bytes" else "hash",
         )
-        for items in size_groups.values():
-            if len(items) == 1:
-                keepers.extend(items)
-                continue
-            if self.parallel_workers > 1:
-                processed = self._hash_group_parallel(
-                    items,
+        aggregator.emit_event(ProgressEventType.PHASE_START)
+        try:
+            for jobs in compare_groups:
+                processed = self._compare_group(
+                    jobs,
+                    groups,
+                    keepers,
+                    processed,
+                    progress_callback,
+                    aggregator,
+                    cancel_token,
+                )
+            if len(hash_jobs) > 1 and self._max_concurrency(hash_jobs) > 1:
+                processed = self._hash_jobs_parallel(
+                    hash_jobs,
                     groups,
                     keepers,
                     processed,
                     progress_callback,
                     aggregator,
+                    cancel_token,
                 )
             else:
-                for item in items:
-                    processed = self._hash_item(
-                        item,
+                for job in hash_jobs:
+                    processed = self._hash_job(
+                        job,
                         groups,
                         keepers,
                         processed,
                         progress_callback,
                         aggregator,
+                        cancel_token,
                     )
+        except CancelledError:
+            aggregator.flush()
+            aggregator.emit_event(
+                ProgressEventType.PHASE_END,
+                status="CANCELLED",
+                evidence=f"hashed_files={aggregator.files_done}, total_files={total_jobs}",
+            )
+            raise
 
         aggregator.flush()
+        aggregator.emit_event(
+            ProgressEventType.PHASE_END,
+            status="DONE",
+            evidence=f"hashed_files={aggregator.files_done}, total_files={total_jobs}",
+        )
 
         for hash_value, items in groups.items():
             if len(items) == 1:
@@ -111,7 +191,104 @@ class ExactDeduper:
                 )
             )
 
-        return DedupeResult(keepers=keepers, duplicates=duplicates, groups=dedupe_groups)
+        library_matches: list[LibraryMatch] = []
+        if library_sizes:
+            keepers, library_matches = self._match_library(keepers, library_sizes, cancel_token)
+            duplicates.extend(match.item for match in library_matches)
+
+        return DedupeResult(
+            keepers=keepers,
+            duplicates=duplicates,
+            groups=dedupe_groups,
+            library_matches=library_matches,
+        )
+
+    def record_moves(self, entries: Iterable[ManifestEntry], output_root: Path) -> int:
+        """Execute 完成後把放進 output_root 下 KEEP 的檔案寫入圖庫索引，移出或改名的圖庫檔案一併更新。"""
+        if not self.library_index_path:
+            return 0
+        keep_root = output_root / self.archive_root_folder
+        moves = [
+            (
+                Path(entry.src_path),
+                Path(entry.dst_path),
+                entry.hash_sha256,
+                path_utils.is_within(Path(entry.dst_path), keep_root),
+            )
+            for entry in entries
+            if entry.dst_path
+        ]
+        if not moves:
+            return 0
+        library = self._open_library()
+        if library is None:
+            return 0
+        with library:
+            return library.record_moves(moves)
+
+    def _open_library(self) -> Optional[LibraryIndex]:
+        if not self.library_index_path:
+            return None
+        try:
+            return LibraryIndex(Path(self.library_index_path), self.logger)
+        except (sqlite3.Error, OSError) as exc:
+            self.logger.warning(f"無法開啟圖庫索引，略過與圖庫比對: {self.library_index_path} ({exc})")
+            return None
+
+    def _library_sizes(self) -> set[int]:
+        if not self.library_index_path:
+            return set()
+        if "sha256" not in self.algorithms:
+            self.logger.warning("hash.algorithms 未包含 sha256，略過與圖庫比對")
+            return set()
+        library = self._open_library()
+        if library is None:
+            return set()
+        with library:
+            return library.sizes()
+
+    def _match_library(
+        self,
+        keepers: List[FileInfo],
+        library_sizes: set[int],
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> tuple[List[FileInfo], list[LibraryMatch]]:
+        """內容已存在於圖庫的保留檔改列為重複；圖庫端只在缺少 hash 時讀取一次。"""
+        library = self._open_library()
+        if library is None:
+            return keepers, []
+        remaining: List[FileInfo] = []
+        matches: list[LibraryMatch] = []
+        with library:
+            for item in keepers:
+                library_path = None
+                if item.size_bytes in library_sizes and item.hash_sha256:
+                    library_path = library.find(
+                        item.size_bytes,
+                        item.hash_sha256,
+                        lambda path: self._compute_sha256(path, cancel_token),
+                        exclude=item.path,
+                    )
+                if library_path is None:
+                    remaining.append(item)
+                else:
+                    matches.append(LibraryMatch(item=item, library_path=library_path))
+        if matches:
+            self.logger.info(f"{len(matches)} 個檔案已存在於圖庫")
+        return remaining, matches
+
+    def _compute_sha256(self, path: Path, cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        with self.io_scheduler.slot(path):
+            hashes = hash_calc.compute_hashes(
+                path,
+                algorithms=["sha256"],
+                chunk_size_kb=self.chunk_size_kb,
+                cancel_token=cancel_token,
+                bytes_update_threshold=self.progress_bytes_threshold,
+                drop_page_cache=self.page_cache_hints,
+                logger=self.logger,
+            )
+        return hashes.get("sha256")
 
     def _load_algorithms(self, config: ConfigManager) -> List[str]:
         algorithms = config.get("hash.algorithms", ["sha256", "md5"])
@@ -138,88 +315,241 @@ class ExactDeduper:
             return f"{item.size_bytes}:{item.hash_md5}"
         return None
 
-    def _hash_item(
+    def _file_identity(self, item: FileInfo) -> tuple[int, int] | None:
+        device_id = item.device_id
+        inode = item.inode
+        if device_id is None or inode is None:
+            try:
+                stat = os.stat(item.path)
+            except OSError:
+                return None
+            device_id = item.device_id = stat.st_dev
+            inode = item.inode = stat.st_ino
+        if not inode:
+            return None
+        return device_id, inode
+
+    def _group_by_inode(self, items: List[FileInfo]) -> list[list[FileInfo]]:
+        by_identity: dict[tuple[int, int], list[FileInfo]] = {}
+        result: list[list[FileInfo]] = []
+        for item in items:
+            identity = self._file_identity(item)
+            if identity is None:
+                result.append([item])
+                continue
+            job = by_identity.get(identity)
+            if job is None:
+                job = by_identity[identity] = []
+                result.append(job)
+            job.append(item)
+        return result
+
+    def _order_jobs(self, jobs: list[list[FileInfo]]) -> list[list[FileInfo]]:
+        if self.read_order == "inode":
+            return sorted(jobs, key=lambda job: (job[0].device_id or 0, job[0].inode or 0, str(job[0].path)))
+        if self.read_order == "directory":
+            return sorted(jobs, key=lambda job: (str(job[0].path.parent), job[0].path.name))
+        return jobs
+
+    def _apply_hashes(
         self,
-        item: FileInfo,
+        job: list[FileInfo],
+        hashes: dict[str, str],
+        groups: dict[str, List[FileInfo]],
+        keepers: List[FileInfo],
+    ) -> int:
+        for item in job:
+            item.hash_md5 = hashes.get("md5")
+            item.hash_sha256 = hashes.get("sha256")
+        hash_key = self._build_hash_key(job[0])
+        if not hash_key:
+            keepers.extend(job)
+            return 0
+        groups.setdefault(hash_key, []).extend(job)
+        return len(job)
+
+    def _hash_job(
+        self,
+        job: list[FileInfo],
         groups: dict[str, List[FileInfo]],
         keepers: List[FileInfo],
         processed: int,
         progress_callback,
         aggregator: "_HashProgressAggregator",
+        cancel_token: Optional[CancellationToken] = None,
     ) -> int:
-        previous_bytes = 0
+        _item, hashes = self._compute_hashes(job[0], aggregator, cancel_token)
+        hashed = self._apply_hashes(job, hashes, groups, keepers)
+        if not hashed:
+            return processed
+        processed += hashed
+        if progress_callback is not None:
+            progress_callback(processed)
+        return processed
 
-        def on_hash_progress(bytes_read: int, _total_size: int) -> None:
-            nonlocal previous_bytes
-            delta = max(0, bytes_read - previous_bytes)
-            previous_bytes = bytes_read
+    def _compare_group(
+        self,
+        jobs: list[list[FileInfo]],
+        groups: dict[str, List[FileInfo]],
+        keepers: List[FileInfo],
+        processed: int,
+        progress_callback,
+        aggregator: "_HashProgressAggregator",
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> int:
+        """同大小的候選群組直接逐位元組比對，不計算 hash。"""
+        size = jobs[0][0].size_bytes
+        paths = [job[0].path for job in jobs]
+        group_bytes = size * len(jobs)
+        read_bytes = 0
+
+        def on_bytes(delta: int) -> None:
+            nonlocal read_bytes
+            read_bytes += delta
             aggregator.add(delta)
 
-        hashes = hash_calc.compute_hashes(
-            item.path,
-            algorithms=self.algorithms,
+        aggregator.emit_event(
+            ProgressEventType.FILE_START,
+            file_path=str(paths[0]),
+            file_total_bytes=group_bytes,
+            file_processed_bytes=0,
+        )
+        started = time.time()
+        classes = byte_compare.partition_identical(
+            paths,
             chunk_size_kb=self.chunk_size_kb,
-            progress_callback=on_hash_progress,
+            max_workers=self.io_scheduler.limit_for(self.io_scheduler.device_of(paths[0])),
+            cancel_token=cancel_token,
+            bytes_callback=on_bytes,
+            drop_page_cache=self.page_cache_hints,
+            read_slot=self.io_scheduler.slot,
             logger=self.logger,
         )
-        item.hash_md5 = hashes.get("md5")
-        item.hash_sha256 = hashes.get("sha256")
-        hash_key = self._build_hash_key(item)
-        if not hash_key:
-            keepers.append(item)
-            return processed
-        groups.setdefault(hash_key, []).append(item)
-        processed += 1
+        elapsed_ms = int((time.time() - started) * 1000)
+
+        matched: set[int] = set()
+        for indices in classes:
+            matched.update(indices)
+            groups[f"{size}:bytes:{paths[indices[0]]}"] = [item for index in indices for item in jobs[index]]
+        for index, job in enumerate(jobs):
+            if index in matched:
+                continue
+            if len(job) > 1:
+                identity = self._file_identity(job[0])
+                groups[f"{size}:inode:{identity[0]}:{identity[1]}"] = job
+            else:
+                keepers.extend(job)
+        for _ in jobs:
+            aggregator.file_done()
+
+        # 提早分歧而未讀取的部分直接計入進度
+        aggregator.add(group_bytes - read_bytes)
+        aggregator.emit_event(
+            ProgressEventType.FILE_DONE,
+            file_path=str(paths[0]),
+            file_total_bytes=group_bytes,
+            file_processed_bytes=read_bytes,
+            status="COMPARED",
+            elapsed_ms=elapsed_ms,
+            speed_mbps=(read_bytes / (elapsed_ms / 1000.0) / 1024 / 1024) if elapsed_ms > 0 else None,
+        )
+        processed += sum(len(job) for job in jobs)
         if progress_callback is not None:
             progress_callback(processed)
         return processed
 
-    def _hash_group_parallel(
+    def _max_concurrency(self, jobs: list[list[FileInfo]]) -> int:
+        devices = {self.io_scheduler.device_of(job[0].path) for job in jobs}
+        return sum(self.io_scheduler.limit_for(device) for device in devices)
+
+    def _hash_jobs_parallel(
         self,
-        items: list[FileInfo],
+        jobs: list[list[FileInfo]],
         groups: dict[str, List[FileInfo]],
         keepers: List[FileInfo],
         processed: int,
         progress_callback,
         aggregator: "_HashProgressAggregator",
+        cancel_token: Optional[CancellationToken] = None,
     ) -> int:
-        with ThreadPoolExecutor(max_workers=self.parallel_workers) as executor:
-            future_map = {
-                executor.submit(self._compute_hashes, item, aggregator): item for item in items
-            }
-            for future in as_completed(future_map):
-                item, hashes = future.result()
-                item.hash_md5 = hashes.get("md5")
-                item.hash_sha256 = hashes.get("sha256")
-                hash_key = self._build_hash_key(item)
-                if not hash_key:
-                    keepers.append(item)
-                    continue
-                groups.setdefault(hash_key, []).append(item)
-                processed += 1
-                if progress_callback is not None:
-                    progress_callback(processed)
+        # 每個裝置各自一個 pool，慢速 HDD 不會佔住 SSD/SMB 的 worker
+        device_groups = self.io_scheduler.group_by_device(job[0].path for job in jobs)
+        with ExitStack() as stack:
+            future_map = {}
+            for device, indices in device_groups.items():
+                executor = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=self.io_scheduler.limit_for(device))
+                )
+                for index in indices:
+                    job = jobs[index]
+                    future = executor.submit(self._compute_hashes, job[0], aggregator, cancel_token)
+                    future_map[future] = job
+            try:
+                for future in as_completed(future_map):
+                    _item, hashes = future.result()
+                    hashed = self._apply_hashes(future_map[future], hashes, groups, keepers)
+                    if not hashed:
+                        continue
+                    processed += hashed
+                    if progress_callback is not None:
+                        progress_callback(processed)
+            except CancelledError:
+                for pending in future_map:
+                    pending.cancel()
+                raise
         return processed
 
     def _compute_hashes(
         self,
         item: FileInfo,
         aggregator: "_HashProgressAggregator",
+        cancel_token: Optional[CancellationToken] = None,
     ) -> tuple[FileInfo, dict[str, str]]:
         previous_bytes = 0
+        file_path = str(item.path)
 
-        def on_hash_progress(bytes_read: int, _total_size: int) -> None:
+        def on_hash_progress(bytes_read: int, total_size: int) -> None:
             nonlocal previous_bytes
             delta = max(0, bytes_read - previous_bytes)
             previous_bytes = bytes_read
             aggregator.add(delta)
+            aggregator.emit_event(
+                ProgressEventType.FILE_PROGRESS,
+                file_path=file_path,
+                file_total_bytes=total_size,
+                file_processed_bytes=bytes_read,
+            )
 
-        hashes = hash_calc.compute_hashes(
-            item.path,
-            algorithms=self.algorithms,
-            chunk_size_kb=self.chunk_size_kb,
-            progress_callback=on_hash_progress,
-            logger=self.logger,
+        if cancel_token is not None and cancel_token.is_cancelled():
+            raise CancelledError(f"已取消 hash 計算: {item.path}")
+        with self.io_scheduler.slot(item.path):
+            aggregator.emit_event(
+                ProgressEventType.FILE_START,
+                file_path=file_path,
+                file_total_bytes=item.size_bytes,
+                file_processed_bytes=0,
+            )
+            started = time.time()
+            hashes = hash_calc.compute_hashes(
+                item.path,
+                algorithms=self.algorithms,
+                chunk_size_kb=self.chunk_size_kb,
+                progress_callback=on_hash_progress,
+                cancel_token=cancel_token,
+                bytes_update_threshold=self.progress_bytes_threshold,
+                drop_page_cache=self.page_cache_hints,
+                logger=self.logger,
+            )
+        elapsed_ms = int((time.time() - started) * 1000)
+        aggregator.file_done()
+        aggregator.emit_event(
+            ProgressEventType.FILE_DONE,
+            file_path=file_path,
+            file_total_bytes=item.size_bytes,
+            file_processed_bytes=previous_bytes,
+            status="HASHED" if hashes else "ERROR",
+            elapsed_ms=elapsed_ms,
+            speed_mbps=(previous_bytes / (elapsed_ms / 1000.0) / 1024 / 1024) if elapsed_ms > 0 else None,
         )
         return item, hashes
 
@@ -232,21 +562,28 @@ class _HashProgressAggregator:
         callback: Optional[Callable[[int, int], None]],
         bytes_threshold: int,
         emit_interval_sec: float,
+        event_callback: Optional[Callable[[ProgressEvent], None]] = None,
+        op_type: str = "hash",
     ) -> None:
         self.total_bytes = max(0, total_bytes)
+        self.op_type = op_type
         self.callback = callback
+        self.event_callback = event_callback
         self.bytes_threshold = max(1, bytes_threshold)
         self.emit_interval_sec = max(0.1, emit_interval_sec)
+        self.files_done = 0
         self._processed_bytes = 0
         self._last_emitted_bytes = 0
         self._last_emitted_time = time.time()
         self._lock = threading.Lock()
 
     def add(self, delta_bytes: int) -> None:
-        if self.callback is None or delta_bytes <= 0:
+        if delta_bytes <= 0:
             return
         with self._lock:
             self._processed_bytes += delta_bytes
+            if self.callback is None:
+                return
             now = time.time()
             bytes_since_emit = self._processed_bytes - self._last_emitted_bytes
             if bytes_since_emit >= self.bytes_threshold or (now - self._last_emitted_time) >= self.emit_interval_sec:
@@ -254,6 +591,26 @@ class _HashProgressAggregator:
                 self._last_emitted_bytes = self._processed_bytes
                 self._last_emitted_time = now
 
+    def file_done(self) -> None:
+        with self._lock:
+            self.files_done += 1
+
+    def emit_event(self, event_type: ProgressEventType, **fields) -> None:
+        if self.event_callback is None:
+            return
+        with self._lock:
+            run_processed_bytes = self._processed_bytes
+        self.event_callback(
+            ProgressEvent(
+                event_type=event_type,
+                phase_name=HASH_PHASE_NAME,
+                op_type=self.op_type,
+                run_total_bytes=self.total_bytes,
+                run_processed_bytes=run_processed_bytes,
+                **fields,
+            )
+        )
+
     def flush(self) -> None:
         if self.callback is None:
             return
@@ -15,9 +15,11 @@ from typing import Callable, Iterable, Optional
 from ..config import ConfigManager
 from ..models import ActionItem, ManifestEntry, ProgressEvent, ProgressEventType
 from ..utils import file_ops, path_utils
-from ..utils.cancel import CancelledError, CancellationToken
+from ..utils.cancel import CancelledError, CancellationToken, EventCancellationToken
+from ..utils.io_scheduler import IOScheduler
 from ..utils.logger import get_logger
 from .manifest import generate_op_id, load_manifest_with_status, update_manifest_status
+from .plan_optimizer import format_lineage
 
 
 @dataclass
@@ -28,9 +30,15 @@ class ExecutionResult:
 
 
 class PlanExecutor:
-    def __init__(self, logger=None, config: ConfigManager | None = None) -> None:
+    def __init__(
+        self,
+        logger=None,
+        config: ConfigManager | None = None,
+        io_scheduler: IOScheduler | None = None,
+    ) -> None:
         self.logger = logger or get_logger(self.__class__.__name__)
         self.config = config or ConfigManager()
+        self.io_scheduler = io_scheduler or IOScheduler.from_config(self.config, self.logger)
 
     def execute_plan(
         self,
@@ -53,7 +61,7 @@ class PlanExecutor:
         file_speeds: list[float] = []
 
         if cancel_token is None and cancel_event is not None:
-            cancel_token = _EventCancellationToken(cancel_event)
+            cancel_token = EventCancellationToken(cancel_event)
 
         run_logger = _ProgressRunLogger(manifest_path.parent if manifest_path is not None else None)
         run_logger.start()
@@ -138,12 +146,16 @@ class PlanExecutor:
                         ),
                     )
 
-                entry = self._execute_action(
-                    item,
-                    progress_callback=on_bytes,
-                    cancel_token=cancel_token,
-                )
+                with self.io_scheduler.slot(item.src_path, item.dst_path):
+                    entry = self._execute_action(
+                        item,
+                        progress_callback=on_bytes,
+                        cancel_token=cancel_token,
+                    )
                 entry.op_id = op_id
+                entry.fused_from, entry.via_path = format_lineage(item)
+                if item.src_file is not None:
+                    entry.hash_sha256 = item.src_file.hash_sha256
                 elapsed_ms = int((time.time() - item_started) * 1000)
                 if manifest_path is not None:
                     update_manifest_status(
@@ -364,17 +376,6 @@ def _event_op_type(action: str) -> str:
     return mapping.get(action, action.lower())
 
 
-class _EventCancellationToken(CancellationToken):
-    def __init__(self, event) -> None:
-        self._event = event
-
-    def set(self) -> None:
-        self._event.set()
-
-    def is_cancelled(self) -> bool:
-        return bool(self._event.is_set())
-
-
 class HeartbeatTicker:
     def __init__(self, interval_sec: float, callback: Callable[[], None]) -> None:
         self._interval_sec = max(0.2, interval_sec)
@@ -5,7 +5,6 @@ from __future__ import annotations
 import hashlib
 import json
 from collections import defaultdict
-from datetime import datetime, timedelta
 from pathlib import Path
 
 from ..models import FileInfo, LivePhotoPair
@@ -14,43 +13,46 @@ from ..models import FileInfo, LivePhotoPair
 class LivePhotoMatcher:
     IMAGE_EXTS = {".heic", ".jpg", ".jpeg"}
     VIDEO_EXTS = {".mov", ".mp4"}
+    MAX_TIME_DIFF_SEC = 2
 
     def find_live_pairs(self, files: list[FileInfo]) -> list[LivePhotoPair]:
-        folder_groups: dict[Path, list[FileInfo]] = defaultdict(list)
-        for file_info in files:
-            folder_groups[file_info.path.parent].append(file_info)
-
-        pairs: list[LivePhotoPair] = []
+        images = [
+            file_info
+            for file_info in files
+            if file_info.file_type == "IMAGE" and file_info.ext.lower() in self.IMAGE_EXTS
+        ]
+        videos = [
+            file_info
+            for file_info in files
+            if file_info.file_type == "VIDEO" and file_info.ext.lower() in self.VIDEO_EXTS
+        ]
+
+        used_images: set[Path] = set()
+        used_videos: set[Path] = set()
+        # 先以 ContentIdentifier 跨資料夾配對，其餘才依資料夾內的拍攝時間配對
+        pairs = self._select_pairs(
+            self._find_identifier_candidates(images, videos),
+            used_images,
+            used_videos,
+        )
+
+        folder_groups: dict[Path, tuple[list[FileInfo], list[FileInfo]]] = defaultdict(
+            lambda: ([], [])
+        )
+        for image in images:
+            if image.path not in used_images:
+                folder_groups[image.path.parent][0].append(image)
+        for video in videos:
+            if video.path not in used_videos:
+                folder_groups[video.path.parent][1].append(video)
 
         for folder in sorted(folder_groups.keys(), key=lambda item: str(item)):
-            folder_files = folder_groups[folder]
-            images = [
-                file_info
-                for file_info in folder_files
-                if file_info.file_type == "IMAGE" and file_info.ext.lower() in self.IMAGE_EXTS
+            folder_images, folder_videos = folder_groups[folder]
+            candidates = [
+                (diff_sec, image, video)
+                for diff_sec, image, video in self._find_candidates(folder_images, folder_videos)
+                if not self._identifiers_conflict(image, video)
             ]
-            videos = [
-                file_info
-                for file_info in folder_files
-                if file_info.file_type == "VIDEO" and file_info.ext.lower() in self.VIDEO_EXTS
-            ]
-
-            images.sort(key=lambda item: (item.timestamp_locked, item.path.stem, str(item.path)))
-            videos.sort(key=lambda item: (item.timestamp_locked, item.path.stem, str(item.path)))
-
-            candidates: list[tuple[float, FileInfo, FileInfo]] = []
-            for image in images:
-                image_time = self._parse_timestamp(image.timestamp_locked)
-                if image_time is None:
-                    continue
-                for video in videos:
-                    video_time = self._parse_timestamp(video.timestamp_locked)
-                    if video_time is None:
-                        continue
-                    time_diff = abs(image_time - video_time)
-                    if time_diff <= timedelta(seconds=2):
-                        candidates.append((float(time_diff.total_seconds()), image, video))
-
             candidates.sort(
                 key=lambda item: (
                     item[0],
@@ -60,37 +62,109 @@ class LivePhotoMatcher:
                     str(item[2].path),
                 )
             )
+            pairs.extend(self._select_pairs(candidates, used_images, used_videos))
 
-            used_images: set[Path] = set()
-            used_videos: set[Path] = set()
-
-            for diff_sec, image, video in candidates:
-                if image.path in used_images or video.path in used_videos:
-                    continue
-
-                pair_id = self.calculate_pair_id(image, video)
-                image.is_live_pair = True
-                image.pair_id = pair_id
-                image.pair_confidence = "high"
-
-                video.is_live_pair = True
-                video.pair_id = pair_id
-                video.pair_confidence = "high"
-
-                pairs.append(
-                    LivePhotoPair(
-                        image=image,
-                        video=video,
-                        pair_id=pair_id,
-                        confidence="high",
-                        time_diff_sec=diff_sec,
-                    )
-                )
-                used_images.add(image.path)
-                used_videos.add(video.path)
+        return pairs
 
+    def _select_pairs(
+        self,
+        candidates: list[tuple[float, FileInfo, FileInfo]],
+        used_images: set[Path],
+        used_videos: set[Path],
+    ) -> list[LivePhotoPair]:
+        """依候選順序配對，已配對的影像或影片不再使用。"""
+        pairs: list[LivePhotoPair] = []
+        for diff_sec, image, video in candidates:
+            if image.path in used_images or video.path in used_videos:
+                continue
+
+            pair_id = self.calculate_pair_id(image, video)
+            image.is_live_pair = True
+            image.pair_id = pair_id
+            image.pair_confidence = "high"
+
+            video.is_live_pair = True
+            video.pair_id = pair_id
+            video.pair_confidence = "high"
+
+            pairs.append(
+                LivePhotoPair(
+                    image=image,
+                    video=video,
+                    pair_id=pair_id,
+                    confidence="high",
+                    time_diff_sec=diff_sec,
+                )
+            )
+            used_images.add(image.path)
+            used_videos.add(video.path)
         return pairs
 
+    def _find_identifier_candidates(
+        self,
+        images: list[FileInfo],
+        videos: list[FileInfo],
+    ) -> list[tuple[float, FileInfo, FileInfo]]:
+        """同一 ContentIdentifier 的影像與影片；同一 ID 有多個檔案時優先同資料夾、時間較近者。"""
+        videos_by_identifier: dict[str, list[FileInfo]] = defaultdict(list)
+        for video in videos:
+            if video.content_identifier:
+                videos_by_identifier[video.content_identifier].append(video)
+
+        ranked: list[tuple[tuple, FileInfo, FileInfo]] = []
+        for image in images:
+            for video in videos_by_identifier.get(image.content_identifier or "", []):
+                diff_sec = 0.0
+                if image.timestamp_valid and video.timestamp_valid:
+                    diff_sec = float(abs(image.timestamp_epoch - video.timestamp_epoch))
+                sort_key = (
+                    image.path.parent != video.path.parent,
+                    diff_sec,
+                    image.path.stem,
+                    video.path.stem,
+                    str(image.path),
+                    str(video.path),
+                )
+                ranked.append((sort_key, image, video))
+        ranked.sort(key=lambda item: item[0])
+        return [(sort_key[1], image, video) for sort_key, image, video in ranked]
+
+    def _identifiers_conflict(self, image: FileInfo, video: FileInfo) -> bool:
+        return bool(
+            image.content_identifier
+            and video.content_identifier
+            and image.content_identifier != video.content_identifier
+        )
+
+    def _find_candidates(
+        self,
+        images: list[FileInfo],
+        videos: list[FileInfo],
+    ) -> list[tuple[float, FileInfo, FileInfo]]:
+        """每個時間戳只解析一次，兩邊依時間排序後以雙指標掃描 ±MAX_TIME_DIFF_SEC 的視窗。"""
+        timed_images = self._sort_by_epoch(images)
+        timed_videos = self._sort_by_epoch(videos)
+
+        candidates: list[tuple[float, FileInfo, FileInfo]] = []
+        start = 0
+        for image_time, image in timed_images:
+            while start < len(timed_videos) and timed_videos[start][0] < image_time - self.MAX_TIME_DIFF_SEC:
+                start += 1
+            position = start
+            while position < len(timed_videos) and timed_videos[position][0] <= image_time + self.MAX_TIME_DIFF_SEC:
+                video_time, video = timed_videos[position]
+                candidates.append((float(abs(image_time - video_time)), image, video))
+                position += 1
+        return candidates
+
+    def _sort_by_epoch(self, items: list[FileInfo]) -> list[tuple[int, FileInfo]]:
+        timed: list[tuple[int, FileInfo]] = []
+        for item in items:
+            if item.timestamp_valid:
+                timed.append((item.timestamp_epoch, item))
+        timed.sort(key=lambda entry: (entry[0], entry[1].path.stem, str(entry[1].path)))
+        return timed
+
     def calculate_pair_id(self, image: FileInfo, video: FileInfo) -> str:
         payload = {
             "image": str(image.path).replace("\\", "/"),
@@ -101,9 +175,3 @@ class LivePhotoMatcher:
         canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
         digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
         return f"pair_{digest[:16]}"
-
-    def _parse_timestamp(self, value: str) -> datetime | None:
-        try:
-            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            return None
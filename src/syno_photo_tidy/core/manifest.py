@@ -112,6 +112,8 @@ def load_manifest_with_status(manifest_path: Path) -> list[ManifestEntry]:
                     if record.get("screenshot_evidence")
                     else None
                 ),
+                fused_from=str(record.get("fused_from")) if record.get("fused_from") else None,
+                via_path=str(record.get("via_path")) if record.get("via_path") else None,
             )
         )
 
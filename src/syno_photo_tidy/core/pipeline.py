@@ -7,13 +7,17 @@ from pathlib import Path
 from typing import Callable, List, Optional
 
 from ..config import ConfigManager
-from ..models import ActionItem, FileInfo, ManifestEntry
+from ..models import ActionItem, FileInfo, ManifestEntry, ProgressEvent
 from ..utils import path_utils, reporting
+from ..utils.cancel import CancelledError, EventCancellationToken
+from ..utils.dir_index import DirectoryIndex
+from ..utils.io_scheduler import IOScheduler
 from ..utils.logger import get_logger
 from .action_planner import ActionPlanner
 from .archiver import Archiver
 from .exact_deduper import ExactDeduper
 from .live_photo_matcher import LivePhotoMatcher
+from .plan_optimizer import PlanOptimizer
 from .renamer import Renamer
 from .scanner import FileScanner
 from .screenshot_detector import ScreenshotDetector
@@ -31,17 +35,28 @@ class PipelineResult:
 
 
 class Pipeline:
-    def __init__(self, config: ConfigManager, logger=None) -> None:
+    def __init__(self, config: ConfigManager, logger=None, io_scheduler: IOScheduler | None = None) -> None:
         self.logger = logger or get_logger(self.__class__.__name__)
+        self.io_scheduler = io_scheduler or IOScheduler.from_config(config, self.logger)
         self.scanner = FileScanner(config, self.logger)
         self.thumbnail_detector = ThumbnailDetector(config, self.logger)
-        self.exact_deduper = ExactDeduper(config, self.logger)
+        self.exact_deduper = ExactDeduper(config, self.logger, io_scheduler=self.io_scheduler)
         self.visual_deduper = VisualDeduper(config, self.logger)
         self.live_photo_matcher = LivePhotoMatcher()
         self.renamer = Renamer(config, self.logger)
         self.screenshot_detector = ScreenshotDetector(config, self.logger)
         self.archiver = Archiver(config, self.logger)
         self.action_planner = ActionPlanner(config, self.logger)
+        self.plan_optimizer = PlanOptimizer(config, self.logger)
+
+    def record_executed(self, entries: List[ManifestEntry], output_root: Path) -> None:
+        """Execute 完成後更新跨次執行的索引；只有 output_root 下的 KEEP 視為圖庫。"""
+        updated = self.visual_deduper.record_moves(entries, output_root)
+        if updated:
+            self.logger.info(f"已更新 pHash 索引 {updated} 筆")
+        updated = self.exact_deduper.record_moves(entries, output_root)
+        if updated:
+            self.logger.info(f"已更新圖庫索引 {updated} 筆")
 
     def run_dry_run(
         self,
@@ -54,10 +69,12 @@ class Pipeline:
         stage_callback: Optional[Callable[[str], None]] = None,
         log_callback: Optional[Callable[[str], None]] = None,
         detail_callback: Optional[Callable[[str], None]] = None,
+        progress_event_callback: Optional[Callable[[ProgressEvent], None]] = None,
     ) -> PipelineResult:
         stage_callback = stage_callback or (lambda _message: None)
         log_callback = log_callback or (lambda _message: None)
         detail_callback = detail_callback or (lambda _message: None)
+        cancel_token = EventCancellationToken(cancel_event) if cancel_event is not None else None
 
         weights = {
             "scan": 40,
@@ -104,48 +121,78 @@ class Pipeline:
         log_callback(f"掃描完成，共 {len(results)} 個檔案")
         stage_callback("階段: Thumbnail detection...")
         keepers, thumbnails = self.thumbnail_detector.classify_files(results)
+        for item in keepers:
+            # 縮圖門檻與掃描時不同（例如 GUI 修改設定後）時，快速分類的檔案可能成為保留檔，需補讀完整 metadata
+            self.scanner.load_deferred_metadata(item)
         total_weight += weights["thumb"]
         if progress_callback is not None:
             progress_callback(min(99, total_weight))
         log_callback(f"偵測到 {len(thumbnails)} 個縮圖")
 
         stage_callback("階段: Exact hash dedupe...")
-        dedupe_result = self.exact_deduper.dedupe(
-            keepers,
-            progress_callback=lambda count: update_weighted_progress(
-                weights["exact"],
-                count,
-                len(keepers),
-            ),
-        )
+        try:
+            dedupe_result = self.exact_deduper.dedupe(
+                keepers,
+                progress_callback=lambda count: detail_callback(f"已比對 {count} 個檔案"),
+                bytes_progress_callback=lambda processed, total: update_weighted_progress(
+                    weights["exact"],
+                    processed,
+                    total,
+                ),
+                cancel_token=cancel_token,
+                progress_event_callback=progress_event_callback,
+            )
+        except CancelledError as exc:
+            raise RuntimeError("Cancelled") from exc
         keepers = dedupe_result.keepers
         exact_duplicates = dedupe_result.duplicates
         total_weight += weights["exact"]
         if progress_callback is not None:
             progress_callback(min(99, total_weight))
         log_callback(f"偵測到 {len(exact_duplicates)} 個精確重複檔案")
+        library_matched = {id(match.item) for match in dedupe_result.library_matches}
+        if library_matched:
+            log_callback(f"其中 {len(library_matched)} 個已存在於圖庫")
 
         stage_callback("階段: Visual hash dedupe...")
-        visual_result = self.visual_deduper.dedupe(
-            keepers,
-            progress_callback=lambda count: update_weighted_progress(
-                weights["visual"],
-                count,
-                len(keepers),
-            ),
-        )
+        try:
+            visual_result = self.visual_deduper.dedupe(
+                keepers,
+                progress_callback=lambda count: update_weighted_progress(
+                    weights["visual"],
+                    count,
+                    len(keepers),
+                ),
+                cancel_token=cancel_token,
+            )
+        except CancelledError as exc:
+            raise RuntimeError("Cancelled") from exc
         keepers = visual_result.keepers
         visual_duplicates = visual_result.duplicates
         total_weight += weights["visual"]
         if progress_callback is not None:
             progress_callback(min(99, total_weight))
         log_callback(f"偵測到 {len(visual_duplicates)} 個相似重複檔案")
+        if visual_result.strategy_validation:
+            log_callback(visual_result.strategy_validation)
+        if visual_result.cascade_stats:
+            log_callback(
+                "相似去重各階段: "
+                + ", ".join(f"{name}={value}" for name, value in visual_result.cascade_stats.items())
+            )
+        archive_matched = {id(match.item) for match in visual_result.archive_matches if not match.supersedes}
+        if archive_matched:
+            log_callback(f"其中 {len(archive_matched)} 個與已封存的影像相似")
+        superseding = {id(match.item) for match in visual_result.archive_matches if match.supersedes}
+        if superseding:
+            log_callback(f"{len(superseding)} 個新檔案與已封存的影像相似但品質較好，保留於 KEEP")
 
         stage_callback("階段: Live Photo matching...")
         live_pairs = self.live_photo_matcher.find_live_pairs(keepers)
         log_callback(f"偵測到 {len(live_pairs)} 組 Live Photo 配對")
 
         stage_callback("階段: Screenshot detection...")
+        self.screenshot_detector.prepare()
         screenshot_count = 0
         for item in keepers:
             is_screenshot, evidence = self.screenshot_detector.is_screenshot(item)
@@ -156,6 +203,8 @@ class Pipeline:
         log_callback(f"偵測到 {screenshot_count} 個螢幕截圖")
 
         renamable_keepers = [item for item in keepers if not item.is_screenshot]
+        # 規劃期間不修改檔案系統，重新命名與封存共用同一份資料夾快照
+        directory_index = DirectoryIndex(self.logger)
 
         stage_callback("階段: Renaming...")
         rename_result = self.renamer.generate_plan(
@@ -165,6 +214,7 @@ class Pipeline:
                 count,
                 len(renamable_keepers),
             ),
+            directory_index=directory_index,
         )
         log_callback(f"計畫重新命名 {len(rename_result.plan)} 個檔案")
         total_weight += weights["rename"]
@@ -189,16 +239,36 @@ class Pipeline:
                 count,
                 len(renamed_keepers),
             ),
+            directory_index=directory_index,
         )
+        if superseding:
+            superseding_paths = {
+                rename_map.get(item.path, item.path) for item in keepers if id(item) in superseding
+            }
+            archive_result.plan = [
+                replace(action, reason="ARCHIVE_SUPERSEDES_PHASH")
+                if action.src_path in superseding_paths
+                else action
+                for action in archive_result.plan
+            ]
         log_callback(f"計畫封存 {len(archive_result.plan)} 個檔案")
         total_weight += weights["archive"]
         if progress_callback is not None:
             progress_callback(min(99, total_weight))
 
         duplicates_with_reason = (
-            [(item, "DUPLICATE_HASH") for item in exact_duplicates]
-            + [(item, "DUPLICATE_PHASH") for item in visual_duplicates]
+            [
+                (item, "DUPLICATE_LIBRARY" if id(item) in library_matched else "DUPLICATE_HASH")
+                for item in exact_duplicates
+            ]
+            + [
+                (item, "DUPLICATE_PHASH_ARCHIVE" if id(item) in archive_matched else "DUPLICATE_PHASH")
+                for item in visual_duplicates
+            ]
         )
+        for item in thumbnails:
+            # 快速分類略過的 EXIF 延到產生 manifest/報表前才補讀，讓縮圖的時間戳與完整掃描相同
+            self.scanner.load_deferred_metadata(item)
         plan_result = self.action_planner.generate_plan(
             keepers,
             thumbnails,
@@ -207,12 +277,14 @@ class Pipeline:
             duplicates_with_reason=duplicates_with_reason,
         )
 
-        full_plan = rename_result.plan + archive_result.plan + plan_result.plan
         plan_groups = [
             ("Renaming", rename_result.plan),
             ("Archiving", archive_result.plan),
             ("Moving", plan_result.plan),
         ]
+        if self.plan_optimizer.enabled:
+            plan_groups = self.plan_optimizer.optimize(plan_groups)
+        full_plan = [item for _, plan in plan_groups for item in plan]
 
         total_size = sum(item.size_bytes for item in results)
         thumbnail_size = sum(item.size_bytes for item in thumbnails)
@@ -242,12 +314,18 @@ class Pipeline:
             planned_duplicate_move_count=len(exact_duplicates) + len(visual_duplicates),
             cross_drive_copy=path_utils.is_cross_drive(source_path, output_root),
             no_changes_needed=self.action_planner.is_no_changes_needed(full_plan),
+            visual_stage_counts=visual_result.cascade_stats,
         )
 
         report_dir = reporting.ensure_report_dir(output_root)
-        rename_entries = self.action_planner.build_manifest_entries(rename_result.plan, keepers)
-        archive_entries = self.action_planner.build_manifest_entries(archive_result.plan, renamed_keepers)
-        manifest_entries = rename_entries + archive_entries + plan_result.manifest_entries
+        if self.plan_optimizer.enabled:
+            # 合併後的項目可能跨越原本的群組，依最終計畫重新產生 manifest
+            file_infos = renamed_keepers + keepers + thumbnails + [item for item, _ in duplicates_with_reason]
+            manifest_entries = self.action_planner.build_manifest_entries(full_plan, file_infos)
+        else:
+            rename_entries = self.action_planner.build_manifest_entries(rename_result.plan, keepers)
+            archive_entries = self.action_planner.build_manifest_entries(archive_result.plan, renamed_keepers)
+            manifest_entries = rename_entries + archive_entries + plan_result.manifest_entries
 
         return PipelineResult(
             plan=full_plan,
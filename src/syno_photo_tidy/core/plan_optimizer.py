@@ -0,0 +1,87 @@
+"""計畫最佳化：把同一檔案的連續操作（重新命名→封存、截圖搬移→重新命名）合併為一次搬移。
+
+合併後的項目直接由原始路徑移到最終路徑，省去中間路徑的一次 rename 與 manifest 更新。
+fused_from 記錄被合併的各步驟原因，via_paths 記錄略過的中間路徑，供報表追溯；
+rollback 只需把最終路徑移回原始路徑，與依序反向執行各步驟的結果相同。
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import replace
+from typing import Optional
+
+from ..config import ConfigManager
+from ..models import ActionItem
+from ..utils.logger import get_logger
+
+FUSIBLE_ACTIONS = {"MOVE", "ARCHIVE", "RENAME"}
+
+
+class PlanOptimizer:
+    def __init__(self, config: ConfigManager, logger=None) -> None:
+        self.config = config
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.enabled = bool(config.get("plan.fuse_moves", False))
+
+    def optimize(self, plan_groups: list[tuple[str, list[ActionItem]]]) -> list[tuple[str, list[ActionItem]]]:
+        """依執行順序走訪各群組，後一步的來源若是前一步的目的，就合併到後一步的位置。
+
+        合併項目放在後一步的位置，檔案在此之前都留在原始路徑；群組標籤與其餘項目順序不變。
+        """
+        if not self.enabled:
+            return plan_groups
+
+        slots: list[tuple[int, Optional[ActionItem]]] = []
+        pending_by_dst: dict[str, int] = {}
+        fused_count = 0
+        for group_index, (_, plan) in enumerate(plan_groups):
+            for item in plan:
+                previous_index = pending_by_dst.pop(_path_key(item.src_path), None)
+                if previous_index is not None and _is_fusible(item):
+                    previous = slots[previous_index][1]
+                    slots[previous_index] = (slots[previous_index][0], None)
+                    item = _fuse(previous, item)
+                    fused_count += 1
+                if _is_fusible(item):
+                    pending_by_dst[_path_key(item.dst_path)] = len(slots)
+                slots.append((group_index, item))
+
+        if fused_count:
+            self.logger.info(f"計畫最佳化：合併 {fused_count} 組連續操作")
+        grouped: list[list[ActionItem]] = [[] for _ in plan_groups]
+        for group_index, item in slots:
+            if item is not None:
+                grouped[group_index].append(item)
+        return [(label, grouped[index]) for index, (label, _) in enumerate(plan_groups)]
+
+
+def format_lineage(item: ActionItem) -> tuple[Optional[str], Optional[str]]:
+    """回傳寫入 manifest 的 (fused_from, via_path)；中間路徑以 os.pathsep 分隔。"""
+    if not item.fused_from:
+        return None, None
+    return ">".join(item.fused_from), os.pathsep.join(str(path) for path in item.via_paths)
+
+
+def _is_fusible(item: ActionItem) -> bool:
+    return item.action in FUSIBLE_ACTIONS and item.dst_path is not None
+
+
+def _fuse(previous: ActionItem, item: ActionItem) -> ActionItem:
+    # RENAME 不能跨資料夾，前一步若是搬移，合併後仍須是搬移
+    head = previous if item.action == "RENAME" else item
+    return replace(
+        item,
+        action=head.action,
+        reason=head.reason,
+        src_path=previous.src_path,
+        new_name=item.new_name or previous.new_name,
+        rename_base=item.rename_base or previous.rename_base,
+        src_file=previous.src_file or item.src_file,
+        fused_from=(previous.fused_from or (previous.reason,)) + (item.reason,),
+        via_paths=previous.via_paths + (previous.dst_path,),
+    )
+
+
+def _path_key(path) -> str:
+    return os.path.normcase(str(path))
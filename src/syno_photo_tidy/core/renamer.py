@@ -10,7 +10,10 @@ from typing import Iterable, List
 
 from ..config import ConfigManager
 from ..models import ActionItem, FileInfo
+from ..utils.dir_index import DirectoryIndex
 from ..utils.logger import get_logger
+from ..utils.name_allocator import NameAllocator
+from ..utils.plan_shards import run_shards, shard_by_directory
 
 
 @dataclass
@@ -24,17 +27,25 @@ class Renamer:
         self.config = config
         self.logger = logger or get_logger(self.__class__.__name__)
         self.sequence_digits = max(4, int(config.get("rename.sequence_digits", 4)))
+        workers = int(config.get("plan.workers", 0))
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
 
-    def generate_plan(self, files: Iterable[FileInfo], progress_callback=None) -> RenameResult:
+    def generate_plan(
+        self,
+        files: Iterable[FileInfo],
+        progress_callback=None,
+        directory_index: DirectoryIndex | None = None,
+    ) -> RenameResult:
         items = list(files)
         enabled = bool(self.config.get("enable_rename", self.config.get("rename.enabled", False)))
         if not enabled:
             return RenameResult(plan=[], skipped=items)
+        directory_index = directory_index or DirectoryIndex(self.logger)
 
         sorted_items = sorted(
             items,
             key=lambda item: (
-                item.timestamp_locked,
+                item.timestamp_sort_key,
                 item.path.name.lower(),
                 str(item.path).lower(),
             ),
@@ -44,36 +55,60 @@ class Renamer:
         for item in sorted_items:
             if not item.is_live_pair or not item.pair_id:
                 continue
-            ts = self._parse_timestamp(item.timestamp_locked)
+            ts = item.timestamp_datetime
             if ts is None:
                 continue
             current = pair_time_map.get(item.pair_id)
             if current is None or ts < current:
                 pair_time_map[item.pair_id] = ts
 
-        plan: list[ActionItem] = []
-        skipped: list[FileInfo] = []
-        planned_names: dict[Path, set[str]] = {}
+        # 序號依全域時間順序編排，其餘衝突狀態只與來源資料夾有關，可依資料夾分片規劃
         group_sequence: dict[str, int] = {}
-        seq_counter = 1
-
-        processed = 0
+        sequences: list[int] = []
         for item in sorted_items:
             group_key = item.pair_id if item.is_live_pair and item.pair_id else f"single:{item.path}"
             if group_key not in group_sequence:
-                group_sequence[group_key] = seq_counter
-                seq_counter += 1
-
-            target = self._build_target_path(
-                item,
-                planned_names,
-                sequence=group_sequence[group_key],
-                pair_timestamp=pair_time_map.get(item.pair_id or ""),
-            )
+                group_sequence[group_key] = len(group_sequence) + 1
+            sequences.append(group_sequence[group_key])
+
+        def plan_shard(entries: list[tuple[int, FileInfo]]) -> list[tuple[int, FileInfo, Path | None]]:
+            allocator = NameAllocator(directory_index, digits=4)
+            planned_names: dict[Path, set[str]] = {}
+            return [
+                (
+                    position,
+                    item,
+                    self._build_target_path(
+                        item,
+                        planned_names,
+                        sequence=sequences[position],
+                        pair_timestamp=pair_time_map.get(item.pair_id or ""),
+                        allocator=allocator,
+                    ),
+                )
+                for position, item in entries
+            ]
+
+        processed = 0
+
+        def on_shard_done(results: list[tuple[int, FileInfo, Path | None]]) -> None:
+            nonlocal processed
+            processed += sum(1 for _, _, target in results if target is not None)
+            if progress_callback is not None:
+                progress_callback(processed)
+
+        shards = shard_by_directory((item.path.parent, item) for item in sorted_items)
+        shard_results = run_shards(shards, plan_shard, workers=self.workers, on_shard_done=on_shard_done)
+
+        plan: list[ActionItem] = []
+        skipped: list[FileInfo] = []
+        for _, item, target in sorted(
+            (result for results in shard_results for result in results),
+            key=lambda result: result[0],
+        ):
             if target is None:
                 skipped.append(item)
                 continue
-            rename_base = target.stem
             plan.append(
                 ActionItem(
                     action="RENAME",
@@ -81,13 +116,10 @@ class Renamer:
                     src_path=item.path,
                     dst_path=target,
                     new_name=target.name,
-                    rename_base=rename_base,
+                    rename_base=target.stem,
                     src_file=item,
                 )
             )
-            processed += 1
-            if progress_callback is not None:
-                progress_callback(processed)
         return RenameResult(plan=plan, skipped=skipped)
 
     def _build_target_path(
@@ -97,6 +129,7 @@ class Renamer:
         *,
         sequence: int,
         pair_timestamp: datetime | None,
+        allocator: NameAllocator | None = None,
     ) -> Path | None:
         base = self._build_base_name(item, sequence=sequence, pair_timestamp=pair_timestamp)
         ext = item.path.suffix
@@ -106,7 +139,13 @@ class Renamer:
         candidate = parent / f"{base}{ext.lower()}"
         if self._is_same_path(candidate, item.path):
             return None
-        resolved = self.resolve_name_conflict(parent, candidate.name, planned_names=planned, src_path=item.path)
+        resolved = self.resolve_name_conflict(
+            parent,
+            candidate.name,
+            planned_names=planned,
+            src_path=item.path,
+            allocator=allocator,
+        )
         return resolved
 
     def _build_base_name(
@@ -116,7 +155,7 @@ class Renamer:
         sequence: int,
         pair_timestamp: datetime | None,
     ) -> str:
-        timestamp = pair_timestamp if pair_timestamp is not None else self._parse_timestamp(item.timestamp_locked)
+        timestamp = pair_timestamp if pair_timestamp is not None else item.timestamp_datetime
         if timestamp is None:
             timestamp = datetime(1970, 1, 1, 0, 0, 0)
 
@@ -126,12 +165,6 @@ class Renamer:
 
         return f"{prefix}_{timestamp:%Y%m%d_%H%M%S}_{sequence:0{self.sequence_digits}d}"
 
-    def _parse_timestamp(self, timestamp: str) -> datetime | None:
-        try:
-            return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            return None
-
     def resolve_name_conflict(
         self,
         dst_dir: Path,
@@ -139,23 +172,10 @@ class Renamer:
         *,
         planned_names: set[str],
         src_path: Path,
+        allocator: NameAllocator | None = None,
     ) -> Path:
-        base_path = dst_dir / filename
-        stem = base_path.stem
-        suffix = base_path.suffix
-
-        candidate = base_path
-        index = 0
-        while True:
-            key = os.path.normcase(candidate.name)
-            exists_conflict = candidate.exists() and not self._is_same_path(candidate, src_path)
-            planned_conflict = key in planned_names
-            if not exists_conflict and not planned_conflict:
-                planned_names.add(key)
-                return candidate
-
-            index += 1
-            candidate = dst_dir / f"{stem}_{index:04d}{suffix}"
+        allocator = allocator or NameAllocator(DirectoryIndex(self.logger), digits=4)
+        return allocator.allocate(dst_dir, filename, planned=planned_names, src_path=src_path)
 
     def _is_same_path(self, left: Path, right: Path) -> bool:
         return os.path.normcase(str(left)) == os.path.normcase(str(right))
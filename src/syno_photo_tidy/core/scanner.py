@@ -8,8 +8,9 @@ from typing import Callable, Optional
 
 from ..config import ConfigManager
 from ..models import FileInfo
-from ..utils import file_classifier, image_utils, path_utils, time_utils
+from ..utils import apple_metadata, file_classifier, image_utils, path_utils, time_utils
 from ..utils.logger import get_logger
+from .thumbnail_detector import ThumbnailDetector
 
 
 class FileScanner:
@@ -29,6 +30,12 @@ class FileScanner:
         results: list[FileInfo] = []
         if not root.exists():
             return results
+        # 每次掃描重新讀取縮圖門檻，與之後的縮圖判定使用相同設定
+        thumbnail_detector = (
+            ThumbnailDetector(self.config, self.logger)
+            if bool(self.config.get("thumbnail.fast_classify", False))
+            else None
+        )
 
         processed = 0
         for dirpath, dirnames, filenames in os.walk(root):
@@ -55,7 +62,7 @@ class FileScanner:
                 if not file_path.is_file():
                     continue
 
-                file_info = self._build_file_info(file_path)
+                file_info = self._build_file_info(file_path, thumbnail_detector)
                 if file_info is not None:
                     results.append(file_info)
 
@@ -104,11 +111,33 @@ class FileScanner:
 
         return total
 
-    def _build_file_info(self, path: Path) -> Optional[FileInfo]:
+    def load_deferred_metadata(self, file_info: FileInfo) -> None:
+        """補讀快速分類時略過的 metadata，並以 EXIF 重新鎖定時間戳。"""
+        if not file_info.metadata_deferred:
+            return
+        metadata = image_utils.read_image_metadata(file_info.path, self.logger)
+        file_info.resolution = metadata.resolution
+        file_info.exif_datetime_original = metadata.exif_datetime_original
+        file_info.exif_data = metadata.exif_data
+        file_info.content_identifier = metadata.content_identifier
+        file_info.timestamp_locked, file_info.timestamp_source = time_utils.lock_timestamp(
+            metadata.exif_datetime_original, file_info.windows_created_time
+        )
+        file_info.timestamp_epoch = time_utils.locked_timestamp_to_epoch(file_info.timestamp_locked)
+        file_info.timestamp_valid = file_info.timestamp_epoch is not None
+        file_info.metadata_deferred = False
+
+    def _build_file_info(
+        self,
+        path: Path,
+        thumbnail_detector: Optional[ThumbnailDetector] = None,
+    ) -> Optional[FileInfo]:
         try:
             stat = path.stat()
             size_bytes = stat.st_size
             windows_created_time = stat.st_ctime
+            device_id = stat.st_dev
+            inode = stat.st_ino
         except OSError as exc:
             self.logger.warning(f"無法讀取檔案資訊: {path} ({exc})")
             return None
@@ -116,11 +145,26 @@ class FileScanner:
         ext = path.suffix.lower()
         drive_letter = (path.drive or path.anchor).upper()
 
-        resolution = image_utils.get_image_resolution(path, self.logger)
-        exif_datetime_original = image_utils.get_exif_datetime_original(path, self.logger)
-        exif_data = image_utils.get_exif_data_map(path, self.logger)
+        if thumbnail_detector is not None and size_bytes <= thumbnail_detector.max_size_kb * 1000:
+            file_info = self._build_thumbnail_candidate(
+                path,
+                thumbnail_detector,
+                size_bytes=size_bytes,
+                ext=ext,
+                drive_letter=drive_letter,
+                windows_created_time=windows_created_time,
+                device_id=device_id,
+                inode=inode,
+            )
+            if file_info is not None:
+                return file_info
+
+        metadata = image_utils.read_image_metadata(path, self.logger)
+        content_identifier = metadata.content_identifier
+        if ext in apple_metadata.QUICKTIME_EXTS:
+            content_identifier = apple_metadata.read_quicktime_content_identifier(path)
         timestamp_locked, timestamp_source = time_utils.lock_timestamp(
-            exif_datetime_original, windows_created_time
+            metadata.exif_datetime_original, windows_created_time
         )
         scan_machine_timezone = time_utils.get_scan_timezone()
 
@@ -129,13 +173,54 @@ class FileScanner:
             size_bytes=size_bytes,
             ext=ext,
             drive_letter=drive_letter,
-            resolution=resolution,
-            exif_datetime_original=exif_datetime_original,
+            resolution=metadata.resolution,
+            exif_datetime_original=metadata.exif_datetime_original,
             windows_created_time=windows_created_time,
             timestamp_locked=timestamp_locked,
             timestamp_source=timestamp_source,
             scan_machine_timezone=scan_machine_timezone,
-            exif_data=exif_data,
+            exif_data=metadata.exif_data,
+            content_identifier=content_identifier,
+            device_id=device_id,
+            inode=inode,
         )
         file_info.file_type = file_classifier.classify_file_type(file_info, self.config)
         return file_info
+
+    def _build_thumbnail_candidate(
+        self,
+        path: Path,
+        thumbnail_detector: ThumbnailDetector,
+        *,
+        size_bytes: int,
+        ext: str,
+        drive_letter: str,
+        windows_created_time: float,
+        device_id: int,
+        inode: int,
+    ) -> Optional[FileInfo]:
+        """小檔案只讀取尺寸；確定是縮圖時略過 EXIF，否則回傳 None 改走完整讀取。"""
+        timestamp_locked, timestamp_source = time_utils.lock_timestamp(None, windows_created_time)
+        file_info = FileInfo(
+            path=path,
+            size_bytes=size_bytes,
+            ext=ext,
+            drive_letter=drive_letter,
+            resolution=None,
+            exif_datetime_original=None,
+            windows_created_time=windows_created_time,
+            timestamp_locked=timestamp_locked,
+            timestamp_source=timestamp_source,
+            scan_machine_timezone=time_utils.get_scan_timezone(),
+            exif_data={},
+            device_id=device_id,
+            inode=inode,
+            metadata_deferred=True,
+        )
+        file_info.file_type = file_classifier.classify_file_type(file_info, self.config)
+        if file_info.file_type != "IMAGE":
+            return None
+        file_info.resolution = image_utils.read_image_size(path)
+        if file_info.resolution is None or not thumbnail_detector.is_thumbnail(file_info):
+            return None
+        return file_info
@@ -2,22 +2,40 @@
 
 from __future__ import annotations
 
-from fnmatch import fnmatch
-
-from PIL import Image
+from fnmatch import translate
+import re
+from typing import Iterator, Optional
 
 from ..config import ConfigManager
 from ..models import FileInfo
 from ..utils.logger import get_logger
+from ..utils.png_text import read_png_text
 
 
 class ScreenshotDetector:
     def __init__(self, config: ConfigManager, logger=None) -> None:
         self.config = config
         self.logger = logger or get_logger(self.__class__.__name__)
+        self.prepare()
+
+    def prepare(self) -> None:
+        """讀取設定並編譯關鍵字與檔名樣式；每次執行開始時呼叫一次，之後逐檔判定不再讀取設定。"""
+        self.mode = str(self.config.get("screenshot_detection_mode", "strict")).lower()
+        keywords = self.config.get("screenshot_metadata_keywords", ["screenshot"])
+        self.keywords = [keyword for keyword in (str(item).lower() for item in keywords) if keyword]
+        self.keyword_regex = (
+            re.compile("|".join(re.escape(keyword) for keyword in self.keywords)) if self.keywords else None
+        )
+        self.patterns = [
+            (str(pattern), re.compile(translate(str(pattern).lower())))
+            for pattern in self.config.get("screenshot_filename_patterns", ["*Screenshot*", "*螢幕截圖*"])
+        ]
+        self.pattern_regex = (
+            re.compile("|".join(f"(?:{compiled.pattern})" for _, compiled in self.patterns)) if self.patterns else None
+        )
 
     def is_screenshot(self, file_info: FileInfo, mode: str | None = None) -> tuple[bool, str | None]:
-        resolved_mode = (mode or self.config.get("screenshot_detection_mode", "strict")).lower()
+        resolved_mode = mode.lower() if mode else self.mode
 
         evidence = self.detect_from_metadata(file_info)
         if evidence:
@@ -31,36 +49,41 @@ class ScreenshotDetector:
         return False, None
 
     def detect_from_metadata(self, file_info: FileInfo) -> str | None:
-        keywords = [
-            str(item).lower() for item in self.config.get("screenshot_metadata_keywords", ["screenshot"])
-        ]
-        text_parts: list[str] = []
+        if self.keyword_regex is None:
+            return None
+        text_blob = " | ".join(self._metadata_texts(file_info)).lower()
+        # 單一正規表示式負責快速排除；命中時依設定順序回報整份 metadata 中出現的第一個關鍵字
+        if self.keyword_regex.search(text_blob) is None:
+            return None
+        for keyword in self.keywords:
+            if keyword in text_blob:
+                return f"metadata_keyword_match:{keyword}"
+        return None
+
+    def detect_from_filename(self, file_info: FileInfo) -> str | None:
+        if self.pattern_regex is None:
+            return None
+        name = file_info.path.name.lower()
+        if self.pattern_regex.match(name) is None:
+            return None
+        for pattern, compiled in self.patterns:
+            if compiled.match(name):
+                return f"filename_pattern_match:{pattern}"
+        return None
 
+    def _metadata_texts(self, file_info: FileInfo) -> Iterator[str]:
+        """依序產生 EXIF 與 PNG 文字 chunk 的 "key=value"。"""
         if file_info.exif_data:
             for key, value in file_info.exif_data.items():
                 if value:
-                    text_parts.append(f"{key}={value}")
+                    yield f"{key}={value}"
 
         if file_info.ext.lower() == ".png":
+            texts: Optional[dict[str, str]] = None
             try:
-                with Image.open(file_info.path) as image:
-                    info = getattr(image, "info", {}) or {}
-                    for key, value in info.items():
-                        if value:
-                            text_parts.append(f"{key}={value}")
-            except Exception as exc:
+                texts = read_png_text(file_info.path)
+            except (OSError, ValueError) as exc:
                 self.logger.warning("讀取 PNG metadata 失敗: %s (%s)", file_info.path, exc)
-
-        text_blob = " | ".join(text_parts).lower()
-        for keyword in keywords:
-            if keyword and keyword in text_blob:
-                return f"metadata_keyword_match:{keyword}"
-        return None
-
-    def detect_from_filename(self, file_info: FileInfo) -> str | None:
-        patterns = self.config.get("screenshot_filename_patterns", ["*Screenshot*", "*螢幕截圖*"])
-        name = file_info.path.name
-        for pattern in patterns:
-            if fnmatch(name.lower(), str(pattern).lower()):
-                return f"filename_pattern_match:{pattern}"
-        return None
+            for key, value in (texts or {}).items():
+                if value:
+                    yield f"{key}={value}"
@@ -2,12 +2,22 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, List
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import sqlite3
+import sys
+from typing import Iterable, List, Optional
 
 from ..config import ConfigManager
-from ..models import FileInfo
-from ..utils import image_utils
+from ..models import FileInfo, ManifestEntry
+from ..utils import hamming_index, image_utils, path_utils, phash_clustering
+from ..utils.cancel import CancelledError, CancellationToken
+from ..utils.hamming_index import BKTree, hash_to_int
+from ..utils.phash_index import FileSignature, IndexedHash, PhashIndex
 from ..utils.logger import get_logger
 
 
@@ -18,55 +28,175 @@ class VisualDedupeGroup:
     duplicates: List[FileInfo]
 
 
+@dataclass(frozen=True)
+class _HashSpec:
+    kind: str
+    source: str
+    draft_size: Optional[int]
+
+    @property
+    def params(self) -> str:
+        return f"{self.kind}:{self.source}:{self.draft_size or 0}"
+
+
+@dataclass
+class ArchiveMatch:
+    item: FileInfo
+    reference_path: Path
+    distance: int
+    # 新檔案解析度或大小優於已封存影像時為 True：新檔案留在 KEEP，不視為重複
+    supersedes: bool = False
+
+
 @dataclass
 class VisualDedupeResult:
     keepers: List[FileInfo]
     duplicates: List[FileInfo]
     groups: List[VisualDedupeGroup]
+    archive_matches: List[ArchiveMatch] = field(default_factory=list)
+    strategy_validation: Optional[str] = None
+    cascade_stats: dict[str, int] = field(default_factory=dict)
 
 
 class VisualDeduper:
+    ENGINES = {"numpy", "bktree"}
+    SOURCES = {"full", "exif_thumbnail"}
+    CANDIDATE_STRATEGIES = {"exhaustive", "time_window"}
+    PREFILTER_HASHES = {"ahash", "dhash"}
+    CONFIRM_HASHES = {"phash", "whash"}
+    CLUSTERINGS = {"greedy", "union_find"}
+
     def __init__(self, config: ConfigManager, logger=None) -> None:
         self.logger = logger or get_logger(self.__class__.__name__)
         self.threshold = int(config.get("phash.threshold", 8))
+        self.engine = str(config.get("phash.engine", "numpy")).lower()
+        if self.engine not in self.ENGINES:
+            self.engine = "numpy"
+        self.block_size = int(config.get("phash.block_size", hamming_index.DEFAULT_BLOCK_SIZE))
+        workers = int(config.get("phash.workers", 1))
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        draft_size = int(config.get("phash.draft_size", 128))
+        self.draft_size = draft_size if bool(config.get("phash.draft_decode", True)) and draft_size > 0 else None
+        self.source = str(config.get("phash.source", "full")).lower()
+        if self.source not in self.SOURCES:
+            self.source = "full"
+        self.verify_sample = max(0, int(config.get("phash.verify_sample", 0)))
+        self.index_path = str(config.get("phash.index_path", "") or "").strip()
+        self.match_archive = bool(config.get("phash.match_archive", False))
+        self.archive_root_folder = str(config.get("archive.root_folder", "KEEP"))
+        self.candidate_strategy = str(config.get("phash.candidate_strategy", "exhaustive")).lower()
+        if self.candidate_strategy not in self.CANDIDATE_STRATEGIES:
+            self.candidate_strategy = "exhaustive"
+        self.time_window_sec = max(0, int(config.get("phash.time_window_sec", 600)))
+        self.validate_strategy = bool(config.get("phash.validate_strategy", False))
+        self.cascade = bool(config.get("phash.cascade", False))
+        self.prefilter_hash = str(config.get("phash.prefilter_hash", "dhash")).lower()
+        if self.prefilter_hash not in self.PREFILTER_HASHES:
+            self.prefilter_hash = "dhash"
+        self.prefilter_threshold = int(config.get("phash.prefilter_threshold", 12))
+        prefilter_draft_size = int(config.get("phash.prefilter_draft_size", 32))
+        self.prefilter_draft_size = (
+            prefilter_draft_size
+            if bool(config.get("phash.draft_decode", True)) and prefilter_draft_size > 0
+            else None
+        )
+        self.confirm_hash = str(config.get("phash.confirm_hash", "phash")).lower()
+        if self.confirm_hash not in self.CONFIRM_HASHES:
+            self.confirm_hash = "phash"
+        self.clustering = str(config.get("phash.clustering", "greedy")).lower()
+        if self.clustering not in self.CLUSTERINGS:
+            self.clustering = "greedy"
+        max_diameter = int(config.get("phash.max_diameter", 0))
+        self.max_diameter = max_diameter if max_diameter > 0 else None
+        if self.clustering == "union_find" and self.candidate_strategy == "time_window":
+            self.logger.warning("phash.clustering=union_find 不套用 time_window，改為與所有影像比較")
 
     def dedupe(
         self,
         files: Iterable[FileInfo],
         progress_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
     ) -> VisualDedupeResult:
         keepers: List[FileInfo] = []
         duplicates: List[FileInfo] = []
         groups: List[VisualDedupeGroup] = []
 
-        hashed_items: list[tuple[FileInfo, object]] = []
-        processed = 0
+        images: list[FileInfo] = []
         for item in files:
             if item.file_type != "IMAGE":
                 keepers.append(item)
                 continue
-            phash = image_utils.compute_phash(item.path, self.logger)
-            if phash is None:
+            images.append(item)
+
+        if self.clustering == "union_find":
+            # 遞移分群不依賴輸入順序，先依路徑排序讓群組與 keeper 的輸出順序也固定
+            images.sort(key=lambda item: str(item.path))
+
+        if self.cascade:
+            return self._dedupe_cascade(images, keepers, progress_callback, cancel_token)
+
+        source = self.source
+        references: list[IndexedHash] = []
+        index = self._open_index()
+        try:
+            keys_by_image = self._compute_keys(images, progress_callback, cancel_token, self._phash_spec(source), index)
+            if self.verify_sample and (self.draft_size is not None or source != "full"):
+                distances = self.measure_source_drift(
+                    [(item, key) for item, key in zip(images, keys_by_image) if key is not None]
+                )
+                if source != "full" and distances and max(distances) > self.threshold // 2:
+                    self.logger.warning("EXIF 縮圖 pHash 與原圖偏差過大，改用原圖重新計算")
+                    source = "full"
+                    keys_by_image = self._compute_keys(images, None, cancel_token, self._phash_spec(source), index)
+            if index is not None and self.match_archive:
+                references = self._load_references(index, source, images)
+        finally:
+            if index is not None:
+                index.close()
+
+        hashed_items: list[tuple[FileInfo, int]] = []
+        for item, key in zip(images, keys_by_image):
+            if key is None:
                 keepers.append(item)
                 continue
-            hashed_items.append((item, phash))
-            processed += 1
-            if progress_callback is not None:
-                progress_callback(processed)
+            hashed_items.append((item, key))
 
-        raw_groups: list[list[tuple[FileInfo, object]]] = []
-        for item, phash in hashed_items:
-            matched = False
-            for group in raw_groups:
-                if (phash - group[0][1]) <= self.threshold:
-                    group.append((item, phash))
-                    matched = True
-                    break
-            if not matched:
-                raw_groups.append([(item, phash)])
-
-        for group in raw_groups:
-            items = [entry[0] for entry in group]
+        archive_matches: list[ArchiveMatch] = []
+        if references:
+            hashed_items, archive_matches = self._match_references(hashed_items, references)
+            duplicates.extend(match.item for match in archive_matches if not match.supersedes)
+
+        keys = [key for _item, key in hashed_items]
+        strategy_validation = None
+        if self.clustering == "union_find":
+            assignment = self._assign_clusters(keys)
+        elif self.candidate_strategy == "time_window":
+            times = [self._capture_epoch(item) for item, _key in hashed_items]
+            assignment = self._assign_groups_time_window(keys, times)
+            if self.validate_strategy:
+                strategy_validation = self._validate_against_exhaustive(assignment, keys)
+        else:
+            assignment = self._assign_groups(keys)
+        groups = self._build_groups(hashed_items, assignment, keepers, duplicates)
+
+        return VisualDedupeResult(
+            keepers=keepers,
+            duplicates=duplicates,
+            groups=groups,
+            archive_matches=archive_matches,
+            strategy_validation=strategy_validation,
+        )
+
+    def _build_groups(
+        self,
+        hashed_items: list[tuple[FileInfo, int]],
+        assignment: list[list[int]],
+        keepers: List[FileInfo],
+        duplicates: List[FileInfo],
+    ) -> List[VisualDedupeGroup]:
+        groups: List[VisualDedupeGroup] = []
+        for members in assignment:
+            items = [hashed_items[position][0] for position in members]
             if len(items) == 1:
                 keepers.extend(items)
                 continue
@@ -77,20 +207,454 @@ class VisualDeduper:
             duplicates.extend(duplicates_in_group)
             groups.append(
                 VisualDedupeGroup(
-                    hash_value=str(group[0][1]),
+                    hash_value=f"{hashed_items[members[0]][1]:016x}",
                     keeper=keeper,
                     duplicates=duplicates_in_group,
                 )
             )
+        return groups
+
+    def _dedupe_cascade(
+        self,
+        images: list[FileInfo],
+        keepers: List[FileInfo],
+        progress_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> VisualDedupeResult:
+        """先以縮小解碼的 ahash/dhash 產生候選配對，只對有候選的影像計算 pHash/whash 確認。"""
+        duplicates: List[FileInfo] = []
+        prefilter_spec = _HashSpec(self.prefilter_hash, self.source, self.prefilter_draft_size)
+        confirm_spec = _HashSpec(self.confirm_hash, self.source, self.draft_size)
+        index = self._open_index()
+        try:
+            # 索引每個檔案只存一組 key，留給較昂貴的確認階段使用
+            cheap_keys = self._compute_keys(images, progress_callback, cancel_token, prefilter_spec)
+            prefiltered = [(item, key) for item, key in zip(images, cheap_keys) if key is not None]
+            keepers.extend(item for item, key in zip(images, cheap_keys) if key is None)
+
+            candidates = self._earlier_neighbors([key for _item, key in prefiltered], self.prefilter_threshold)
+            involved = sorted(
+                {position for position, others in enumerate(candidates) if others}
+                | {other for others in candidates for other in others}
+            )
+            confirm_keys: dict[int, Optional[int]] = dict(
+                zip(
+                    involved,
+                    self._compute_keys(
+                        [prefiltered[position][0] for position in involved],
+                        None,
+                        cancel_token,
+                        confirm_spec,
+                        index,
+                    ),
+                )
+            )
+        finally:
+            if index is not None:
+                index.close()
+
+        confirmed: list[list[int]] = []
+        for position, others in enumerate(candidates):
+            key = confirm_keys.get(position)
+            matched: list[int] = []
+            if key is not None:
+                for other in others:
+                    other_key = confirm_keys.get(other)
+                    if other_key is not None and hamming_index.hamming_distance(key, other_key) <= self.threshold:
+                        matched.append(other)
+            confirmed.append(matched)
+
+        total_pairs = len(prefiltered) * (len(prefiltered) - 1) // 2
+        candidate_pairs = sum(len(others) for others in candidates)
+        confirmed_pairs = sum(len(others) for others in confirmed)
+        stats = {
+            "images": len(prefiltered),
+            "pairs": total_pairs,
+            f"{self.prefilter_hash}_eliminated": total_pairs - candidate_pairs,
+            "candidate_pairs": candidate_pairs,
+            f"{self.confirm_hash}_computed": len(involved),
+            f"{self.confirm_hash}_eliminated": candidate_pairs - confirmed_pairs,
+            "confirmed_pairs": confirmed_pairs,
+        }
+        self.logger.info("相似去重 cascade: " + ", ".join(f"{name}={value}" for name, value in stats.items()))
+
+        hashed_items = [
+            (item, confirm_keys.get(position) if confirm_keys.get(position) is not None else key)
+            for position, (item, key) in enumerate(prefiltered)
+        ]
+        if self.clustering == "union_find":
+            assignment = phash_clustering.cluster(
+                [key for _item, key in hashed_items],
+                confirmed,
+                max_diameter=self.max_diameter,
+            )
+        else:
+            assignment = self._replay_greedy(confirmed)
+        groups = self._build_groups(hashed_items, assignment, keepers, duplicates)
+        return VisualDedupeResult(keepers=keepers, duplicates=duplicates, groups=groups, cascade_stats=stats)
+
+    def _earlier_neighbors(self, keys: list[int], radius: int) -> list[list[int]]:
+        if self.engine == "numpy":
+            try:
+                return hamming_index.earlier_neighbors(keys, radius, block_size=self.block_size)
+            except ImportError as exc:
+                self.logger.warning(f"numpy 無法使用，改用 BK-tree: {exc}")
+        return hamming_index.earlier_neighbors_bktree(keys, radius)
+
+    def record_moves(self, entries: Iterable[ManifestEntry], output_root: Path) -> int:
+        """Execute 完成後把搬移結果寫回 pHash 索引；只有 output_root 下的 KEEP 標記為封存。"""
+        if not self.index_path:
+            return 0
+        keep_root = output_root / self.archive_root_folder
+        moves = [
+            (Path(entry.src_path), Path(entry.dst_path), path_utils.is_within(Path(entry.dst_path), keep_root))
+            for entry in entries
+            if entry.dst_path
+        ]
+        if not moves:
+            return 0
+        index = self._open_index()
+        if index is None:
+            return 0
+        with index:
+            return index.record_moves(moves)
+
+    def _open_index(self) -> Optional[PhashIndex]:
+        if not self.index_path:
+            return None
+        try:
+            return PhashIndex(Path(self.index_path), self.logger)
+        except (sqlite3.Error, OSError) as exc:
+            self.logger.warning(f"無法開啟 pHash 索引，改為完整計算: {self.index_path} ({exc})")
+            return None
+
+    def _phash_spec(self, source: str) -> _HashSpec:
+        return _HashSpec("phash", source, self.draft_size)
+
+    def _load_references(
+        self,
+        index: PhashIndex,
+        source: str,
+        images: list[FileInfo],
+    ) -> list[IndexedHash]:
+        scanned = {
+            (item.device_id, item.inode) for item in images if item.device_id is not None and item.inode
+        }
+        scanned_paths = {item.path for item in images}
+        references = [
+            entry
+            for entry in index.archived_entries(self._phash_spec(source).params)
+            if (entry.signature.device_id, entry.signature.inode) not in scanned
+            and entry.path not in scanned_paths
+        ]
+        if references:
+            self.logger.info(f"與已封存的 {len(references)} 個影像比對")
+        return references
+
+    def _match_references(
+        self,
+        hashed_items: list[tuple[FileInfo, int]],
+        references: list[IndexedHash],
+    ) -> tuple[list[tuple[FileInfo, int]], list[ArchiveMatch]]:
+        """與已封存影像相近的檔案依 keeper 規則（解析度、再來是檔案大小）與封存影像比較。
+
+        封存影像較好或相同時，新檔案視為重複，不再參與本次分組；新檔案較好時標記為 supersedes，
+        仍參與本次分組。封存影像的解析度只在有相近檔案時才讀取檔頭取得。
+        """
+        tree: BKTree[int] = BKTree()
+        for position, reference in enumerate(references):
+            tree.add(reference.key, position)
+        reference_scores: dict[int, tuple[int, int]] = {}
+        remaining: list[tuple[FileInfo, int]] = []
+        matches: list[ArchiveMatch] = []
+        for item, key in hashed_items:
+            best = min(tree.query(key, self.threshold), default=None)
+            if best is None:
+                remaining.append((item, key))
+                continue
+            distance, position = best
+            reference = references[position]
+            if position not in reference_scores:
+                resolution = image_utils.read_image_size(reference.path, self.logger)
+                reference_scores[position] = self._quality(resolution, reference.signature.size_bytes)
+            supersedes = self._quality(item.resolution, item.size_bytes) > reference_scores[position]
+            matches.append(
+                ArchiveMatch(item=item, reference_path=reference.path, distance=distance, supersedes=supersedes)
+            )
+            if supersedes:
+                remaining.append((item, key))
+        return remaining, matches
+
+    def _compute_keys(
+        self,
+        items: list[FileInfo],
+        progress_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        spec: Optional[_HashSpec] = None,
+        index: Optional[PhashIndex] = None,
+    ) -> list[Optional[int]]:
+        """計算每個影像的感知 hash 整數（失敗為 None），結果順序與輸入相同；有索引時只計算新增或變更的檔案。"""
+        spec = spec or self._phash_spec(self.source)
+        if index is None:
+            return self._hash_images(items, progress_callback, cancel_token, spec)
+
+        params = spec.params
+        signatures = [FileSignature.from_path(item.path) for item in items]
+        keys: list[Optional[int]] = [None] * len(items)
+        missing: list[int] = []
+        for position, signature in enumerate(signatures):
+            cached = index.lookup(signature, params) if signature is not None else None
+            if cached is None:
+                missing.append(position)
+            else:
+                keys[position] = cached
+
+        cached_count = len(items) - len(missing)
+        if cached_count:
+            self.logger.info(f"{spec.kind} 索引命中 {cached_count} 個，需計算 {len(missing)} 個")
+            if progress_callback is not None:
+                progress_callback(cached_count)
+        computed = self._hash_images(
+            [items[position] for position in missing],
+            (lambda count: progress_callback(cached_count + count)) if progress_callback is not None else None,
+            cancel_token,
+            spec,
+        )
+        new_entries = []
+        for position, key in zip(missing, computed):
+            keys[position] = key
+            signature = signatures[position]
+            if key is not None and signature is not None:
+                new_entries.append((items[position].path, signature, key))
+        if new_entries:
+            index.store_many(new_entries, params)
+        return keys
+
+    def _hash_images(
+        self,
+        items: list[FileInfo],
+        progress_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        spec: Optional[_HashSpec] = None,
+    ) -> list[Optional[int]]:
+        spec = spec or self._phash_spec(self.source)
+        if self.workers > 1 and len(items) > 1:
+            try:
+                return self._hash_images_parallel(items, progress_callback, cancel_token, spec)
+            except (BrokenProcessPool, OSError) as exc:
+                self.logger.warning(f"無法使用多行程計算 pHash，改為單行程: {exc}")
+        keys: list[Optional[int]] = []
+        for processed, item in enumerate(items, start=1):
+            if cancel_token is not None and cancel_token.is_cancelled():
+                raise CancelledError("已取消 pHash 計算")
+            key, error = image_utils.compute_image_hash_value(str(item.path), spec.draft_size, spec.source, spec.kind)
+            if error is not None:
+                self.logger.warning(error)
+            keys.append(key)
+            if progress_callback is not None:
+                progress_callback(processed)
+        return keys
+
+    def _hash_images_parallel(
+        self,
+        items: list[FileInfo],
+        progress_callback=None,
+        cancel_token: Optional[CancellationToken] = None,
+        spec: Optional[_HashSpec] = None,
+    ) -> list[Optional[int]]:
+        spec = spec or self._phash_spec(self.source)
+        keys: list[Optional[int]] = [None] * len(items)
+        # 只保留有限數量的進行中工作，取消時不必等待整批排隊的工作
+        max_pending = self.workers * 4
+        pending: dict[Future, int] = {}
+        next_index = 0
+        processed = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                while next_index < len(items) or pending:
+                    if cancel_token is not None and cancel_token.is_cancelled():
+                        raise CancelledError("已取消 pHash 計算")
+                    while next_index < len(items) and len(pending) < max_pending:
+                        future = executor.submit(
+                            image_utils.compute_image_hash_value,
+                            str(items[next_index].path),
+                            spec.draft_size,
+                            spec.source,
+                            spec.kind,
+                        )
+                        pending[future] = next_index
+                        next_index += 1
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = pending.pop(future)
+                        key, error = future.result()
+                        if error is not None:
+                            self.logger.warning(error)
+                        keys[index] = key
+                        processed += 1
+                        if progress_callback is not None:
+                            progress_callback(processed)
+            except CancelledError:
+                for future in pending:
+                    future.cancel()
+                raise
+        return keys
+
+    def measure_source_drift(self, hashed_items: list[tuple[FileInfo, int]]) -> list[int]:
+        """抽樣以原圖完整解碼重算 pHash，回傳與快速路徑（縮小解碼、EXIF 縮圖）的
+        Hamming 距離並記錄摘要。"""
+        if not hashed_items or not self.verify_sample:
+            return []
+        count = min(self.verify_sample, len(hashed_items))
+        # 平均分布抽樣，結果可重現
+        positions = sorted({index * len(hashed_items) // count for index in range(count)})
+        distances: list[int] = []
+        for position in positions:
+            item, key = hashed_items[position]
+            phash = image_utils.compute_phash(item.path, self.logger)
+            if phash is None:
+                continue
+            distances.append(hamming_index.hamming_distance(key, hash_to_int(phash)))
+        if distances:
+            over = sum(1 for distance in distances if distance > self.threshold // 2)
+            self.logger.info(
+                f"pHash 來源偏差驗證：樣本 {len(distances)}，"
+                f"平均 {sum(distances) / len(distances):.2f}，最大 {max(distances)}，"
+                f"超過門檻一半 ({self.threshold // 2}) 的有 {over} 個"
+            )
+        return distances
+
+    def _assign_groups(self, keys: list[int]) -> list[list[int]]:
+        """依原本的貪婪規則分組：每個 hash 加入最早建立、且與群組代表（第一個成員）
+        距離不超過門檻的群組，否則自成新群組。回傳各群組成員的索引。"""
+        if self.engine == "numpy":
+            try:
+                return self._assign_groups_numpy(keys)
+            except ImportError as exc:
+                self.logger.warning(f"numpy 無法使用，改用 BK-tree: {exc}")
+        return self._assign_groups_bktree(keys)
+
+    def _assign_clusters(self, keys: list[int]) -> list[list[int]]:
+        """以 union-find 遞移分群：A~B、B~C 時三者同群（可用 max_diameter 限制群內最大距離）。"""
+        neighbors = None
+        if self.engine == "numpy":
+            try:
+                neighbors = phash_clustering.neighbor_graph(
+                    keys,
+                    self.threshold,
+                    block_size=self.block_size,
+                    workers=self.workers,
+                )
+            except ImportError as exc:
+                self.logger.warning(f"numpy 無法使用，改用 BK-tree: {exc}")
+        if neighbors is None:
+            neighbors = hamming_index.earlier_neighbors_bktree(keys, self.threshold)
+        return phash_clustering.cluster(keys, neighbors, max_diameter=self.max_diameter)
+
+    def _assign_groups_bktree(self, keys: list[int]) -> list[list[int]]:
+        groups: list[list[int]] = []
+        index: BKTree[int] = BKTree()
+        for position, key in enumerate(keys):
+            group_index = min(
+                (value for _distance, value in index.query(key, self.threshold)),
+                default=None,
+            )
+            if group_index is None:
+                index.add(key, len(groups))
+                groups.append([position])
+            else:
+                groups[group_index].append(position)
+        return groups
+
+    def _assign_groups_numpy(self, keys: list[int]) -> list[list[int]]:
+        return self._replay_greedy(
+            hamming_index.earlier_neighbors(keys, self.threshold, block_size=self.block_size)
+        )
+
+    def _replay_greedy(self, neighbors: list[list[int]]) -> list[list[int]]:
+        """由每個索引之前的相近索引（遞增排序）重現貪婪分組。"""
+        groups: list[list[int]] = []
+        group_of_representative: dict[int, int] = {}
+        for position, candidates in enumerate(neighbors):
+            # 群組依代表的索引順序建立，第一個是代表的候選即為最早的群組
+            group_index = next(
+                (group_of_representative[other] for other in candidates if other in group_of_representative),
+                None,
+            )
+            if group_index is None:
+                group_of_representative[position] = len(groups)
+                groups.append([position])
+            else:
+                groups[group_index].append(position)
+        return groups
 
-        return VisualDedupeResult(keepers=keepers, duplicates=duplicates, groups=groups)
+    def _capture_epoch(self, item: FileInfo) -> Optional[int]:
+        if item.timestamp_source == "unknown":
+            return None
+        return item.timestamp_epoch
+
+    def _assign_groups_time_window(self, keys: list[int], times: list[Optional[int]]) -> list[list[int]]:
+        """與貪婪規則相同，但只與拍攝時間相差 time_window_sec 內的群組代表比較；
+        時間未知的檔案與所有群組比較，時間未知的代表也開放給所有檔案比較。"""
+        groups: list[list[int]] = []
+        representative_keys: list[int] = []
+        timed_representatives: list[tuple[int, int]] = []
+        untimed_representatives: BKTree[int] = BKTree()
+        all_representatives: BKTree[int] = BKTree()
+        for position, (key, moment) in enumerate(zip(keys, times)):
+            if moment is None:
+                candidates = [value for _distance, value in all_representatives.query(key, self.threshold)]
+            else:
+                low = bisect_left(timed_representatives, (moment - self.time_window_sec, -1))
+                high = bisect_right(timed_representatives, (moment + self.time_window_sec, sys.maxsize))
+                candidates = [
+                    group_index
+                    for _moment, group_index in timed_representatives[low:high]
+                    if hamming_index.hamming_distance(key, representative_keys[group_index]) <= self.threshold
+                ]
+                candidates.extend(
+                    value for _distance, value in untimed_representatives.query(key, self.threshold)
+                )
+            if candidates:
+                groups[min(candidates)].append(position)
+                continue
+            group_index = len(groups)
+            groups.append([position])
+            representative_keys.append(key)
+            all_representatives.add(key, group_index)
+            if moment is None:
+                untimed_representatives.add(key, group_index)
+            else:
+                insort(timed_representatives, (moment, group_index))
+        return groups
+
+    def _validate_against_exhaustive(self, assignment: list[list[int]], keys: list[int]) -> str:
+        exhaustive = self._assign_groups(keys)
+
+        def grouped(groups: list[list[int]]) -> set[int]:
+            return {position for members in groups if len(members) > 1 for position in members}
+
+        def duplicate_count(groups: list[list[int]]) -> int:
+            return sum(len(members) - 1 for members in groups if len(members) > 1)
+
+        missed = len(grouped(exhaustive) - grouped(assignment))
+        summary = (
+            f"候選策略驗證：時間窗 {sum(1 for members in assignment if len(members) > 1)} 組／"
+            f"{duplicate_count(assignment)} 個重複；完整比對 "
+            f"{sum(1 for members in exhaustive if len(members) > 1)} 組／{duplicate_count(exhaustive)} 個重複；"
+            f"僅完整比對歸入群組的檔案 {missed} 個"
+        )
+        self.logger.info(summary)
+        return summary
+
+    @staticmethod
+    def _quality(resolution: Optional[tuple[int, int]], size_bytes: int) -> tuple[int, int]:
+        area = resolution[0] * resolution[1] if resolution else 0
+        return (area, size_bytes)
 
     def _select_keeper(self, items: List[FileInfo]) -> FileInfo:
         def score(item: FileInfo) -> tuple[int, int, str]:
-            if item.resolution:
-                area = item.resolution[0] * item.resolution[1]
-            else:
-                area = 0
-            return (-area, -item.size_bytes, str(item.path))
+            area, size_bytes = self._quality(item.resolution, item.size_bytes)
+            return (-area, -size_bytes, str(item.path))
 
         return sorted(items, key=score)[0]
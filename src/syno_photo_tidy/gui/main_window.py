@@ -24,6 +24,7 @@ from ..core import (
 )
 from ..utils import reporting, time_utils
 from ..utils.cancel import CancellationToken
+from ..utils.io_scheduler import IOScheduler
 from ..utils.logger import get_logger
 from .settings_panel import SettingsPanel
 from .progress_dialog import ProgressDialog
@@ -37,8 +38,9 @@ class MainWindow:
     def __init__(self, config: ConfigManager | None = None) -> None:
         self.config = config or ConfigManager()
         self.logger = get_logger(self.__class__.__name__)
-        self.pipeline = Pipeline(self.config, self.logger)
-        self.executor = PlanExecutor(self.logger, self.config)
+        self.io_scheduler = IOScheduler.from_config(self.config, self.logger)
+        self.pipeline = Pipeline(self.config, self.logger, io_scheduler=self.io_scheduler)
+        self.executor = PlanExecutor(self.logger, self.config, io_scheduler=self.io_scheduler)
         self.resume_manager = ResumeManager()
         self.rollback_runner = RollbackRunner(self.logger)
         self.root = tk.Tk()
@@ -176,6 +178,9 @@ class MainWindow:
                 detail_callback=lambda message: self.queue.put(
                     {"type": "detail", "message": message}
                 ),
+                progress_event_callback=lambda event: self.queue.put(
+                    {"type": "progress_event", "event": event}
+                ),
             )
         except RuntimeError:
             self.queue.put({"type": "log", "message": "已取消作業"})
@@ -338,6 +343,8 @@ class MainWindow:
                 cancelled = True
                 break
 
+        if self._last_report_dir is not None:
+            self.pipeline.record_executed(executed_entries, self._last_report_dir.parent)
         entries = executed_entries + failed_entries
         if self._last_report_dir is not None and entries and manifest_path is None:
             manifest_path = self._last_report_dir / "manifest.jsonl"
@@ -206,8 +206,10 @@ class ProgressDialog(tk.Toplevel):
             return
 
         self._latest_run_total_bytes = run_total
-        progress = int(min(100, max(0, (run_processed * 100) / run_total)))
-        self.update_progress(progress)
+        # Dry-run 的 Hashing 只是其中一個階段，進度條沿用整體加權進度，這裡只更新速度與 ETA
+        if event.phase_name != "Hashing":
+            progress = int(min(100, max(0, (run_processed * 100) / run_total)))
+            self.update_progress(progress)
 
         now = time.time()
         self._speed_samples.append((now, int(run_processed)))
@@ -240,6 +242,7 @@ class ProgressDialog(tk.Toplevel):
     def _friendly_op(self, op_type: str) -> str:
         labels = {
             "hash": "計算 Hash",
+            "compare": "逐位元組比對",
             "copy": "複製",
             "move": "搬移",
             "rename": "重新命名",
@@ -133,6 +133,7 @@ def _run_execute(args: argparse.Namespace, config: ConfigManager) -> None:
         executed_entries.extend(result.executed_entries)
         failed_entries.extend(result.failed_entries)
 
+    pipeline.record_executed(executed_entries, output_root)
     print(f"Execute done. Success: {len(executed_entries)}, Failed: {len(failed_entries)}")
 
 
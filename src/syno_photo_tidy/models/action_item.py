@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 from .file_info import FileInfo
 
@@ -18,6 +18,8 @@ class ActionItem:
     new_name: Optional[str] = None
     rename_base: Optional[str] = None
     src_file: Optional[FileInfo] = None
+    fused_from: Tuple[str, ...] = ()
+    via_paths: Tuple[Path, ...] = ()
 
     def to_dict(self) -> dict[str, object]:
         return {
@@ -27,4 +29,6 @@ class ActionItem:
             "dst_path": str(self.dst_path) if self.dst_path else None,
             "new_name": self.new_name,
             "rename_base": self.rename_base,
+            "fused_from": list(self.fused_from) if self.fused_from else None,
+            "via_paths": [str(path) for path in self.via_paths] if self.via_paths else None,
         }
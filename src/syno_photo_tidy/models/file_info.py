@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
 from typing import Optional, Tuple
 
@@ -28,6 +29,36 @@ class FileInfo:
     screenshot_evidence: Optional[str] = None
     hash_md5: Optional[str] = None
     hash_sha256: Optional[str] = None
+    device_id: Optional[int] = None
+    inode: Optional[int] = None
+    content_identifier: Optional[str] = None
+    # 由 timestamp_locked 解析一次的秒數（牆上時間），供排序、時間視窗與年月分類使用
+    timestamp_epoch: Optional[int] = None
+    timestamp_valid: bool = False
+    # 快速縮圖分類只讀取尺寸；EXIF 相關欄位尚未讀取，時間戳暫以建立時間鎖定
+    metadata_deferred: bool = False
+
+    def __post_init__(self) -> None:
+        if self.timestamp_epoch is None:
+            from ..utils.time_utils import locked_timestamp_to_epoch
+
+            self.timestamp_epoch = locked_timestamp_to_epoch(self.timestamp_locked)
+        self.timestamp_valid = self.timestamp_epoch is not None
+
+    @property
+    def timestamp_sort_key(self) -> tuple[bool, int, str]:
+        """依拍攝時間排序；無法解析的時間戳排在最後，彼此間依原字串排序。"""
+        if self.timestamp_valid:
+            return (False, self.timestamp_epoch, "")
+        return (True, 0, str(self.timestamp_locked))
+
+    @property
+    def timestamp_datetime(self) -> Optional[datetime]:
+        if not self.timestamp_valid:
+            return None
+        from ..utils.time_utils import epoch_to_datetime
+
+        return epoch_to_datetime(self.timestamp_epoch)
 
     def to_dict(self) -> dict[str, object]:
         return {
@@ -50,4 +81,10 @@ class FileInfo:
             "screenshot_evidence": self.screenshot_evidence,
             "hash_md5": self.hash_md5,
             "hash_sha256": self.hash_sha256,
+            "device_id": self.device_id,
+            "inode": self.inode,
+            "content_identifier": self.content_identifier,
+            "timestamp_epoch": self.timestamp_epoch,
+            "timestamp_valid": self.timestamp_valid,
+            "metadata_deferred": self.metadata_deferred,
         }
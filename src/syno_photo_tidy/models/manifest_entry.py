@@ -30,6 +30,8 @@ class ManifestEntry:
     pair_confidence: Optional[str] = None
     is_screenshot: bool = False
     screenshot_evidence: Optional[str] = None
+    fused_from: Optional[str] = None
+    via_path: Optional[str] = None
 
     def to_dict(self) -> dict[str, object]:
         return {
@@ -55,4 +57,6 @@ class ManifestEntry:
             "pair_confidence": self.pair_confidence,
             "is_screenshot": self.is_screenshot,
             "screenshot_evidence": self.screenshot_evidence,
+            "fused_from": self.fused_from,
+            "via_path": self.via_path,
         }
@@ -1,6 +1,13 @@
 """工具模組。"""
 
 from . import file_ops, hash_calc, reporting
-from .cancel import CancelledError, CancellationToken
+from .cancel import CancelledError, CancellationToken, EventCancellationToken
 
-__all__ = ["file_ops", "hash_calc", "reporting", "CancelledError", "CancellationToken"]
+__all__ = [
+    "file_ops",
+    "hash_calc",
+    "reporting",
+    "CancelledError",
+    "CancellationToken",
+    "EventCancellationToken",
+]
@@ -0,0 +1,147 @@
+"""Apple Live Photo 的 ContentIdentifier 讀取工具。
+
+影像端寫在 EXIF MakerNote（"Apple iOS" 格式，tag 0x0011）；影片端寫在 QuickTime
+moov/meta 的 keys/ilst（com.apple.quicktime.content.identifier）。兩者為同一個 UUID。
+"""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+QUICKTIME_EXTS = {".mov", ".mp4"}
+CONTENT_IDENTIFIER_KEY = b"com.apple.quicktime.content.identifier"
+
+APPLE_MAKERNOTE_PREFIX = b"Apple iOS\x00"
+APPLE_CONTENT_IDENTIFIER_TAG = 0x0011
+# MakerNote 內 IFD 的起點："Apple iOS\0" + 版本（2 bytes）+ "MM"
+_APPLE_IFD_OFFSET = 14
+_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+MAX_MOOV_BYTES = 16 * 1024 * 1024
+
+
+def content_identifier_from_makernote(maker_note: bytes) -> Optional[str]:
+    if not maker_note.startswith(APPLE_MAKERNOTE_PREFIX) or maker_note[12:14] not in (b"MM", b"II"):
+        return None
+    byteorder = "big" if maker_note[12:14] == b"MM" else "little"
+
+    def read_int(offset: int, size: int) -> int:
+        return int.from_bytes(maker_note[offset : offset + size], byteorder)
+
+    count = read_int(_APPLE_IFD_OFFSET, 2)
+    for index in range(count):
+        entry = _APPLE_IFD_OFFSET + 2 + index * 12
+        if entry + 12 > len(maker_note):
+            return None
+        if read_int(entry, 2) != APPLE_CONTENT_IDENTIFIER_TAG:
+            continue
+        value_type = read_int(entry + 2, 2)
+        value_count = read_int(entry + 4, 4)
+        size = _TYPE_SIZES.get(value_type, 1) * value_count
+        # 偏移量相對於 MakerNote 開頭
+        start = entry + 8 if size <= 4 else read_int(entry + 8, 4)
+        value = maker_note[start : start + size].split(b"\x00", 1)[0]
+        return value.decode("ascii", errors="ignore").strip() or None
+    return None
+
+
+def content_identifier_from_exif(exif_bytes: bytes) -> Optional[str]:
+    import piexif
+
+    maker_note = piexif.load(exif_bytes).get("Exif", {}).get(piexif.ExifIFD.MakerNote)
+    if not isinstance(maker_note, bytes):
+        return None
+    return content_identifier_from_makernote(maker_note)
+
+
+def _iter_atoms(handle: BinaryIO, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """產生 (atom 類型, 內容起點, 內容終點)；只讀取 atom 標頭，內容以 seek 跳過。"""
+    position = start
+    while position + 8 <= end:
+        handle.seek(position)
+        header = handle.read(8)
+        if len(header) < 8:
+            return
+        size = int.from_bytes(header[:4], "big")
+        atom_type = header[4:8]
+        header_size = 8
+        if size == 1:
+            extended = handle.read(8)
+            if len(extended) < 8:
+                return
+            size = int.from_bytes(extended, "big")
+            header_size = 16
+        elif size == 0:
+            size = end - position
+        if size < header_size or position + size > end:
+            return
+        yield atom_type, position + header_size, position + size
+        position += size
+
+
+def _find_atom(handle: BinaryIO, start: int, end: int, atom_type: bytes) -> Optional[tuple[int, int]]:
+    for found_type, payload_start, payload_end in _iter_atoms(handle, start, end):
+        if found_type == atom_type:
+            return payload_start, payload_end
+    return None
+
+
+def read_quicktime_content_identifier(path: Path | str, max_moov_bytes: int = MAX_MOOV_BYTES) -> Optional[str]:
+    """只走訪 atom 標頭找到 moov，讀入 moov 後解析 meta 的 keys/ilst；不讀取 mdat。"""
+    try:
+        with open(path, "rb") as handle:
+            file_size = handle.seek(0, io.SEEK_END)
+            moov = _find_atom(handle, 0, file_size, b"moov")
+            if moov is None or moov[1] - moov[0] > max_moov_bytes:
+                return None
+            handle.seek(moov[0])
+            moov_handle = io.BytesIO(handle.read(moov[1] - moov[0]))
+    except OSError:
+        return None
+    return _content_identifier_from_moov(moov_handle)
+
+
+def _content_identifier_from_moov(handle: io.BytesIO) -> Optional[str]:
+    meta = _find_atom(handle, 0, len(handle.getbuffer()), b"meta")
+    if meta is None:
+        return None
+    start, end = meta
+    # QuickTime 的 meta 沒有 version/flags；ISO BMFF 的 meta 則多 4 bytes
+    handle.seek(start + 4)
+    if handle.read(4) != b"hdlr":
+        start += 4
+
+    keys = _find_atom(handle, start, end, b"keys")
+    items = _find_atom(handle, start, end, b"ilst")
+    if keys is None or items is None:
+        return None
+    handle.seek(keys[0] + 4)
+    entry_count = int.from_bytes(handle.read(4), "big")
+    key_index = None
+    position = keys[0] + 8
+    for index in range(1, entry_count + 1):
+        handle.seek(position)
+        entry_size = int.from_bytes(handle.read(4), "big")
+        if entry_size < 8:
+            return None
+        handle.read(4)  # namespace（mdta）
+        if handle.read(entry_size - 8) == CONTENT_IDENTIFIER_KEY:
+            key_index = index
+            break
+        position += entry_size
+    if key_index is None:
+        return None
+
+    for item_type, item_start, item_end in _iter_atoms(handle, items[0], items[1]):
+        if int.from_bytes(item_type, "big") != key_index:
+            continue
+        data = _find_atom(handle, item_start, item_end, b"data")
+        if data is None:
+            return None
+        # data：4 bytes 型別 + 4 bytes locale，之後為 UTF-8 值
+        handle.seek(data[0] + 8)
+        value = handle.read(data[1] - data[0] - 8)
+        return value.decode("utf-8", errors="ignore").strip("\x00 ") or None
+    return None
@@ -0,0 +1,112 @@
+"""逐位元組比對工具：同大小候選檔以 lockstep 分塊讀取，一旦內容分歧就立即拆出。"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Callable, ContextManager, Optional, Sequence
+
+from . import page_cache
+from .cancel import CancelledError, CancellationToken
+
+# 不同內容的檔案多半在前幾 KB 就出現差異，先讀小塊再逐輪加倍
+INITIAL_CHUNK_BYTES = 4 * 1024
+
+
+def partition_identical(
+    paths: Sequence[Path],
+    *,
+    chunk_size_kb: int = 1024,
+    max_workers: int = 4,
+    cancel_token: Optional[CancellationToken] = None,
+    bytes_callback: Optional[Callable[[int], None]] = None,
+    drop_page_cache: bool = False,
+    read_slot: Optional[Callable[[Path], ContextManager[None]]] = None,
+    logger=None,
+) -> list[list[int]]:
+    """回傳內容完全相同的索引分組（只含兩個以上成員，依第一個索引排序）。
+
+    無法開啟或讀取失敗的檔案視為與其他檔案不同。read_slot 提供時每次讀取都在其中進行，
+    讓呼叫端以裝置併發上限（IOScheduler.slot）約束讀取。
+    """
+    max_chunk = max(INITIAL_CHUNK_BYTES, chunk_size_kb * 1024)
+    handles: dict[int, BinaryIO] = {}
+    droppers: dict[int, page_cache.CacheDropper] = {}
+    identical: list[list[int]] = []
+
+    def close(index: int) -> None:
+        dropper = droppers.pop(index, None)
+        if dropper is not None:
+            dropper.finish()
+        handle = handles.pop(index, None)
+        if handle is not None:
+            handle.close()
+
+    try:
+        for index, path in enumerate(paths):
+            try:
+                handles[index] = path.open("rb")
+            except OSError as exc:
+                if logger is not None:
+                    logger.warning(f"無法開啟檔案進行比對: {path} ({exc})")
+                continue
+            if drop_page_cache:
+                droppers[index] = page_cache.CacheDropper(handles[index].fileno())
+
+        active: list[list[int]] = [sorted(handles)] if len(handles) > 1 else []
+        for index in list(handles):
+            if not active or index not in active[0]:
+                close(index)
+
+        chunk_bytes = INITIAL_CHUNK_BYTES
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            while active:
+                if cancel_token is not None and cancel_token.is_cancelled():
+                    raise CancelledError("已取消逐位元組比對")
+
+                members = [index for members in active for index in members]
+
+                def read(index: int, size: int = chunk_bytes) -> Optional[bytes]:
+                    try:
+                        if read_slot is None:
+                            return handles[index].read(size)
+                        with read_slot(paths[index]):
+                            return handles[index].read(size)
+                    except OSError as exc:
+                        if logger is not None:
+                            logger.warning(f"比對時讀取失敗: {paths[index]} ({exc})")
+                        return None
+
+                chunks = dict(zip(members, executor.map(read, members)))
+                if bytes_callback is not None:
+                    bytes_callback(sum(len(chunk) for chunk in chunks.values() if chunk))
+
+                next_active: list[list[int]] = []
+                for group in active:
+                    buckets: dict[bytes, list[int]] = {}
+                    for index in group:
+                        chunk = chunks[index]
+                        if chunk is None:
+                            close(index)
+                            continue
+                        dropper = droppers.get(index)
+                        if dropper is not None:
+                            dropper.advance(len(chunk))
+                        buckets.setdefault(chunk, []).append(index)
+                    for chunk, bucket in buckets.items():
+                        if len(bucket) == 1:
+                            close(bucket[0])
+                        elif not chunk:
+                            identical.append(bucket)
+                            for index in bucket:
+                                close(index)
+                        else:
+                            next_active.append(bucket)
+                active = next_active
+                chunk_bytes = min(max_chunk, chunk_bytes * 2)
+    finally:
+        for index in list(handles):
+            close(index)
+
+    identical.sort(key=lambda bucket: bucket[0])
+    return identical
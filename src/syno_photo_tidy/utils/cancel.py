@@ -18,3 +18,16 @@ class CancellationToken:
 
     def is_cancelled(self) -> bool:
         return self._event.is_set()
+
+
+class EventCancellationToken(CancellationToken):
+    """以既有的 threading.Event（例如 GUI 的 cancel_event）作為取消來源。"""
+
+    def __init__(self, event) -> None:
+        self._event = event
+
+    def set(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        return bool(self._event.is_set())
@@ -0,0 +1,45 @@
+"""目的資料夾的檔名快照：每個資料夾只以 os.scandir 列出一次，衝突檢查改為記憶體查詢。
+
+規劃期間檔案系統不會被修改，快照與逐一 exists() 的結果相同；名稱以 os.path.normcase
+正規化，與 planned_names 的比對方式一致（Windows/SMB 不分大小寫）。
+分片規劃會從多個執行緒查詢；列出資料夾在鎖外進行，同一資料夾偶爾重複列出也不影響結果。
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import threading
+from typing import Optional
+
+from .logger import get_logger
+
+
+class DirectoryIndex:
+    def __init__(self, logger=None) -> None:
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self._listings: dict[str, Optional[frozenset[str]]] = {}
+        self._lock = threading.Lock()
+
+    def names(self, directory: Path) -> Optional[frozenset[str]]:
+        """回傳資料夾內正規化後的名稱集合；資料夾不存在為空集合，無法列出時為 None。"""
+        key = os.path.normcase(str(directory))
+        with self._lock:
+            if key in self._listings:
+                return self._listings[key]
+        try:
+            with os.scandir(directory) as entries:
+                listing: Optional[frozenset[str]] = frozenset(os.path.normcase(entry.name) for entry in entries)
+        except (FileNotFoundError, NotADirectoryError):
+            listing = frozenset()
+        except OSError as exc:
+            self.logger.warning(f"無法列出資料夾，改為逐一檢查: {directory} ({exc})")
+            listing = None
+        with self._lock:
+            return self._listings.setdefault(key, listing)
+
+    def exists(self, path: Path) -> bool:
+        listing = self.names(path.parent)
+        if listing is None:
+            return path.exists()
+        return os.path.normcase(path.name) in listing
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Any, Callable, Optional
 
 from ..config.manager import ConfigManager
+from . import page_cache
 from .cancel import CancelledError, CancellationToken
 
 from .logger import get_logger
@@ -113,6 +114,7 @@ def safe_copy2(
 
     size_threshold = int(cfg.get("file_ops.chunked_copy_threshold_bytes", 10 * 1024 * 1024))
     chunk_size_kb = int(cfg.get("file_ops.copy_chunk_size_kb", cfg.get("hash.chunk_size_kb", 1024)))
+    drop_page_cache = bool(cfg.get("io.page_cache_hints", False))
 
     @safe_op(
         config=cfg,
@@ -128,13 +130,15 @@ def safe_copy2(
             file_size = src_path.stat().st_size
         except OSError:
             file_size = 0
-        if progress_callback is not None and file_size > size_threshold:
+        # 啟用 page cache 提示時一律走 chunked copy，shutil.copy2 無法對已完成範圍送出 DONTNEED
+        if drop_page_cache or (progress_callback is not None and file_size > size_threshold):
             chunked_copy(
                 src_path,
                 dst_path,
                 progress_callback=progress_callback,
                 cancel_token=cancel_token,
                 chunk_size_kb=chunk_size_kb,
+                drop_page_cache=drop_page_cache,
             )
             shutil.copystat(src_path, dst_path)
             return
@@ -219,6 +223,7 @@ def chunked_copy(
     progress_callback: Optional[Callable[[int, int], None]] = None,
     cancel_token: Optional[CancellationToken] = None,
     chunk_size_kb: int = 1024,
+    drop_page_cache: bool = False,
 ) -> None:
     total_size = 0
     try:
@@ -228,16 +233,38 @@ def chunked_copy(
 
     bytes_copied = 0
     with src_path.open("rb") as source, dst_path.open("wb") as target:
-        while True:
-            if cancel_token is not None and cancel_token.is_cancelled():
-                raise CancelledError(f"已取消複製: {src_path}")
-            chunk = source.read(chunk_size_kb * 1024)
-            if not chunk:
-                break
-            target.write(chunk)
-            bytes_copied += len(chunk)
-            if progress_callback is not None:
-                progress_callback(bytes_copied, total_size)
+        source_dropper = page_cache.CacheDropper(source.fileno()) if drop_page_cache else None
+        target_dropper = (
+            page_cache.CacheDropper(target.fileno(), lag_bytes=page_cache.DEFAULT_DROP_INTERVAL_BYTES)
+            if drop_page_cache
+            else None
+        )
+        try:
+            while True:
+                if cancel_token is not None and cancel_token.is_cancelled():
+                    raise CancelledError(f"已取消複製: {src_path}")
+                chunk = source.read(chunk_size_kb * 1024)
+                if not chunk:
+                    break
+                target.write(chunk)
+                bytes_copied += len(chunk)
+                if source_dropper is not None and target_dropper is not None:
+                    # 寫入端的 DONTNEED 只會丟掉已回寫的頁面，先 flush 讓核心開始回寫
+                    target.flush()
+                    source_dropper.advance(len(chunk))
+                    target_dropper.advance(len(chunk))
+                if progress_callback is not None:
+                    progress_callback(bytes_copied, total_size)
+        finally:
+            # 取消或讀寫失敗時也要丟棄已處理範圍的快取
+            if source_dropper is not None and target_dropper is not None:
+                try:
+                    target.flush()
+                except OSError:
+                    # 未寫出的資料在關閉檔案時會再次 flush，錯誤由原本的例外或 close 回報
+                    pass
+                source_dropper.finish()
+                target_dropper.finish()
 
 
 def safe_makedirs(
@@ -0,0 +1,143 @@
+"""Hamming 空間索引工具（pHash 近似查詢）：BK-tree 與 NumPy 分塊全配對。"""
+
+from __future__ import annotations
+
+from typing import Generic, Iterator, Optional, Sequence, TypeVar
+
+V = TypeVar("V")
+
+DEFAULT_BLOCK_SIZE = 512
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return (left ^ right).bit_count()
+
+
+def hash_to_int(image_hash) -> int:
+    """將 imagehash.ImageHash 轉為整數，供位元運算使用。"""
+    return int(str(image_hash), 16)
+
+
+class _Node(Generic[V]):
+    __slots__ = ("key", "value", "children")
+
+    def __init__(self, key: int, value: V) -> None:
+        self.key = key
+        self.value = value
+        self.children: dict[int, _Node[V]] = {}
+
+
+class BKTree(Generic[V]):
+    """以 Hamming 距離建立的 BK-tree，半徑查詢只需走訪距離落在 [d-r, d+r] 的子樹。"""
+
+    def __init__(self) -> None:
+        self._root: Optional[_Node[V]] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: int, value: V) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = _Node(key, value)
+            return
+        node = self._root
+        while True:
+            distance = hamming_distance(key, node.key)
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _Node(key, value)
+                return
+            node = child
+
+    def query(self, key: int, radius: int) -> Iterator[tuple[int, V]]:
+        """產生所有距離不超過 radius 的 (距離, value)，順序不保證。"""
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(key, node.key)
+            if distance <= radius:
+                yield distance, node.value
+            low = distance - radius
+            high = distance + radius
+            for child_distance, child in node.children.items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+
+
+def earlier_neighbors(
+    keys: Sequence[int],
+    radius: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    *,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> list[list[int]]:
+    """以 NumPy 分塊計算所有配對距離，回傳每個索引之前距離不超過 radius 的索引（遞增排序）。
+
+    hash 打包成 uint64 陣列，距離以 XOR 加上 popcount 計算（NumPy 2 的 bitwise_count，
+    舊版則以 8-bit 查表）；每次只處理 block_size × block_size 的區塊以限制記憶體用量。
+    指定 start/stop 時只計算該範圍的列（回傳長度為 stop - start），供分片平行處理。
+    未安裝 numpy 時拋出 ImportError。
+    """
+    import numpy as np
+
+    count = len(keys)
+    stop = count if stop is None else min(stop, count)
+    neighbors: list[list[int]] = [[] for _ in range(max(0, stop - start))]
+    if count < 2 or start >= stop:
+        return neighbors
+    packed = np.fromiter(keys, dtype=np.uint64, count=count)
+    popcount = _popcount_function(np)
+    block_size = max(1, int(block_size))
+
+    row_parts = []
+    col_parts = []
+    for row_start in range(start, stop, block_size):
+        rows = packed[row_start : min(stop, row_start + block_size)]
+        # 只需要 j < i 的配對，因此欄區塊只走到對角線區塊為止
+        for col_start in range(0, row_start + len(rows), block_size):
+            cols = packed[col_start : col_start + block_size]
+            mask = popcount(rows[:, None] ^ cols[None, :]) <= radius
+            if not mask.any():
+                continue
+            if col_start + len(cols) > row_start:
+                # 與對角線重疊的區塊只保留 col < row
+                mask &= np.tri(len(rows), len(cols), k=row_start - col_start - 1, dtype=bool)
+            row_hits, col_hits = np.nonzero(mask)
+            if len(row_hits):
+                row_parts.append(row_hits + row_start - start)
+                col_parts.append(col_hits + col_start)
+
+    if not row_parts:
+        return neighbors
+    row_indices = np.concatenate(row_parts)
+    col_indices = np.concatenate(col_parts)
+    order = np.lexsort((col_indices, row_indices))
+    for row, col in zip(row_indices[order].tolist(), col_indices[order].tolist()):
+        neighbors[row].append(col)
+    return neighbors
+
+
+def earlier_neighbors_bktree(keys: Sequence[int], radius: int) -> list[list[int]]:
+    """earlier_neighbors 的純 Python 版本（未安裝 numpy 時使用），輸出格式相同。"""
+    tree: BKTree[int] = BKTree()
+    neighbors: list[list[int]] = []
+    for index, key in enumerate(keys):
+        neighbors.append(sorted(value for _distance, value in tree.query(key, radius)))
+        tree.add(key, index)
+    return neighbors
+
+
+def _popcount_function(np):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count
+    table = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+    def popcount(values):
+        return table[values.view(np.uint8)].reshape(*values.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+    return popcount
@@ -7,6 +7,7 @@ import time
 from pathlib import Path
 from typing import Callable, Iterable, Optional
 
+from . import page_cache
 from .cancel import CancelledError, CancellationToken
 
 
@@ -19,6 +20,7 @@ def compute_hashes(
     bytes_update_threshold: int = 1048576,
     report_interval_sec: float = 0.1,
     return_elapsed_ms: bool = False,
+    drop_page_cache: bool = False,
     logger=None,
 ) -> dict[str, str] | tuple[dict[str, str], int]:
     hashers: dict[str, "hashlib._Hash"] = {}
@@ -47,25 +49,33 @@ def compute_hashes(
 
     try:
         with path.open("rb") as handle:
-            while True:
-                if cancel_token is not None and cancel_token.is_cancelled():
-                    raise CancelledError(f"已取消 hash 計算: {path}")
-                chunk = handle.read(chunk_size_kb * 1024)
-                if not chunk:
-                    break
-                bytes_read += len(chunk)
-                for hasher in hashers.values():
-                    hasher.update(chunk)
+            dropper = page_cache.CacheDropper(handle.fileno()) if drop_page_cache else None
+            try:
+                while True:
+                    if cancel_token is not None and cancel_token.is_cancelled():
+                        raise CancelledError(f"已取消 hash 計算: {path}")
+                    chunk = handle.read(chunk_size_kb * 1024)
+                    if not chunk:
+                        break
+                    bytes_read += len(chunk)
+                    for hasher in hashers.values():
+                        hasher.update(chunk)
+                    if dropper is not None:
+                        dropper.advance(len(chunk))
 
-                if progress_callback is not None:
-                    now = time.time()
-                    should_report = (bytes_read - last_reported) >= bytes_update_threshold
-                    if not should_report and (now - last_report_time) >= report_interval_sec:
-                        should_report = True
-                    if should_report:
-                        progress_callback(bytes_read, total_size)
-                        last_reported = bytes_read
-                        last_report_time = now
+                    if progress_callback is not None:
+                        now = time.time()
+                        should_report = (bytes_read - last_reported) >= bytes_update_threshold
+                        if not should_report and (now - last_report_time) >= report_interval_sec:
+                            should_report = True
+                        if should_report:
+                            progress_callback(bytes_read, total_size)
+                            last_reported = bytes_read
+                            last_report_time = now
+            finally:
+                # 取消或讀取失敗時也要釋放已讀範圍的快取
+                if dropper is not None:
+                    dropper.finish()
 
         if progress_callback is not None and bytes_read != last_reported:
             progress_callback(bytes_read, total_size)
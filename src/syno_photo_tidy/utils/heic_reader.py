@@ -0,0 +1,67 @@
+"""HEIC/HEIF 快速讀取：只解析容器取得尺寸與 EXIF，需要像素時優先解碼內嵌縮圖。
+
+iPhone 的主影像由多個 512×512 HEVC tile 組成，完整解碼成本很高；
+pillow_heif.open_heif 為延遲解碼，讀取 size 與 info 不會觸發 HEVC 解碼。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+HEIC_EXTS = {".heic", ".heif"}
+
+
+@dataclass(frozen=True)
+class HeicInfo:
+    size: tuple[int, int]
+    exif: Optional[bytes]
+
+
+def is_heic(path: Path | str) -> bool:
+    return Path(path).suffix.lower() in HEIC_EXTS
+
+
+def _primary_image(path: Path | str):
+    from pillow_heif import open_heif
+
+    heif_file = open_heif(str(path), convert_hdr_to_8bit=True)
+    return heif_file[getattr(heif_file, "primary_index", 0)]
+
+
+def read_heic_info(path: Path | str) -> HeicInfo:
+    """不解碼像素，回傳主影像尺寸與 EXIF；未安裝 pillow_heif 時拋出 ImportError。"""
+    image = _primary_image(path)
+    exif = image.info.get("exif") or None
+    return HeicInfo(size=tuple(image.size), exif=exif)
+
+
+def _thumbnails(image) -> list:
+    # pillow_heif 0.x 以 thumbnails 屬性提供；1.x 改為 info["thumbnails"] 加 get_thumbnail()
+    if hasattr(image, "get_thumbnail"):
+        return [image.get_thumbnail(index) for index in range(len(image.info.get("thumbnails", [])))]
+    return list(getattr(image, "thumbnails", []) or [])
+
+
+def load_heic_thumbnail(path: Path | str, min_size: int = 0) -> Optional[Image.Image]:
+    """解碼最小、且短邊不小於 min_size 的內嵌縮圖；沒有合適縮圖時回傳 None。
+
+    長寬方向與主影像不同的縮圖（未套用旋轉）不使用，以免 hash 與原圖不一致。
+    """
+    image = _primary_image(path)
+    width, height = image.size
+    candidates = []
+    for thumbnail in _thumbnails(image):
+        thumb_width, thumb_height = thumbnail.size
+        if min(thumb_width, thumb_height) < min_size:
+            continue
+        if (thumb_width >= thumb_height) != (width >= height):
+            continue
+        candidates.append(thumbnail)
+    if not candidates:
+        return None
+    smallest = min(candidates, key=lambda thumbnail: thumbnail.size[0] * thumbnail.size[1])
+    return smallest.to_pillow()
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass, field
+import io
 from pathlib import Path
 from typing import Optional, Tuple
 
 from PIL import Image
 
+from . import apple_metadata, heic_reader
+
 
 def _register_heif_opener() -> None:
     try:
@@ -37,16 +41,7 @@ def get_exif_datetime_original(path: Path, logger=None) -> Optional[str]:
             exif_bytes = image.info.get("exif")
             if not exif_bytes:
                 return None
-        import piexif
-
-        exif_dict = piexif.load(exif_bytes)
-        exif_ifd = exif_dict.get("Exif", {})
-        value = exif_ifd.get(piexif.ExifIFD.DateTimeOriginal)
-        if value is None:
-            return None
-        if isinstance(value, bytes):
-            return value.decode("utf-8", errors="ignore")
-        return str(value)
+        return _exif_datetime_original(exif_bytes)
     except Exception as exc:
         if logger is not None:
             logger.warning(f"無法讀取 EXIF: {path} ({exc})")
@@ -57,31 +52,174 @@ def get_exif_data_map(path: Path, logger=None) -> dict[str, str]:
     _register_heif_opener()
     try:
         with Image.open(path) as image:
-            exif = image.getexif()
-            if not exif:
-                return {}
-            result: dict[str, str] = {}
-            for tag_id, value in exif.items():
-                key = str(tag_id)
-                if isinstance(value, bytes):
-                    text = value.decode("utf-8", errors="ignore")
-                else:
-                    text = str(value)
-                result[key] = text
-            return result
+            return _exif_map(image.getexif())
     except Exception as exc:
         if logger is not None:
             logger.warning(f"無法讀取 EXIF map: {path} ({exc})")
         return {}
 
 
-def compute_phash(path: Path, logger=None):
+def _exif_datetime_original(exif_bytes: bytes) -> Optional[str]:
+    import piexif
+
+    exif_dict = piexif.load(exif_bytes)
+    exif_ifd = exif_dict.get("Exif", {})
+    value = exif_ifd.get(piexif.ExifIFD.DateTimeOriginal)
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="ignore")
+    return str(value)
+
+
+def _exif_map(exif: Image.Exif) -> dict[str, str]:
+    if not exif:
+        return {}
+    result: dict[str, str] = {}
+    for tag_id, value in exif.items():
+        key = str(tag_id)
+        if isinstance(value, bytes):
+            text = value.decode("utf-8", errors="ignore")
+        else:
+            text = str(value)
+        result[key] = text
+    return result
+
+
+def read_image_size(path: Path, logger=None) -> Optional[Tuple[int, int]]:
+    """只讀取檔頭取得尺寸，不解析 EXIF；HEIC/HEIF 直接解析容器。"""
+    try:
+        if heic_reader.is_heic(path):
+            return heic_reader.read_heic_info(path).size
+        _register_heif_opener()
+        with Image.open(path) as image:
+            return image.size
+    except Exception as exc:
+        if logger is not None:
+            logger.warning(f"無法讀取影像資訊: {path} ({exc})")
+        return None
+
+
+@dataclass
+class ImageMetadata:
+    resolution: Optional[Tuple[int, int]] = None
+    exif_datetime_original: Optional[str] = None
+    exif_data: dict[str, str] = field(default_factory=dict)
+    content_identifier: Optional[str] = None
+
+
+def read_image_metadata(path: Path, logger=None) -> ImageMetadata:
+    """開啟檔案一次，同時取得解析度、EXIF 拍攝時間與 EXIF map（結果與個別函式相同）。
+
+    HEIC/HEIF 直接解析容器，不經過 Image.open，也不解碼 HEVC。
+    """
+    metadata = ImageMetadata()
+    try:
+        if heic_reader.is_heic(path):
+            info = heic_reader.read_heic_info(path)
+            metadata.resolution = info.size
+            exif_bytes = info.exif
+            exif = Image.Exif()
+            if exif_bytes:
+                exif.load(exif_bytes)
+        else:
+            _register_heif_opener()
+            with Image.open(path) as image:
+                metadata.resolution = image.size
+                exif_bytes = image.info.get("exif")
+                exif = image.getexif()
+    except Exception as exc:
+        if logger is not None:
+            logger.warning(f"無法讀取影像資訊: {path} ({exc})")
+        return metadata
+
+    try:
+        metadata.exif_data = _exif_map(exif)
+        if exif_bytes:
+            metadata.exif_datetime_original = _exif_datetime_original(exif_bytes)
+    except Exception as exc:
+        if logger is not None:
+            logger.warning(f"無法讀取 EXIF: {path} ({exc})")
+    if exif_bytes:
+        try:
+            metadata.content_identifier = apple_metadata.content_identifier_from_exif(exif_bytes)
+        except Exception:
+            # MakerNote 格式不一，讀不到時改由時間配對 Live Photo
+            metadata.content_identifier = None
+    return metadata
+
+
+EXIF_THUMBNAIL_HEADER_BYTES = 64 * 1024
+
+
+def read_exif_thumbnail(
+    path: Path | str, max_header_bytes: int = EXIF_THUMBNAIL_HEADER_BYTES
+) -> Optional[bytes]:
+    """只讀取 JPEG 檔頭的 APP1 區段，取出 EXIF IFD1 內嵌的縮圖；沒有則回傳 None。"""
+    try:
+        with open(path, "rb") as handle:
+            if handle.read(2) != b"\xff\xd8":
+                return None
+            while handle.tell() < max_header_bytes:
+                marker = handle.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF or marker[1] in (0xD9, 0xDA):
+                    return None
+                length = int.from_bytes(handle.read(2), "big")
+                if length < 2:
+                    return None
+                if marker[1] != 0xE1:
+                    handle.seek(length - 2, io.SEEK_CUR)
+                    continue
+                payload = handle.read(length - 2)
+                if not payload.startswith(b"Exif\x00\x00"):
+                    continue
+                import piexif
+
+                return piexif.load(payload).get("thumbnail") or None
+    except Exception:
+        return None
+    return None
+
+
+def load_hash_image(
+    path: Path | str,
+    draft_size: Optional[int] = None,
+    source: str = "full",
+) -> Image.Image:
+    """讀取供感知 hash 使用的灰階影像。
+
+    source 為 exif_thumbnail 時優先使用內嵌縮圖（JPEG 為 EXIF IFD1 縮圖，只需讀取檔頭；
+    HEIC 為容器內的縮圖 item，不解碼主影像）；沒有縮圖則改讀原圖。
+    指定 draft_size 時，JPEG 由 libjpeg 在 DCT 階段直接以 1/2、1/4 或 1/8 比例解碼，
+    解碼結果的長寬仍不小於 draft_size；其他格式不受影響。
+    """
+    if source == "exif_thumbnail" and heic_reader.is_heic(path):
+        try:
+            thumbnail_image = heic_reader.load_heic_thumbnail(path, draft_size or 0)
+        except Exception:
+            thumbnail_image = None
+        if thumbnail_image is not None:
+            return thumbnail_image.convert("L")
+    elif source == "exif_thumbnail":
+        thumbnail = read_exif_thumbnail(path)
+        if thumbnail is not None:
+            try:
+                with Image.open(io.BytesIO(thumbnail)) as image:
+                    return image.convert("L")
+            except Exception:
+                pass
     _register_heif_opener()
+    with Image.open(path) as image:
+        if draft_size:
+            image.draft("L", (draft_size, draft_size))
+        return image.convert("L")
+
+
+def compute_phash(path: Path, logger=None, draft_size: Optional[int] = None, source: str = "full"):
     try:
         import imagehash
 
-        with Image.open(path) as image:
-            return imagehash.phash(image)
+        return imagehash.phash(load_hash_image(path, draft_size, source))
     except ImportError as exc:
         if logger is not None:
             logger.warning(f"imagehash 未安裝，無法計算 pHash: {exc}")
@@ -90,3 +228,32 @@ def compute_phash(path: Path, logger=None):
         if logger is not None:
             logger.warning(f"無法計算 pHash: {path} ({exc})")
         return None
+
+
+HASH_FUNCTIONS = {
+    "ahash": "average_hash",
+    "dhash": "dhash",
+    "phash": "phash",
+    "whash": "whash",
+}
+
+
+def compute_image_hash_value(
+    path: str,
+    draft_size: Optional[int] = None,
+    source: str = "full",
+    kind: str = "phash",
+) -> tuple[Optional[int], Optional[str]]:
+    """ProcessPool worker：回傳 (64 位元感知 hash 整數, 錯誤訊息)，kind 為 HASH_FUNCTIONS 的鍵。
+
+    必須是模組層級函式才能被 pickle；子行程沒有 logger，錯誤訊息交由主行程記錄。
+    """
+    try:
+        import imagehash
+
+        hash_function = getattr(imagehash, HASH_FUNCTIONS[kind])
+        return int(str(hash_function(load_hash_image(path, draft_size, source))), 16), None
+    except ImportError as exc:
+        return None, f"imagehash 未安裝，無法計算 {kind}: {exc}"
+    except Exception as exc:
+        return None, f"無法計算 {kind}: {path} ({exc})"
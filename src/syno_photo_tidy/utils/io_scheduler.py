@@ -0,0 +1,96 @@
+"""依實體裝置（st_dev）分別限制併發的 I/O 排程工具。"""
+
+from __future__ import annotations
+
+from contextlib import ExitStack, contextmanager
+import os
+from pathlib import Path
+import threading
+from typing import Iterable, Iterator, Optional
+
+from .logger import get_logger
+
+
+class IOScheduler:
+    """每個裝置各自維護一組 worker 上限，讓 HDD、SSD、SMB 可以使用不同併發數。"""
+
+    def __init__(
+        self,
+        *,
+        default_workers: int = 4,
+        device_workers: Optional[dict[str, int]] = None,
+        logger=None,
+    ) -> None:
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.default_workers = max(1, int(default_workers))
+        self._limits: dict[Optional[int], int] = {}
+        self._semaphores: dict[Optional[int], threading.BoundedSemaphore] = {}
+        self._device_cache: dict[str, Optional[int]] = {}
+        self._lock = threading.Lock()
+
+        for raw_path, workers in (device_workers or {}).items():
+            device = _stat_device(Path(raw_path))
+            if device is None:
+                self.logger.warning(f"無法辨識裝置，忽略 I/O 併發設定: {raw_path}")
+                continue
+            self._limits[device] = max(1, int(workers))
+
+    @classmethod
+    def from_config(cls, config, logger=None) -> "IOScheduler":
+        device_workers = config.get("io.device_workers", {}) or {}
+        return cls(
+            default_workers=int(config.get("hash.parallel_workers", 4)),
+            device_workers=dict(device_workers),
+            logger=logger,
+        )
+
+    def device_of(self, path: Path) -> Optional[int]:
+        """回傳路徑所在裝置；路徑尚不存在時（例如輸出目的地）往上找既有的上層目錄。"""
+        key = str(path.parent)
+        with self._lock:
+            if key in self._device_cache:
+                return self._device_cache[key]
+
+        device = _stat_device(path)
+        with self._lock:
+            self._device_cache[key] = device
+        return device
+
+    def limit_for(self, device: Optional[int]) -> int:
+        return self._limits.get(device, self.default_workers)
+
+    def group_by_device(self, paths: Iterable[Path]) -> dict[Optional[int], list[int]]:
+        """依裝置分組，回傳每個裝置對應的輸入索引（保留原順序）。"""
+        groups: dict[Optional[int], list[int]] = {}
+        for index, path in enumerate(paths):
+            groups.setdefault(self.device_of(path), []).append(index)
+        return groups
+
+    @contextmanager
+    def slot(self, *paths: Optional[Path]) -> Iterator[None]:
+        """佔用各路徑所在裝置的一個 worker 名額；依裝置編號排序取得以避免死結。"""
+        devices = {self.device_of(path) for path in paths if path is not None}
+        ordered = sorted(devices, key=lambda item: (item is None, item or 0))
+        with ExitStack() as stack:
+            for device in ordered:
+                semaphore = self._semaphore_for(device)
+                semaphore.acquire()
+                stack.callback(semaphore.release)
+            yield
+
+    def _semaphore_for(self, device: Optional[int]) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(device)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.limit_for(device))
+                self._semaphores[device] = semaphore
+            return semaphore
+
+
+def _stat_device(path: Path) -> Optional[int]:
+    for candidate in (path, *path.parents):
+        try:
+            return os.stat(candidate).st_dev
+        except OSError:
+            continue
+    return None
@@ -0,0 +1,128 @@
+"""已封存圖庫的內容索引（sqlite）：大小 → SHA-256 → 路徑。
+
+只記錄 Execute 實際放進 KEEP 的檔案，不掃描圖庫；新檔案先以大小篩選，
+同大小才比對 SHA-256。封存時還沒有 hash 的項目在第一次遇到同大小的新檔案時
+才計算並寫回；路徑不存在或大小、修改時間改變的項目視為失效並移除。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import sqlite3
+from typing import Callable, Iterable, Optional
+
+from .logger import get_logger
+
+
+@dataclass(frozen=True)
+class LibraryEntry:
+    path: Path
+    size_bytes: int
+    mtime_ns: int
+    sha256: Optional[str]
+
+
+class LibraryIndex:
+    def __init__(self, db_path: Path, logger=None) -> None:
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(db_path))
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS library_entries (
+                path TEXT PRIMARY KEY,
+                size_bytes INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_library_size ON library_entries(size_bytes, sha256)"
+        )
+        self._connection.commit()
+
+    def __enter__(self) -> "LibraryIndex":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def sizes(self) -> set[int]:
+        return {row[0] for row in self._connection.execute("SELECT DISTINCT size_bytes FROM library_entries")}
+
+    def find(
+        self,
+        size_bytes: int,
+        sha256: str,
+        compute_sha256: Callable[[Path], Optional[str]],
+        exclude: Optional[Path] = None,
+    ) -> Optional[Path]:
+        """回傳內容相同的圖庫檔案（exclude 本身除外）；缺少 hash 的同大小項目以 compute_sha256 補算後寫回。"""
+        rows = self._connection.execute(
+            "SELECT path, size_bytes, mtime_ns, sha256 FROM library_entries "
+            "WHERE size_bytes = ? AND (sha256 = ? OR sha256 IS NULL) AND path != ? ORDER BY sha256 IS NULL, path",
+            (size_bytes, sha256, str(exclude) if exclude is not None else ""),
+        ).fetchall()
+        found: Optional[Path] = None
+        for path_value, stored_size, mtime_ns, stored_hash in rows:
+            entry = LibraryEntry(Path(path_value), stored_size, mtime_ns, stored_hash)
+            if not self._is_current(entry):
+                self._connection.execute("DELETE FROM library_entries WHERE path = ?", (path_value,))
+                continue
+            if entry.sha256 is None:
+                computed = compute_sha256(entry.path)
+                if computed is None:
+                    continue
+                self._connection.execute(
+                    "UPDATE library_entries SET sha256 = ? WHERE path = ?",
+                    (computed, path_value),
+                )
+                if computed != sha256:
+                    continue
+            found = entry.path
+            break
+        self._connection.commit()
+        return found
+
+    def record_moves(self, moves: Iterable[tuple[Path, Path, Optional[str], bool]]) -> int:
+        """Execute 後更新索引：(來源, 目的, SHA-256, 目的是否在 KEEP 內)。
+
+        來源若原本就在索引中（例如圖庫內的檔案被重新命名或移出），沿用其 hash 並移除舊路徑。
+        """
+        updated = 0
+        for src_path, dst_path, sha256, archived in moves:
+            row = self._connection.execute(
+                "SELECT sha256 FROM library_entries WHERE path = ?",
+                (str(src_path),),
+            ).fetchone()
+            if row is not None:
+                self._connection.execute("DELETE FROM library_entries WHERE path = ?", (str(src_path),))
+                sha256 = sha256 or row[0]
+            stat = _stat(dst_path) if archived else None
+            if stat is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO library_entries (path, size_bytes, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+                    (str(dst_path), stat.st_size, stat.st_mtime_ns, sha256),
+                )
+            if row is not None or stat is not None:
+                updated += 1
+        self._connection.commit()
+        return updated
+
+    def _is_current(self, entry: LibraryEntry) -> bool:
+        stat = _stat(entry.path)
+        return stat is not None and stat.st_size == entry.size_bytes and stat.st_mtime_ns == entry.mtime_ns
+
+
+def _stat(path: Path) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
@@ -0,0 +1,77 @@
+"""衝突檔名配置：記住每個 (資料夾, 主檔名, 副檔名) 下一個可用的序號，不必每次從 _001 線性探測。
+
+結果與原本從 1 開始逐一探測相同：序號只會被規劃或快照中已存在的檔案占用，
+而兩者在規劃期間都只增不減，因此計數器之前的序號對其他檔案永遠不可用；
+唯一例外是來源檔本身（同路徑不算衝突），另外檢查。
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from .dir_index import DirectoryIndex
+
+
+class NameAllocator:
+    def __init__(self, directory_index: DirectoryIndex, digits: int) -> None:
+        self.directory_index = directory_index
+        self.digits = digits
+        self._next_index: dict[tuple[str, str, str], int] = {}
+
+    def allocate(self, directory: Path, filename: str, *, planned: set[str], src_path: Path) -> Path:
+        """回傳 directory 下第一個可用的檔名（filename 或 stem_NNN.ext），並加入 planned。"""
+        candidate = directory / filename
+        if self._is_free(candidate, planned, src_path):
+            planned.add(os.path.normcase(candidate.name))
+            return candidate
+
+        stem = candidate.stem
+        suffix = candidate.suffix
+        key = (os.path.normcase(str(directory)), stem, suffix)
+        start = self._next_index.get(key, 1)
+        own_index = self._own_index(directory, stem, suffix, src_path)
+        if own_index is not None and own_index < start:
+            candidate = directory / self._name(stem, own_index, suffix)
+            if os.path.normcase(candidate.name) not in planned:
+                planned.add(os.path.normcase(candidate.name))
+                return candidate
+
+        index = start
+        while True:
+            candidate = directory / self._name(stem, index, suffix)
+            if self._is_free(candidate, planned, src_path):
+                break
+            index += 1
+        self._next_index[key] = index + 1
+        planned.add(os.path.normcase(candidate.name))
+        return candidate
+
+    def _name(self, stem: str, index: int, suffix: str) -> str:
+        return f"{stem}_{index:0{self.digits}d}{suffix}"
+
+    def _is_free(self, candidate: Path, planned: set[str], src_path: Path) -> bool:
+        if os.path.normcase(candidate.name) in planned:
+            return False
+        return not (self.directory_index.exists(candidate) and not _is_same_path(candidate, src_path))
+
+    def _own_index(self, directory: Path, stem: str, suffix: str, src_path: Path) -> int | None:
+        """來源檔若位於同一資料夾且名稱正是 stem_NNN.ext，回傳其序號。"""
+        if os.path.normcase(str(src_path.parent)) != os.path.normcase(str(directory)):
+            return None
+        name = os.path.normcase(src_path.name)
+        prefix = os.path.normcase(f"{stem}_")
+        tail = os.path.normcase(suffix)
+        if not name.startswith(prefix) or not name.endswith(tail):
+            return None
+        digits = name[len(prefix) : len(name) - len(tail)]
+        if not (digits.isascii() and digits.isdigit()):
+            return None
+        index = int(digits)
+        if index < 1 or os.path.normcase(self._name(stem, index, suffix)) != name:
+            return None
+        return index
+
+
+def _is_same_path(left: Path, right: Path) -> bool:
+    return os.path.normcase(str(left)) == os.path.normcase(str(right))
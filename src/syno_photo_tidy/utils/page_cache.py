@@ -0,0 +1,69 @@
+"""Page cache 提示工具（posix_fadvise）。
+
+大量只讀一次的資料（hash、複製）會把 NAS 上其他服務的熱資料擠出 page cache。
+不支援 posix_fadvise 的平台（例如 Windows）上所有函式皆為 no-op。
+"""
+
+from __future__ import annotations
+
+import os
+
+DEFAULT_DROP_INTERVAL_BYTES = 8 * 1024 * 1024
+
+
+def is_supported() -> bool:
+    return hasattr(os, "posix_fadvise")
+
+
+def advise_sequential(fd: int) -> None:
+    if not is_supported():
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except OSError:
+        return
+
+
+def advise_dontneed(fd: int, offset: int = 0, length: int = 0) -> None:
+    """length 為 0 代表從 offset 到檔尾。"""
+    if not is_supported():
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        return
+
+
+class CacheDropper:
+    """追蹤已處理的位元組，每累積 interval_bytes 就對已完成的範圍送出 DONTNEED。
+
+    寫入端的頁面剛寫完時仍是 dirty，DONTNEED 只會觸發回寫而不會丟棄；
+    lag_bytes 讓丟棄範圍落後目前位置，等前一段回寫完成後再丟。
+    """
+
+    def __init__(
+        self,
+        fd: int,
+        *,
+        interval_bytes: int = DEFAULT_DROP_INTERVAL_BYTES,
+        lag_bytes: int = 0,
+    ) -> None:
+        self.fd = fd
+        self.interval_bytes = max(1, interval_bytes)
+        self.lag_bytes = max(0, lag_bytes)
+        self._dropped_until = 0
+        self._position = 0
+        advise_sequential(fd)
+
+    def advance(self, num_bytes: int) -> None:
+        self._position += num_bytes
+        drop_until = max(0, self._position - self.lag_bytes)
+        if drop_until - self._dropped_until >= self.interval_bytes:
+            if self.lag_bytes:
+                # 先對新完成的範圍啟動回寫，下一輪再丟棄
+                advise_dontneed(self.fd, drop_until, self._position - drop_until)
+            advise_dontneed(self.fd, self._dropped_until, drop_until - self._dropped_until)
+            self._dropped_until = drop_until
+
+    def finish(self) -> None:
+        advise_dontneed(self.fd, 0, 0)
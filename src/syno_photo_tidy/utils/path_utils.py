@@ -37,3 +37,10 @@ def should_exclude_path(path: Path, logger=None) -> bool:
 
 def is_cross_drive(src_path: Path, dst_path: Path) -> bool:
     return src_path.anchor.upper() != dst_path.anchor.upper()
+
+
+def is_within(path: Path, root: Path) -> bool:
+    """path 是否位於 root 之下（含 root 本身）；以 normcase 比較，Windows 上不分大小寫。"""
+    path_value = os.path.normcase(os.path.abspath(path))
+    root_value = os.path.normcase(os.path.abspath(root)).rstrip("\\/")
+    return path_value == root_value or path_value.startswith(root_value + os.sep)
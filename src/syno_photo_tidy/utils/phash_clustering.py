@@ -0,0 +1,116 @@
+"""以 union-find 做相似 hash 的遞移分群，鄰接圖可分片平行建立。
+
+分片大小固定（與 worker 數無關），邊依 (距離, 索引) 排序後才合併，
+因此同一組 hash 不論 worker 數多少，分群結果都相同。
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Sequence
+
+from . import hamming_index
+
+DEFAULT_SHARD_ROWS = 4096
+
+
+class UnionFind:
+    """以較小索引為根的 union-find，根不受合併順序影響。"""
+
+    def __init__(self, size: int) -> None:
+        self._parent = list(range(size))
+
+    def find(self, index: int) -> int:
+        root = index
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[index] != root:
+            self._parent[index], index = root, self._parent[index]
+        return root
+
+    def union(self, left: int, right: int) -> int:
+        left_root = self.find(left)
+        right_root = self.find(right)
+        if left_root == right_root:
+            return left_root
+        root, child = sorted((left_root, right_root))
+        self._parent[child] = root
+        return root
+
+
+def neighbor_graph(
+    keys: Sequence[int],
+    radius: int,
+    *,
+    block_size: int = hamming_index.DEFAULT_BLOCK_SIZE,
+    shard_rows: int = DEFAULT_SHARD_ROWS,
+    workers: int = 1,
+) -> list[list[int]]:
+    """與 hamming_index.earlier_neighbors 相同的輸出，依列分片後以執行緒平行計算。
+
+    NumPy 的位元運算會釋放 GIL，因此執行緒即可平行；分片結果依列順序串接。
+    """
+    count = len(keys)
+    shard_rows = max(1, int(shard_rows))
+    shards = [(start, min(count, start + shard_rows)) for start in range(0, count, shard_rows)]
+    if workers <= 1 or len(shards) <= 1:
+        parts = [
+            hamming_index.earlier_neighbors(keys, radius, block_size, start=start, stop=stop)
+            for start, stop in shards
+        ]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            parts = list(
+                executor.map(
+                    lambda shard: hamming_index.earlier_neighbors(
+                        keys, radius, block_size, start=shard[0], stop=shard[1]
+                    ),
+                    shards,
+                )
+            )
+    neighbors: list[list[int]] = []
+    for part in parts:
+        neighbors.extend(part)
+    return neighbors
+
+
+def cluster(
+    keys: Sequence[int],
+    neighbors: Sequence[Sequence[int]],
+    *,
+    max_diameter: Optional[int] = None,
+) -> list[list[int]]:
+    """依鄰接關係（每個索引之前的相近索引）做遞移分群，回傳遞增排序的成員索引，群組依最小成員排序。
+
+    max_diameter 指定時，合併前確認兩群所有跨群配對的距離都不超過此值（complete linkage），
+    避免 A~B、B~C… 的鏈把差異很大的影像串在一起。
+    """
+    edges = sorted(
+        (hamming_index.hamming_distance(keys[position], keys[other]), other, position)
+        for position, others in enumerate(neighbors)
+        for other in others
+    )
+    union_find = UnionFind(len(keys))
+    members: dict[int, list[int]] = {}
+    for _distance, left, right in edges:
+        left_root = union_find.find(left)
+        right_root = union_find.find(right)
+        if left_root == right_root:
+            continue
+        left_members = members.get(left_root, [left_root])
+        right_members = members.get(right_root, [right_root])
+        if max_diameter is not None and any(
+            hamming_index.hamming_distance(keys[a], keys[b]) > max_diameter
+            for a in left_members
+            for b in right_members
+        ):
+            continue
+        root = union_find.union(left_root, right_root)
+        members.pop(left_root, None)
+        members.pop(right_root, None)
+        members[root] = left_members + right_members
+
+    groups: dict[int, list[int]] = {}
+    for index in range(len(keys)):
+        groups.setdefault(union_find.find(index), []).append(index)
+    return sorted(groups.values(), key=lambda group: group[0])
@@ -0,0 +1,195 @@
+"""跨次執行保存的 pHash 索引（sqlite）。
+
+以檔案識別（st_dev, st_ino）為鍵，size 與 mtime_ns 任一改變即視為失效；
+params 記錄計算方式（來源、縮小解碼尺寸），設定改變時同樣重新計算。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import sqlite3
+from typing import Iterable, Optional
+
+from .logger import get_logger
+
+_SIGN_BIT = 1 << 63
+_UINT64 = 1 << 64
+
+
+@dataclass(frozen=True)
+class FileSignature:
+    device_id: int
+    inode: int
+    size_bytes: int
+    mtime_ns: int
+
+    @classmethod
+    def from_path(cls, path: Path) -> Optional["FileSignature"]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not stat.st_ino:
+            return None
+        return cls(stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+@dataclass(frozen=True)
+class IndexedHash:
+    path: Path
+    signature: FileSignature
+    key: int
+    params: str
+
+
+def _to_signed(key: int) -> int:
+    # sqlite INTEGER 為有號 64 位元
+    return key - _UINT64 if key >= _SIGN_BIT else key
+
+
+def _to_unsigned(value: int) -> int:
+    return value + _UINT64 if value < 0 else value
+
+
+class PhashIndex:
+    def __init__(self, db_path: Path, logger=None) -> None:
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(db_path))
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS phash_entries (
+                device_id INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                phash INTEGER NOT NULL,
+                params TEXT NOT NULL,
+                archived INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (device_id, inode)
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_phash_path ON phash_entries(path)")
+        self._connection.commit()
+
+    def __enter__(self) -> "PhashIndex":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def lookup(self, signature: FileSignature, params: str) -> Optional[int]:
+        row = self._connection.execute(
+            "SELECT size_bytes, mtime_ns, phash, params FROM phash_entries WHERE device_id = ? AND inode = ?",
+            (signature.device_id, signature.inode),
+        ).fetchone()
+        if row is None:
+            return None
+        size_bytes, mtime_ns, value, stored_params = row
+        if size_bytes != signature.size_bytes or mtime_ns != signature.mtime_ns or stored_params != params:
+            return None
+        return _to_unsigned(value)
+
+    def store_many(self, entries: Iterable[tuple[Path, FileSignature, int]], params: str) -> None:
+        self._connection.executemany(
+            """
+            INSERT INTO phash_entries (device_id, inode, path, size_bytes, mtime_ns, phash, params, archived)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 0)
+            ON CONFLICT (device_id, inode) DO UPDATE SET
+                path = excluded.path,
+                size_bytes = excluded.size_bytes,
+                mtime_ns = excluded.mtime_ns,
+                phash = excluded.phash,
+                params = excluded.params
+            """,
+            [
+                (
+                    signature.device_id,
+                    signature.inode,
+                    str(path),
+                    signature.size_bytes,
+                    signature.mtime_ns,
+                    _to_signed(key),
+                    params,
+                )
+                for path, signature, key in entries
+            ],
+        )
+        self._connection.commit()
+
+    def archived_entries(self, params: str) -> list[IndexedHash]:
+        """回傳已封存且目前仍有效的項目；檔案已刪除或被修改的項目會一併移除。"""
+        rows = self._connection.execute(
+            "SELECT device_id, inode, path, size_bytes, mtime_ns, phash, params "
+            "FROM phash_entries WHERE archived = 1 AND params = ? ORDER BY path",
+            (params,),
+        ).fetchall()
+        valid: list[IndexedHash] = []
+        stale: list[tuple[int, int]] = []
+        for device_id, inode, path_value, size_bytes, mtime_ns, value, stored_params in rows:
+            stored = FileSignature(device_id, inode, size_bytes, mtime_ns)
+            if FileSignature.from_path(Path(path_value)) != stored:
+                stale.append((device_id, inode))
+                continue
+            valid.append(IndexedHash(Path(path_value), stored, _to_unsigned(value), stored_params))
+        if stale:
+            self._connection.executemany(
+                "DELETE FROM phash_entries WHERE device_id = ? AND inode = ?",
+                stale,
+            )
+            self._connection.commit()
+        return valid
+
+    def record_moves(self, moves: Iterable[tuple[Path, Path, bool]]) -> int:
+        """Execute 後更新索引：(來源, 目的, 是否封存到 KEEP)。
+
+        同一磁碟區內搬移時 inode 不變，只需更新路徑；跨磁碟區複製則以來源路徑找回原本的 hash。
+        """
+        updated = 0
+        for src_path, dst_path, archived in moves:
+            signature = FileSignature.from_path(dst_path)
+            if signature is None:
+                continue
+            row = self._connection.execute(
+                "SELECT device_id, inode, phash, params, size_bytes FROM phash_entries "
+                "WHERE (device_id = ? AND inode = ?) OR path = ? "
+                "ORDER BY (device_id = ? AND inode = ?) DESC LIMIT 1",
+                (signature.device_id, signature.inode, str(src_path), signature.device_id, signature.inode),
+            ).fetchone()
+            if row is None:
+                continue
+            device_id, inode, value, params, size_bytes = row
+            if size_bytes != signature.size_bytes:
+                continue
+            self._connection.execute(
+                "DELETE FROM phash_entries WHERE device_id = ? AND inode = ?",
+                (device_id, inode),
+            )
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO phash_entries
+                    (device_id, inode, path, size_bytes, mtime_ns, phash, params, archived)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    signature.device_id,
+                    signature.inode,
+                    str(dst_path),
+                    signature.size_bytes,
+                    signature.mtime_ns,
+                    value,
+                    params,
+                    1 if archived else 0,
+                ),
+            )
+            updated += 1
+        self._connection.commit()
+        return updated
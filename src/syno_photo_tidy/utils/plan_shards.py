@@ -0,0 +1,50 @@
+"""依資料夾分片的規劃工具：檔名衝突只發生在同一資料夾內，各分片可獨立並行規劃。
+
+分片內維持輸入順序，合併時依原始位置排序，因此結果與單執行緒依序規劃完全相同。
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def shard_by_directory(entries: Iterable[tuple[Path, T]]) -> list[list[tuple[int, T]]]:
+    """以 (資料夾, 項目) 分片，回傳各分片的 (原始位置, 項目)；分片依首次出現的順序排列。"""
+    shards: dict[str, list[tuple[int, T]]] = {}
+    for position, (directory, value) in enumerate(entries):
+        shards.setdefault(os.path.normcase(str(directory)), []).append((position, value))
+    return list(shards.values())
+
+
+def run_shards(
+    shards: Sequence[T],
+    plan_shard: Callable[[T], R],
+    *,
+    workers: int,
+    on_shard_done: Optional[Callable[[R], None]] = None,
+) -> list[R]:
+    """依分片順序回傳結果；workers 大於 1 且有多個分片時以執行緒池並行，on_shard_done 在呼叫端執行緒執行。"""
+    if workers <= 1 or len(shards) <= 1:
+        results = []
+        for shard in shards:
+            result = plan_shard(shard)
+            results.append(result)
+            if on_shard_done is not None:
+                on_shard_done(result)
+        return results
+
+    ordered: list[Optional[R]] = [None] * len(shards)
+    with ThreadPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+        futures = {executor.submit(plan_shard, shard): index for index, shard in enumerate(shards)}
+        for future in as_completed(futures):
+            result = future.result()
+            ordered[futures[future]] = result
+            if on_shard_done is not None:
+                on_shard_done(result)
+    return ordered  # type: ignore[return-value]
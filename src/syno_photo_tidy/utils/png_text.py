@@ -0,0 +1,77 @@
+"""串流讀取 PNG 的文字 chunk（tEXt/zTXt/iTXt）與 eXIf，遇到第一個 IDAT 即停止。
+
+只讀取 chunk 標頭，其他 chunk（iCCP 等）以 seek 跳過，不解碼影像；與 PIL 開啟檔案時
+放入 info 的文字相同（IDAT 之後的文字 chunk PIL 也要到 load() 才會讀取）。
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+TEXT_CHUNKS = {b"tEXt", b"zTXt", b"iTXt", b"eXIf"}
+# 單一文字 chunk 的大小與解壓縮後的上限，避免異常檔案佔用大量記憶體
+MAX_CHUNK_BYTES = 1024 * 1024
+MAX_TEXT_BYTES = 1024 * 1024
+
+
+def read_png_text(path: Path | str) -> dict[str, str]:
+    """回傳 {keyword: text}；eXIf 以 "exif" 為鍵並以 latin-1 解碼。不是 PNG 時擲出 ValueError。"""
+    texts: dict[str, str] = {}
+    with open(path, "rb") as handle:
+        if handle.read(8) != PNG_SIGNATURE:
+            raise ValueError("not a PNG file")
+        while True:
+            header = handle.read(8)
+            if len(header) < 8:
+                break
+            length = int.from_bytes(header[:4], "big")
+            chunk_type = header[4:8]
+            if chunk_type in (b"IDAT", b"IEND"):
+                break
+            if chunk_type not in TEXT_CHUNKS or length > MAX_CHUNK_BYTES:
+                handle.seek(length + 4, 1)
+                continue
+            data = handle.read(length)
+            handle.seek(4, 1)  # CRC
+            if len(data) < length:
+                break
+            parsed = _parse_chunk(chunk_type, data)
+            if parsed is not None:
+                texts[parsed[0]] = parsed[1]
+    return texts
+
+
+def _parse_chunk(chunk_type: bytes, data: bytes) -> Optional[tuple[str, str]]:
+    if chunk_type == b"eXIf":
+        return "exif", data.decode("latin-1")
+    keyword, separator, rest = data.partition(b"\x00")
+    if not separator:
+        return None
+    key = keyword.decode("latin-1")
+    if chunk_type == b"tEXt":
+        return key, rest.decode("latin-1")
+    if chunk_type == b"zTXt":
+        text = _inflate(rest[1:]) if rest[:1] == b"\x00" else None
+        return (key, text.decode("latin-1")) if text is not None else None
+    # iTXt：壓縮旗標、壓縮方法、語言標籤\0、翻譯後關鍵字\0、UTF-8 文字
+    if len(rest) < 2:
+        return None
+    compressed = rest[0] == 1
+    _language, _, rest = rest[2:].partition(b"\x00")
+    _translated, _, text = rest.partition(b"\x00")
+    if compressed:
+        text = _inflate(text)
+        if text is None:
+            return None
+    return key, text.decode("utf-8", errors="replace")
+
+
+def _inflate(data: bytes) -> Optional[bytes]:
+    decompressor = zlib.decompressobj()
+    try:
+        return decompressor.decompress(data, MAX_TEXT_BYTES)
+    except zlib.error:
+        return None
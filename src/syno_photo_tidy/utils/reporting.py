@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import csv
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Iterable
@@ -35,6 +35,8 @@ REPORT_FIELDNAMES = [
     "pair_confidence",
     "is_screenshot",
     "screenshot_evidence",
+    "fused_from",
+    "via_path",
 ]
 
 
@@ -59,6 +61,7 @@ class SummaryInfo:
     planned_duplicate_move_count: int
     cross_drive_copy: bool
     no_changes_needed: bool
+    visual_stage_counts: Dict[str, int] = field(default_factory=dict)
 
 
 def ensure_report_dir(output_root: Path) -> Path:
@@ -127,9 +130,13 @@ def build_summary_text(info: SummaryInfo) -> str:
         "--- 去重結果 ---",
         f"精確去重: {info.exact_duplicate_count} 個 ({format_bytes_gb(info.exact_duplicate_size_bytes)})",
         f"相似去重: {info.visual_duplicate_count} 個 ({format_bytes_gb(info.visual_duplicate_size_bytes)})",
-        "",
-        "--- 行動計畫 ---",
     ]
+    if info.visual_stage_counts:
+        lines.append(
+            "相似去重各階段: "
+            + ", ".join(f"{name}={value}" for name, value in info.visual_stage_counts.items())
+        )
+    lines.extend(["", "--- 行動計畫 ---"])
 
     if info.no_changes_needed:
         lines.append("No changes needed")
@@ -184,6 +191,7 @@ def build_summary_info(
     planned_duplicate_move_count: int = 0,
     cross_drive_copy: bool,
     no_changes_needed: bool,
+    visual_stage_counts: Dict[str, int] | None = None,
 ) -> SummaryInfo:
     run_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     return SummaryInfo(
@@ -206,6 +214,7 @@ def build_summary_info(
         planned_duplicate_move_count=planned_duplicate_move_count,
         cross_drive_copy=cross_drive_copy,
         no_changes_needed=no_changes_needed,
+        visual_stage_counts=dict(visual_stage_counts or {}),
     )
 
 
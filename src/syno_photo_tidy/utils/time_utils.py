@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import Optional, Tuple
 
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
 
 def format_exif_time(value: str) -> Optional[str]:
     try:
@@ -30,6 +33,33 @@ def lock_timestamp(
     return "1970-01-01 00:00:00", "unknown"
 
 
+def locked_timestamp_to_epoch(value: str) -> Optional[int]:
+    """將 timestamp_locked（YYYY-MM-DD HH:MM:SS，牆上時間）轉為秒數，格式不符回傳 None。
+
+    格式固定，直接依位置切片，由 date 驗證日期後以序數計算秒數，不經過 strptime。
+    """
+    if not isinstance(value, str) or len(value) != 19 or value[4] != "-" or value[7] != "-":
+        return None
+    if value[10] != " " or value[13] != ":" or value[16] != ":":
+        return None
+    digits = value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    hour, minute, second = int(digits[8:10]), int(digits[10:12]), int(digits[12:14])
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    try:
+        day_number = date(int(digits[0:4]), int(digits[4:6]), int(digits[6:8])).toordinal()
+    except ValueError:
+        return None
+    return (day_number - _EPOCH_ORDINAL) * 86400 + hour * 3600 + minute * 60 + second
+
+
+def epoch_to_datetime(epoch: int) -> datetime:
+    """locked_timestamp_to_epoch 的反向轉換（naive 牆上時間）；不經過 OS 的 gmtime，負值也可用。"""
+    return _EPOCH + timedelta(seconds=epoch)
+
+
 def get_scan_timezone() -> str:
     now = datetime.now().astimezone()
     offset = now.utcoffset() or timezone.utc.utcoffset(now)
@@ -0,0 +1,53 @@
+import struct
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from syno_photo_tidy.utils import apple_metadata, image_utils
+
+CONTENT_ID = "2F1E6F1C-8B3A-4C59-9D7E-0A1B2C3D4E5F"
+
+
+def _atom(atom_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", len(payload) + 8) + atom_type + payload
+
+
+def _apple_makernote(content_id: str) -> bytes:
+    value = content_id.encode("ascii") + b"\x00"
+    entries = [
+        struct.pack(">HHII", 0x0001, 9, 1, 14),
+        # 超過 4 bytes 的值放在 IFD 之後，偏移量相對於 MakerNote 開頭
+        struct.pack(">HHII", apple_metadata.APPLE_CONTENT_IDENTIFIER_TAG, 2, len(value), 14 + 2 + 2 * 12 + 4),
+    ]
+    return b"Apple iOS\x00\x00\x01MM" + struct.pack(">H", len(entries)) + b"".join(entries) + b"\x00" * 4 + value
+
+
+def _write_mov(path: Path, content_id: str) -> None:
+    key = apple_metadata.CONTENT_IDENTIFIER_KEY
+    keys = _atom(b"keys", struct.pack(">II", 0, 2) + _atom(b"mdta", b"com.apple.quicktime.make") + _atom(b"mdta", key))
+    items = _atom(
+        b"ilst",
+        _atom(struct.pack(">I", 1), _atom(b"data", struct.pack(">II", 1, 0) + b"Apple"))
+        + _atom(struct.pack(">I", 2), _atom(b"data", struct.pack(">II", 1, 0) + content_id.encode("utf-8"))),
+    )
+    meta = _atom(b"meta", _atom(b"hdlr", b"\x00" * 8 + b"mdta" + b"\x00" * 12) + keys + items)
+    moov = _atom(b"moov", _atom(b"mvhd", b"\x00" * 100) + meta)
+    path.write_bytes(_atom(b"ftyp", b"qt  \x00\x00\x00\x00qt  ") + _atom(b"mdat", b"\x00" * 4096) + moov)
+
+
+def test_read_quicktime_content_identifier(tmp_path: Path) -> None:
+    path = tmp_path / "IMG_0001.MOV"
+    _write_mov(path, CONTENT_ID)
+
+    assert apple_metadata.read_quicktime_content_identifier(path) == CONTENT_ID
+    assert apple_metadata.read_quicktime_content_identifier(path, max_moov_bytes=16) is None
+
+
+def test_read_image_metadata_content_identifier(tmp_path: Path) -> None:
+    piexif = pytest.importorskip("piexif")
+    path = tmp_path / "IMG_0001.JPG"
+    exif = piexif.dump({"Exif": {piexif.ExifIFD.MakerNote: _apple_makernote(CONTENT_ID)}})
+    Image.new("RGB", (32, 32)).save(path, exif=exif)
+
+    assert image_utils.read_image_metadata(path).content_identifier == CONTENT_ID
@@ -66,3 +66,38 @@ def test_archiver_disabled(tmp_path: Path) -> None:
 
     assert result.plan == []
     assert len(result.skipped) == 1
+
+
+def test_archiver_avoids_existing_names_from_directory_snapshot(tmp_path: Path) -> None:
+    file_path = tmp_path / "source.jpg"
+    file_path.write_text("a", encoding="utf-8")
+    output_root = tmp_path / "Processed_20260211_143015"
+    existing_dir = output_root / "KEEP" / "2024" / "07"
+    existing_dir.mkdir(parents=True)
+    (existing_dir / "source.jpg").write_text("b", encoding="utf-8")
+
+    info = _make_file(file_path, "2024-07-15 14:30:00")
+    result = Archiver(ConfigManager()).generate_plan([info], output_root)
+
+    assert result.plan[0].dst_path == existing_dir / "source_001.jpg"
+
+
+def test_archiver_sharded_plan_matches_single_worker(tmp_path: Path) -> None:
+    output_root = tmp_path / "Processed_20260211_143015"
+    (output_root / "KEEP" / "2024" / "03").mkdir(parents=True)
+    (output_root / "KEEP" / "2024" / "03" / "photo.jpg").write_text("existing", encoding="utf-8")
+    files = []
+    for index in range(40):
+        path = tmp_path / f"source_{index % 4}" / "photo.jpg"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text("x", encoding="utf-8")
+        files.append(_make_file(path, f"2024-{index % 5 + 1:02d}-15 14:30:00"))
+
+    def plan(workers: int) -> list[tuple[Path, Path]]:
+        config = ConfigManager()
+        config.set("plan.workers", workers)
+        return [(item.src_path, item.dst_path) for item in Archiver(config).generate_plan(files, output_root).plan]
+
+    single = plan(1)
+    assert len({dst for _, dst in single}) == 40
+    assert plan(4) == single
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from syno_photo_tidy.utils import CancellationToken, CancelledError
+from syno_photo_tidy.utils.byte_compare import partition_identical
+
+
+def test_partition_identical_splits_on_divergence(tmp_path: Path) -> None:
+    head = b"x" * 10000
+    contents = [head + b"A" * 50000, head + b"B" * 50000, head + b"A" * 50000, b"y" * 60000]
+    paths = []
+    for index, content in enumerate(contents):
+        path = tmp_path / f"file_{index}.bin"
+        path.write_bytes(content)
+        paths.append(path)
+    read_total = 0
+
+    def _count(delta: int) -> None:
+        nonlocal read_total
+        read_total += delta
+
+    groups = partition_identical(paths, chunk_size_kb=4, max_workers=2, bytes_callback=_count)
+
+    assert groups == [[0, 2]]
+    # file_3 在第一個區塊就分歧，不會被讀到檔尾
+    assert read_total < sum(len(content) for content in contents)
+
+
+def test_partition_identical_skips_missing_file(tmp_path: Path) -> None:
+    existing = tmp_path / "a.bin"
+    existing.write_bytes(b"same")
+    copy = tmp_path / "b.bin"
+    copy.write_bytes(b"same")
+
+    groups = partition_identical([existing, tmp_path / "missing.bin", copy])
+
+    assert groups == [[0, 2]]
+
+
+def test_partition_identical_cancel(tmp_path: Path) -> None:
+    paths = []
+    for name in ("a.bin", "b.bin"):
+        path = tmp_path / name
+        path.write_bytes(b"same")
+        paths.append(path)
+    token = CancellationToken()
+    token.set()
+
+    with pytest.raises(CancelledError):
+        partition_identical(paths, cancel_token=token)
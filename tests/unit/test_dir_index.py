@@ -0,0 +1,18 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from syno_photo_tidy.utils.dir_index import DirectoryIndex
+
+
+def test_directory_index_lists_each_directory_once(tmp_path: Path) -> None:
+    (tmp_path / "IMG_0001.jpg").write_text("a", encoding="utf-8")
+    index = DirectoryIndex()
+
+    with patch("syno_photo_tidy.utils.dir_index.os.scandir", wraps=os.scandir) as scandir:
+        assert index.exists(tmp_path / "IMG_0001.jpg")
+        assert not index.exists(tmp_path / "IMG_0002.jpg")
+        assert not index.exists(tmp_path / "missing" / "IMG_0001.jpg")
+        assert not index.exists(tmp_path / "missing" / "IMG_0002.jpg")
+
+    assert scandir.call_count == 2
@@ -1,9 +1,17 @@
+import os
 import shutil
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from unittest.mock import patch
+
+import pytest
 
 from syno_photo_tidy.config import ConfigManager
 from syno_photo_tidy.core import ExactDeduper
-from syno_photo_tidy.models import FileInfo
+from syno_photo_tidy.models import FileInfo, ManifestEntry, ProgressEvent, ProgressEventType
+from syno_photo_tidy.utils import CancellationToken, CancelledError, hash_calc
+from syno_photo_tidy.utils.io_scheduler import IOScheduler
 
 
 def _make_file_info(path: Path, size_bytes: int) -> FileInfo:
@@ -61,3 +69,253 @@ def test_exact_deduper_skip_other(tmp_path: Path) -> None:
     assert len(result.duplicates) == 0
     assert len(result.groups) == 0
     assert len(result.keepers) == 2
+
+
+def test_exact_deduper_hardlinks_skip_hashing(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    original = source_dir / "photo_a.jpg"
+    linked = source_dir / "photo_b.jpg"
+    original.write_bytes(b"hardlinked-bytes")
+    try:
+        os.link(original, linked)
+    except (OSError, NotImplementedError):
+        pytest.skip("此環境無法建立 hardlink")
+
+    files = [
+        _make_file_info(original, original.stat().st_size),
+        _make_file_info(linked, linked.stat().st_size),
+    ]
+
+    with patch("syno_photo_tidy.core.exact_deduper.hash_calc.compute_hashes") as compute:
+        result = ExactDeduper(ConfigManager()).dedupe(files)
+
+    compute.assert_not_called()
+    assert len(result.groups) == 1
+    assert len(result.duplicates) == 1
+    assert result.groups[0].keeper.path == original
+
+
+def test_exact_deduper_hashes_hardlink_once(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    original = source_dir / "photo_a.jpg"
+    linked = source_dir / "photo_b.jpg"
+    copied = source_dir / "photo_c.jpg"
+    original.write_bytes(b"shared-bytes")
+    shutil.copy2(original, copied)
+    try:
+        os.link(original, linked)
+    except (OSError, NotImplementedError):
+        pytest.skip("此環境無法建立 hardlink")
+
+    files = [_make_file_info(path, path.stat().st_size) for path in (original, linked, copied)]
+    config = ConfigManager()
+    config.set("hash.parallel_workers", 1)
+
+    with patch(
+        "syno_photo_tidy.core.exact_deduper.hash_calc.compute_hashes",
+        wraps=hash_calc.compute_hashes,
+    ) as compute:
+        result = ExactDeduper(config).dedupe(files)
+
+    assert compute.call_count == 2
+    assert len(result.groups) == 1
+    assert len(result.duplicates) == 2
+    assert all(item.hash_sha256 == files[0].hash_sha256 for item in files)
+
+
+def test_exact_deduper_inode_read_order(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    files = []
+    for name in ("c.jpg", "a.jpg", "b.jpg"):
+        path = source_dir / name
+        path.write_bytes(name.encode("utf-8"))
+        files.append(_make_file_info(path, path.stat().st_size))
+
+    config = ConfigManager()
+    config.set("hash.parallel_workers", 1)
+    config.set("hash.read_order", "inode")
+    read_paths: list[Path] = []
+    compute_hashes = hash_calc.compute_hashes
+
+    def _record(path, **kwargs):
+        read_paths.append(path)
+        return compute_hashes(path, **kwargs)
+
+    with patch("syno_photo_tidy.core.exact_deduper.hash_calc.compute_hashes", side_effect=_record):
+        ExactDeduper(config).dedupe(files)
+
+    inodes = [path.stat().st_ino for path in read_paths]
+    assert inodes == sorted(inodes)
+
+
+def test_exact_deduper_emits_hashing_events(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    files = []
+    for name in ("a.jpg", "b.jpg"):
+        path = source_dir / name
+        path.write_bytes(b"same-bytes")
+        files.append(_make_file_info(path, path.stat().st_size))
+
+    events: list[ProgressEvent] = []
+    ExactDeduper(ConfigManager()).dedupe(files, progress_event_callback=events.append)
+
+    event_types = [event.event_type for event in events]
+    assert event_types[0] == ProgressEventType.PHASE_START
+    assert event_types[-1] == ProgressEventType.PHASE_END
+    assert event_types.count(ProgressEventType.FILE_START) == 2
+    assert event_types.count(ProgressEventType.FILE_DONE) == 2
+    assert all(event.phase_name == "Hashing" for event in events)
+    assert events[-1].run_processed_bytes == events[-1].run_total_bytes == 20
+
+
+def test_exact_deduper_emits_mid_file_progress(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    payload = b"z" * (2 * 1024 * 1024)
+    files = []
+    for name in ("a.jpg", "b.jpg"):
+        path = source_dir / name
+        path.write_bytes(payload)
+        files.append(_make_file_info(path, path.stat().st_size))
+
+    config = ConfigManager()
+    config.set("hash.chunk_size_kb", 64)
+    config.set("progress.bytes_update_threshold", 256 * 1024)
+    events: list[ProgressEvent] = []
+    ExactDeduper(config).dedupe(files, progress_event_callback=events.append)
+
+    for info in files:
+        progress = [
+            event.file_processed_bytes
+            for event in events
+            if event.event_type == ProgressEventType.FILE_PROGRESS and event.file_path == str(info.path)
+        ]
+        assert any(0 < value < len(payload) for value in progress)
+        assert progress == sorted(set(progress))
+        assert progress[-1] == len(payload)
+
+
+def test_exact_deduper_byte_compare_holds_device_slots(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    files = []
+    for name in ("a.jpg", "b.jpg", "c.jpg", "d.jpg"):
+        path = source_dir / name
+        path.write_bytes(b"q" * 50000)
+        files.append(_make_file_info(path, path.stat().st_size))
+
+    config = ConfigManager()
+    config.set("hash.verify_mode", "bytes")
+    scheduler = IOScheduler(default_workers=2)
+    original_slot = scheduler.slot
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    slotted: set[Path] = set()
+
+    @contextmanager
+    def tracking_slot(*paths):
+        nonlocal active, peak
+        with original_slot(*paths):
+            with lock:
+                active += 1
+                peak = max(peak, active)
+                slotted.update(paths)
+            try:
+                yield
+            finally:
+                with lock:
+                    active -= 1
+
+    scheduler.slot = tracking_slot
+    result = ExactDeduper(config, io_scheduler=scheduler).dedupe(files)
+
+    assert len(result.keepers) == 1
+    assert slotted == {info.path for info in files}
+    assert 1 <= peak <= 2
+
+
+def test_exact_deduper_cancel(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    files = []
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        path = source_dir / name
+        path.write_bytes(b"same-bytes")
+        files.append(_make_file_info(path, path.stat().st_size))
+
+    token = CancellationToken()
+    token.set()
+    events: list[ProgressEvent] = []
+
+    with pytest.raises(CancelledError):
+        ExactDeduper(ConfigManager()).dedupe(
+            files,
+            cancel_token=token,
+            progress_event_callback=events.append,
+        )
+
+    assert events[-1].event_type == ProgressEventType.PHASE_END
+    assert events[-1].status == "CANCELLED"
+
+
+def test_exact_deduper_bytes_verify_mode(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    files = []
+    for name, content in (("a.jpg", b"same-bytes"), ("b.jpg", b"diff-bytes"), ("c.jpg", b"same-bytes")):
+        path = source_dir / name
+        path.write_bytes(content)
+        files.append(_make_file_info(path, path.stat().st_size))
+
+    config = ConfigManager()
+    config.set("hash.verify_mode", "bytes")
+    events: list[ProgressEvent] = []
+
+    with patch("syno_photo_tidy.core.exact_deduper.hash_calc.compute_hashes") as compute:
+        result = ExactDeduper(config).dedupe(files, progress_event_callback=events.append)
+
+    compute.assert_not_called()
+    assert len(result.groups) == 1
+    assert result.groups[0].keeper.path == files[0].path
+    assert [item.path for item in result.duplicates] == [files[2].path]
+    assert events[-1].run_processed_bytes == events[-1].run_total_bytes == 30
+    assert all(event.op_type == "compare" for event in events)
+
+
+def test_exact_deduper_matches_library(tmp_path: Path) -> None:
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    archived = tmp_path / "out" / "KEEP" / "2024" / "07" / "IMG_0001.jpg"
+    archived.parent.mkdir(parents=True)
+    archived.write_bytes(b"archived-bytes")
+    uploaded_again = inbox / "photo.jpg"
+    shutil.copy2(archived, uploaded_again)
+    same_size = inbox / "other.jpg"
+    same_size.write_bytes(b"different-byte")
+
+    config = ConfigManager()
+    config.set("library.index_path", str(tmp_path / "library.sqlite"))
+    deduper = ExactDeduper(config)
+    # 上層資料夾剛好叫 KEEP 的 TO_DELETE 不算圖庫
+    trashed = tmp_path / "KEEP" / "photos" / "Processed_x" / "TO_DELETE" / "dup.jpg"
+    trashed.parent.mkdir(parents=True)
+    trashed.write_bytes(b"archived-bytes")
+    entries = [
+        ManifestEntry("ARCHIVE", str(tmp_path / "a.jpg"), str(archived), "MOVED"),
+        ManifestEntry("MOVE", str(tmp_path / "b.jpg"), str(trashed), "MOVED"),
+    ]
+    assert deduper.record_moves(entries, tmp_path / "out") == 1
+    assert deduper.record_moves(entries[1:], trashed.parents[1]) == 0
+
+    files = [_make_file_info(path, path.stat().st_size) for path in (uploaded_again, same_size)]
+    result = deduper.dedupe(files)
+
+    assert [match.item.path for match in result.library_matches] == [uploaded_again]
+    assert result.library_matches[0].library_path == archived
+    assert [item.path for item in result.duplicates] == [uploaded_again]
+    assert [item.path for item in result.keepers] == [same_size]
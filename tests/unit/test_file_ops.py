@@ -1,7 +1,10 @@
 from pathlib import Path
 from unittest.mock import patch
 
-from syno_photo_tidy.utils import file_ops
+import pytest
+
+from syno_photo_tidy.config import ConfigManager
+from syno_photo_tidy.utils import CancellationToken, CancelledError, file_ops, page_cache
 
 
 def test_move_or_copy_move(tmp_path: Path) -> None:
@@ -84,3 +87,42 @@ def test_safe_copy2_retry_failed(tmp_path: Path) -> None:
     assert result.retry_count == 2
     assert result.error_message is not None
     assert "Network error" in result.error_message
+
+
+def test_safe_copy2_page_cache_hints_use_chunked_copy(tmp_path: Path) -> None:
+    src = tmp_path / "source.bin"
+    dst = tmp_path / "dest.bin"
+    src.write_bytes(b"hello" * 1024)
+
+    config = ConfigManager()
+    config.set("io.page_cache_hints", True)
+
+    with patch(
+        "syno_photo_tidy.utils.file_ops.chunked_copy",
+        wraps=file_ops.chunked_copy,
+    ) as chunked:
+        result = file_ops.safe_copy2(src, dst, config=config)
+
+    assert result.success is True
+    assert chunked.call_args.kwargs["drop_page_cache"] is True
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_chunked_copy_drops_page_cache_on_cancel(tmp_path: Path) -> None:
+    src = tmp_path / "source.bin"
+    dst = tmp_path / "dest.bin"
+    src.write_bytes(b"x" * (256 * 1024))
+    token = CancellationToken()
+
+    with patch.object(page_cache.CacheDropper, "finish", autospec=True) as finish:
+        with pytest.raises(CancelledError):
+            file_ops.chunked_copy(
+                src,
+                dst,
+                progress_callback=lambda copied, total: token.set(),
+                cancel_token=token,
+                chunk_size_kb=64,
+                drop_page_cache=True,
+            )
+
+    assert finish.call_count == 2
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from syno_photo_tidy.utils.hamming_index import (
+    BKTree,
+    earlier_neighbors,
+    earlier_neighbors_bktree,
+    hamming_distance,
+)
+
+
+def test_bk_tree_query_matches_brute_force() -> None:
+    rng = random.Random(42)
+    keys = [rng.getrandbits(64) for _ in range(500)]
+    # 加入一些彼此接近的 hash
+    keys += [keys[0] ^ (1 << bit) for bit in range(10)]
+    tree: BKTree[int] = BKTree()
+    for index, key in enumerate(keys):
+        tree.add(key, index)
+
+    for probe in keys[:20] + [rng.getrandbits(64) for _ in range(20)]:
+        for radius in (0, 4, 12):
+            expected = {index for index, key in enumerate(keys) if hamming_distance(probe, key) <= radius}
+            found = {value for _distance, value in tree.query(probe, radius)}
+            assert found == expected
+
+    assert len(tree) == len(keys)
+
+
+def test_earlier_neighbors_matches_brute_force() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    keys = [rng.getrandbits(64) for _ in range(300)]
+    keys += [keys[index] ^ (1 << rng.randrange(64)) for index in range(0, 300, 3)]
+    rng.shuffle(keys)
+
+    neighbors = earlier_neighbors(keys, 6, block_size=64)
+
+    for index, key in enumerate(keys):
+        expected = [other for other in range(index) if hamming_distance(key, keys[other]) <= 6]
+        assert neighbors[index] == expected
+
+
+def test_earlier_neighbors_bktree_matches_numpy() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(11)
+    keys = [rng.getrandbits(64) for _ in range(200)]
+    keys += [keys[index] ^ (1 << rng.randrange(64)) for index in range(0, 200, 4)]
+
+    assert earlier_neighbors_bktree(keys, 5) == earlier_neighbors(keys, 5, block_size=32)
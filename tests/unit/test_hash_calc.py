@@ -1,7 +1,8 @@
 import hashlib
 from pathlib import Path
+from unittest.mock import patch
 
-from syno_photo_tidy.utils import hash_calc
+from syno_photo_tidy.utils import hash_calc, page_cache
 
 
 def test_compute_hashes(tmp_path: Path) -> None:
@@ -15,3 +16,43 @@ def test_compute_hashes(tmp_path: Path) -> None:
 
     assert hashes["md5"] == expected_md5
     assert hashes["sha256"] == expected_sha256
+
+
+def test_compute_hashes_with_page_cache_hints(tmp_path: Path) -> None:
+    sample_path = tmp_path / "sample.bin"
+    payload = b"x" * (3 * 1024 * 1024)
+    sample_path.write_bytes(payload)
+
+    with patch.object(page_cache, "advise_dontneed", wraps=page_cache.advise_dontneed) as dontneed:
+        hashes = hash_calc.compute_hashes(
+            sample_path,
+            ["sha256"],
+            chunk_size_kb=512,
+            drop_page_cache=True,
+        )
+
+    assert hashes["sha256"] == hashlib.sha256(payload).hexdigest()
+    assert dontneed.called
+
+
+def test_compute_hashes_reports_progress_mid_file(tmp_path: Path) -> None:
+    sample_path = tmp_path / "sample.bin"
+    total = 5 * 1024 * 1024
+    sample_path.write_bytes(b"y" * total)
+
+    for drop_page_cache in (False, True):
+        reported: list[int] = []
+        hash_calc.compute_hashes(
+            sample_path,
+            ["sha256"],
+            chunk_size_kb=64,
+            progress_callback=lambda done, size: reported.append(done),
+            bytes_update_threshold=1024 * 1024,
+            report_interval_sec=3600,
+            drop_page_cache=drop_page_cache,
+        )
+
+        assert len(reported) >= 4
+        assert all(0 < value < total for value in reported[:-1])
+        assert reported == sorted(set(reported))
+        assert reported[-1] == total
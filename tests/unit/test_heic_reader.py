@@ -0,0 +1,37 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from syno_photo_tidy.utils import heic_reader, image_utils
+
+
+@pytest.fixture()
+def heic_path(tmp_path: Path) -> Path:
+    pillow_heif = pytest.importorskip("pillow_heif")
+    piexif = pytest.importorskip("piexif")
+    pillow_heif.register_heif_opener()
+    path = tmp_path / "IMG_0001.HEIC"
+    exif = piexif.dump({"Exif": {piexif.ExifIFD.DateTimeOriginal: b"2023:01:02 03:04:05"}})
+    Image.effect_mandelbrot((640, 480), (-2, -1.5, 1, 1.5), 100).convert("RGB").save(
+        path, exif=exif, thumbnails=[160]
+    )
+    return path
+
+
+def test_read_image_metadata_heic_matches_generic_reader(heic_path: Path) -> None:
+    metadata = image_utils.read_image_metadata(heic_path)
+
+    assert metadata.resolution == (640, 480) == image_utils.get_image_resolution(heic_path)
+    assert metadata.exif_datetime_original == "2023:01:02 03:04:05"
+    assert metadata.exif_data == image_utils.get_exif_data_map(heic_path)
+
+
+def test_load_heic_thumbnail(heic_path: Path) -> None:
+    thumbnail = heic_reader.load_heic_thumbnail(heic_path)
+
+    assert thumbnail is not None
+    assert thumbnail.size == (160, 120)
+    assert heic_reader.load_heic_thumbnail(heic_path, min_size=200) is None
+    assert image_utils.load_hash_image(heic_path, source="exif_thumbnail").size == (160, 120)
+    assert image_utils.load_hash_image(heic_path).size == (640, 480)
@@ -0,0 +1,53 @@
+import threading
+import time
+from pathlib import Path
+
+from syno_photo_tidy.config import ConfigManager
+from syno_photo_tidy.utils.io_scheduler import IOScheduler
+
+
+def test_io_scheduler_device_limits(tmp_path: Path) -> None:
+    config = ConfigManager()
+    config.set("hash.parallel_workers", 3)
+    config.set("io.device_workers", {str(tmp_path): 2})
+
+    scheduler = IOScheduler.from_config(config)
+    device = scheduler.device_of(tmp_path / "photo.jpg")
+
+    assert device == tmp_path.stat().st_dev
+    assert scheduler.limit_for(device) == 2
+    assert scheduler.limit_for(None) == 3
+
+
+def test_io_scheduler_missing_destination_uses_parent_device(tmp_path: Path) -> None:
+    scheduler = IOScheduler(default_workers=1)
+
+    device = scheduler.device_of(tmp_path / "KEEP" / "2024" / "07" / "photo.jpg")
+
+    assert device == tmp_path.stat().st_dev
+
+
+def test_io_scheduler_slot_bounds_concurrency(tmp_path: Path) -> None:
+    scheduler = IOScheduler(default_workers=2)
+    target = tmp_path / "photo.jpg"
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def worker() -> None:
+        nonlocal active, peak
+        with scheduler.slot(target, tmp_path / "copy.jpg"):
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
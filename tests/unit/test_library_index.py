@@ -0,0 +1,60 @@
+import hashlib
+import os
+from pathlib import Path
+
+from syno_photo_tidy.utils.library_index import LibraryIndex
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_library_index_hashes_unhashed_entries_once(tmp_path: Path) -> None:
+    archived = tmp_path / "out" / "KEEP" / "2024" / "07" / "photo.jpg"
+    archived.parent.mkdir(parents=True)
+    archived.write_bytes(b"library-bytes")
+    other = archived.with_name("other.jpg")
+    other.write_bytes(b"other-bytesss")
+    calls: list[Path] = []
+
+    def compute(path: Path) -> str:
+        calls.append(path)
+        return _sha256(path)
+
+    with LibraryIndex(tmp_path / "library.sqlite") as index:
+        moves = [
+            (tmp_path / "in" / "photo.jpg", archived, None, True),
+            (tmp_path / "in" / "other.jpg", other, None, True),
+        ]
+        assert index.record_moves(moves) == 2
+        assert index.sizes() == {len(b"library-bytes")}
+
+        digest = _sha256(archived)
+        assert index.find(archived.stat().st_size, digest, compute) == archived
+        assert index.find(archived.stat().st_size, digest, compute) == archived
+        assert index.find(archived.stat().st_size, digest, compute, exclude=archived) is None
+        assert sorted(calls) == sorted([archived, other])
+
+        stat = archived.stat()
+        os.utime(archived, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert index.find(stat.st_size, digest, compute) is None
+        assert index.find(stat.st_size, _sha256(other), compute) == other
+
+
+def test_library_index_follows_files_moved_out_of_library(tmp_path: Path) -> None:
+    archived = tmp_path / "KEEP" / "photo.jpg"
+    archived.parent.mkdir()
+    archived.write_bytes(b"library-bytes")
+    renamed = archived.with_name("IMG_0001.jpg")
+    trashed = tmp_path / "TO_DELETE" / "IMG_0001.jpg"
+    trashed.parent.mkdir()
+
+    with LibraryIndex(tmp_path / "library.sqlite") as index:
+        index.record_moves([(tmp_path / "photo.jpg", archived, "abc", True)])
+        archived.rename(renamed)
+        assert index.record_moves([(archived, renamed, None, True)]) == 1
+        assert index.find(renamed.stat().st_size, "abc", _sha256) == renamed
+
+        renamed.rename(trashed)
+        assert index.record_moves([(renamed, trashed, None, False)]) == 1
+        assert index.sizes() == set()
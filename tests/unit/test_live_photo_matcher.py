@@ -68,3 +68,64 @@ def test_live_photo_pair_stable_result() -> None:
     assert [(p.image.path, p.video.path) for p in pairs1] == [
         (p.image.path, p.video.path) for p in pairs2
     ]
+
+
+def test_live_photo_sweep_matches_brute_force() -> None:
+    import random
+    from datetime import datetime, timedelta
+
+    rng = random.Random(9)
+    base = datetime(2024, 7, 15, 14, 0, 0)
+
+    def stamp() -> str:
+        return (base + timedelta(seconds=rng.randrange(600))).strftime("%Y-%m-%d %H:%M:%S")
+
+    files = [_make_file(Path(f"C:/A/IMG_{index:04d}.heic"), "IMAGE", ".heic", stamp()) for index in range(200)]
+    files += [_make_file(Path(f"C:/A/IMG_{index:04d}.mov"), "VIDEO", ".mov", stamp()) for index in range(120)]
+    files.append(_make_file(Path("C:/A/IMG_bad.mov"), "VIDEO", ".mov", "unknown"))
+
+    pairs = LivePhotoMatcher().find_live_pairs(files)
+
+    # 參考實作：全配對後依相同規則挑選
+    def parse(value: str):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            return None
+
+    candidates = []
+    for image in (item for item in files if item.file_type == "IMAGE"):
+        for video in (item for item in files if item.file_type == "VIDEO"):
+            image_time, video_time = parse(image.timestamp_locked), parse(video.timestamp_locked)
+            if video_time is not None and abs(image_time - video_time) <= timedelta(seconds=2):
+                diff = abs(image_time - video_time).total_seconds()
+                candidates.append((diff, image.path.stem, video.path.stem, str(image.path), str(video.path)))
+    candidates.sort()
+    expected = []
+    used_images: set[str] = set()
+    used_videos: set[str] = set()
+    for diff, _image_stem, _video_stem, image_path, video_path in candidates:
+        if image_path in used_images or video_path in used_videos:
+            continue
+        expected.append((image_path, video_path, diff))
+        used_images.add(image_path)
+        used_videos.add(video_path)
+
+    assert [(str(pair.image.path), str(pair.video.path), pair.time_diff_sec) for pair in pairs] == expected
+    assert len(expected) > 10
+
+
+def test_live_photo_pair_by_content_identifier_across_folders() -> None:
+    image = _make_file(Path("C:/A/IMG_0001.heic"), "IMAGE", ".heic", "2024-07-15 14:30:00")
+    video = _make_file(Path("C:/B/IMG_0001.mov"), "VIDEO", ".mov", "2024-07-15 14:30:00")
+    burst = _make_file(Path("C:/A/IMG_0002.heic"), "IMAGE", ".heic", "2024-07-15 14:30:00")
+    other_video = _make_file(Path("C:/A/IMG_0002.mov"), "VIDEO", ".mov", "2024-07-15 14:30:01")
+    image.content_identifier = video.content_identifier = "ID-1"
+    burst.content_identifier = "ID-2"
+    other_video.content_identifier = "ID-3"
+
+    pairs = LivePhotoMatcher().find_live_pairs([burst, other_video, image, video])
+
+    # 不同 ID 的檔案即使時間相近也不以時間配對
+    assert [(pair.image.path, pair.video.path) for pair in pairs] == [(image.path, video.path)]
+    assert burst.is_live_pair is False
@@ -21,6 +21,32 @@ def test_file_info_creation() -> None:
     assert data["resolution"] == [4000, 3000]
 
 
+def test_file_info_timestamp_epoch() -> None:
+    def make(timestamp: str) -> FileInfo:
+        return FileInfo(
+            path=Path("test.jpg"),
+            size_bytes=1,
+            ext=".jpg",
+            drive_letter="D:",
+            resolution=None,
+            exif_datetime_original=None,
+            windows_created_time=0.0,
+            timestamp_locked=timestamp,
+            timestamp_source="exif",
+            scan_machine_timezone="UTC+8",
+        )
+
+    valid = make("2024-07-15 14:30:00")
+    invalid = make("2024-02-30 00:00:00")
+
+    assert valid.timestamp_valid is True
+    assert valid.timestamp_epoch == 1721053800
+    assert valid.timestamp_datetime.strftime("%Y-%m-%d %H:%M:%S") == "2024-07-15 14:30:00"
+    assert invalid.timestamp_valid is False
+    assert invalid.timestamp_datetime is None
+    assert sorted([invalid, valid, make("1969-12-31 23:59:59")], key=lambda item: item.timestamp_sort_key)[-1] is invalid
+
+
 def test_action_item_serialization() -> None:
     action = ActionItem(
         action="MOVE",
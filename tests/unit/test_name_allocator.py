@@ -0,0 +1,37 @@
+import os
+import random
+from pathlib import Path
+
+from syno_photo_tidy.utils.dir_index import DirectoryIndex
+from syno_photo_tidy.utils.name_allocator import NameAllocator
+
+
+def _linear_allocate(directory: Path, filename: str, planned: set[str], src_path: Path) -> Path:
+    stem, suffix = Path(filename).stem, Path(filename).suffix
+    candidate = directory / filename
+    index = 0
+    while True:
+        same = os.path.normcase(str(candidate)) == os.path.normcase(str(src_path))
+        if os.path.normcase(candidate.name) not in planned and not (candidate.exists() and not same):
+            planned.add(os.path.normcase(candidate.name))
+            return candidate
+        index += 1
+        candidate = directory / f"{stem}_{index:03d}{suffix}"
+
+
+def test_name_allocator_matches_linear_probe(tmp_path: Path) -> None:
+    rng = random.Random(4)
+    existing = ["IMG_0001.jpg"] + [f"IMG_0001_{index:03d}.jpg" for index in rng.sample(range(1, 40), 15)]
+    existing += ["DSC_0002.jpg", "DSC_0002_002.jpg"]
+    for name in existing:
+        (tmp_path / name).write_text("x", encoding="utf-8")
+    sources = [tmp_path / name for name in existing] + [Path(f"/elsewhere/{index}.jpg") for index in range(30)]
+    rng.shuffle(sources)
+
+    allocator = NameAllocator(DirectoryIndex(), digits=3)
+    planned: set[str] = set()
+    expected_planned: set[str] = set()
+    for src_path in sources:
+        filename = rng.choice(["IMG_0001.jpg", "DSC_0002.jpg", "NEW.jpg"])
+        expected = _linear_allocate(tmp_path, filename, expected_planned, src_path)
+        assert allocator.allocate(tmp_path, filename, planned=planned, src_path=src_path) == expected
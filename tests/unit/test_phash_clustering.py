@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from syno_photo_tidy.utils.hamming_index import earlier_neighbors, earlier_neighbors_bktree
+from syno_photo_tidy.utils.phash_clustering import cluster, neighbor_graph
+
+
+def test_cluster_joins_chains() -> None:
+    keys = [0x0, 0x7, 0x3F, 0xFFFF_0000]
+    neighbors = earlier_neighbors_bktree(keys, 3)
+
+    assert cluster(keys, neighbors) == [[0, 1, 2], [3]]
+
+
+def test_cluster_respects_max_diameter() -> None:
+    keys = [0x0, 0x7, 0x3F]
+    neighbors = earlier_neighbors_bktree(keys, 3)
+
+    # 0 與 0x3F 相距 6，超過直徑上限時 0x3F 不併入
+    assert cluster(keys, neighbors, max_diameter=4) == [[0, 1], [2]]
+
+
+def test_neighbor_graph_is_stable_across_shards_and_workers() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(5)
+    keys = [rng.getrandbits(64) for _ in range(300)]
+    keys += [keys[index] ^ (1 << rng.randrange(64)) for index in range(0, 300, 3)]
+    rng.shuffle(keys)
+
+    expected = earlier_neighbors(keys, 4, block_size=64)
+    for shard_rows, workers in ((50, 1), (50, 4), (77, 3), (1000, 2)):
+        assert neighbor_graph(keys, 4, block_size=32, shard_rows=shard_rows, workers=workers) == expected
+    assert cluster(keys, expected, max_diameter=6) == cluster(keys, earlier_neighbors_bktree(keys, 4), max_diameter=6)
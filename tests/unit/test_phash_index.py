@@ -0,0 +1,42 @@
+import os
+from pathlib import Path
+
+from syno_photo_tidy.utils.phash_index import FileSignature, PhashIndex
+
+
+def test_phash_index_lookup_and_invalidation(tmp_path: Path) -> None:
+    photo = tmp_path / "photo.jpg"
+    photo.write_bytes(b"image-bytes")
+    signature = FileSignature.from_path(photo)
+    key = (1 << 63) + 12345
+
+    with PhashIndex(tmp_path / "index" / "phash.sqlite") as index:
+        index.store_many([(photo, signature, key)], "full:128")
+
+        assert index.lookup(signature, "full:128") == key
+        assert index.lookup(signature, "full:0") is None
+
+        stat = photo.stat()
+        os.utime(photo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert index.lookup(FileSignature.from_path(photo), "full:128") is None
+
+
+def test_phash_index_record_moves_marks_archived(tmp_path: Path) -> None:
+    source = tmp_path / "source" / "photo.jpg"
+    source.parent.mkdir()
+    source.write_bytes(b"image-bytes")
+    target = tmp_path / "out" / "KEEP" / "2024" / "photo.jpg"
+    target.parent.mkdir(parents=True)
+
+    with PhashIndex(tmp_path / "phash.sqlite") as index:
+        index.store_many([(source, FileSignature.from_path(source), 42)], "full:128")
+        assert index.archived_entries("full:128") == []
+
+        source.rename(target)
+        assert index.record_moves([(source, target, True)]) == 1
+
+        entries = index.archived_entries("full:128")
+        assert [(entry.path, entry.key) for entry in entries] == [(target, 42)]
+
+        target.unlink()
+        assert index.archived_entries("full:128") == []
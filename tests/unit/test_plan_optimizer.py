@@ -0,0 +1,121 @@
+from pathlib import Path
+
+from PIL import Image
+
+from syno_photo_tidy.config import ConfigManager
+from syno_photo_tidy.core import (
+    ManifestContext,
+    Pipeline,
+    PlanExecutor,
+    PlanOptimizer,
+    RollbackRunner,
+    append_manifest_entries,
+)
+from syno_photo_tidy.models import ActionItem
+from syno_photo_tidy.utils import reporting
+
+
+def _optimizer(enabled: bool = True) -> PlanOptimizer:
+    config = ConfigManager()
+    config.set("plan.fuse_moves", enabled)
+    return PlanOptimizer(config)
+
+
+def test_plan_optimizer_fuses_rename_then_archive() -> None:
+    original = Path("src/a.jpg")
+    renamed = Path("src/IMG_20240715_143000_0001.jpg")
+    archived = Path("out/KEEP/2024/07/IMG_20240715_143000_0001.jpg")
+    thumbnail = ActionItem(action="MOVE", reason="THUMBNAIL", src_path=Path("src/t.jpg"), dst_path=Path("out/t.jpg"))
+    groups = [
+        (
+            "Renaming",
+            [
+                ActionItem(
+                    action="RENAME",
+                    reason="RENAME",
+                    src_path=original,
+                    dst_path=renamed,
+                    new_name=renamed.name,
+                    rename_base=renamed.stem,
+                )
+            ],
+        ),
+        ("Archiving", [ActionItem(action="ARCHIVE", reason="ARCHIVE", src_path=renamed, dst_path=archived)]),
+        ("Moving", [thumbnail]),
+    ]
+
+    assert _optimizer(enabled=False).optimize(groups) is groups
+    optimized = _optimizer().optimize(groups)
+
+    assert [label for label, _ in optimized] == ["Renaming", "Archiving", "Moving"]
+    assert optimized[0][1] == []
+    fused = optimized[1][1][0]
+    assert (fused.action, fused.reason) == ("ARCHIVE", "ARCHIVE")
+    assert (fused.src_path, fused.dst_path) == (original, archived)
+    assert fused.new_name == renamed.name
+    assert fused.fused_from == ("RENAME", "ARCHIVE")
+    assert fused.via_paths == (renamed,)
+    assert optimized[2][1] == [thumbnail]
+
+
+def test_plan_optimizer_keeps_screenshot_move_as_move() -> None:
+    move_dst = Path("out/KEEP/Screenshots/2024-07/shot.png")
+    rename_dst = move_dst.with_name("IMG_20240715_143000_0001.png")
+    groups = [
+        (
+            "Moving",
+            [
+                ActionItem(action="MOVE", reason="SCREENSHOT", src_path=Path("src/shot.png"), dst_path=move_dst),
+                ActionItem(action="RENAME", reason="SCREENSHOT_RENAME", src_path=move_dst, dst_path=rename_dst),
+            ],
+        )
+    ]
+
+    (fused,) = _optimizer().optimize(groups)[0][1]
+
+    assert (fused.action, fused.reason) == ("MOVE", "SCREENSHOT")
+    assert (fused.src_path, fused.dst_path) == (Path("src/shot.png"), rename_dst)
+    assert fused.fused_from == ("SCREENSHOT", "SCREENSHOT_RENAME")
+
+
+def test_fused_plan_executes_and_rolls_back(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    image_path = source_dir / "photo.jpg"
+    Image.effect_noise((640, 480), 64).convert("RGB").save(image_path, "jpeg")
+    output_dir = tmp_path / "Processed_20260212_160000"
+
+    config = ConfigManager()
+    config.set("enable_rename", True)
+    config.set("plan.fuse_moves", True)
+    pipeline = Pipeline(config)
+    result = pipeline.run_dry_run(source_dir, output_dir, mode="Full Run (Dry-run)")
+
+    (fused,) = result.plan
+    assert fused.src_path == image_path
+    assert "KEEP" in fused.dst_path.parts
+    (planned,) = result.manifest_entries
+    assert planned.fused_from == "RENAME>ARCHIVE"
+    assert planned.via_path == str(fused.via_paths[0])
+
+    context = ManifestContext.from_run(
+        run_id=output_dir.name,
+        mode="Full Run",
+        source_dir=source_dir,
+        output_dir=output_dir,
+    )
+    manifest_path = reporting.write_manifest(result.report_dir, result.manifest_entries, context=context)
+    executed = []
+    for _, plan in result.plan_groups:
+        executed.extend(PlanExecutor(config=config).execute_plan(plan, manifest_path=manifest_path).executed_entries)
+
+    assert [entry.status for entry in executed] == ["MOVED"]
+    assert executed[0].fused_from == "RENAME>ARCHIVE"
+    assert fused.dst_path.exists() and not image_path.exists()
+    assert not fused.via_paths[0].exists()
+    append_manifest_entries(manifest_path, executed)
+
+    rollback = RollbackRunner().rollback(output_dir)
+
+    assert len(rollback.rolled_back) == 1
+    assert image_path.exists()
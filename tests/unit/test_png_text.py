@@ -0,0 +1,54 @@
+from pathlib import Path
+import zlib
+
+from PIL import Image, PngImagePlugin
+import pytest
+
+from syno_photo_tidy.utils.png_text import read_png_text
+
+
+def _chunk(chunk_type: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(chunk_type + data).to_bytes(4, "big")
+    return len(data).to_bytes(4, "big") + chunk_type + data + crc
+
+
+def test_read_png_text_matches_pil_info(tmp_path: Path) -> None:
+    path = tmp_path / "shot.png"
+    meta = PngImagePlugin.PngInfo()
+    meta.add_text("Description", "Screenshot capture")
+    meta.add_text("Software", "壓縮的說明", zip=True)
+    meta.add_itxt("XML:com.adobe.xmp", "<exif:UserComment>Screenshot</exif:UserComment>", zip=True)
+    meta.add_text("Comment", "plain", zip=True)
+    Image.new("RGB", (20, 20)).save(path, pnginfo=meta)
+
+    texts = read_png_text(path)
+
+    with Image.open(path) as image:
+        expected = {key: str(value) for key, value in image.info.items() if isinstance(value, str)}
+    assert texts == expected
+    assert texts["XML:com.adobe.xmp"] == "<exif:UserComment>Screenshot</exif:UserComment>"
+
+
+def test_read_png_text_stops_at_first_idat(tmp_path: Path) -> None:
+    source = tmp_path / "source.png"
+    Image.new("RGB", (4, 4)).save(source)
+    data = source.read_bytes()
+    idat = data.index(b"IDAT") - 4
+    path = tmp_path / "late_text.png"
+    path.write_bytes(
+        data[:idat]
+        + _chunk(b"tEXt", b"Title\x00before")
+        + data[idat:-12]
+        + _chunk(b"tEXt", b"Description\x00Screenshot")
+        + data[-12:]
+    )
+
+    assert read_png_text(path) == {"Title": "before"}
+
+
+def test_read_png_text_rejects_non_png(tmp_path: Path) -> None:
+    path = tmp_path / "fake.png"
+    path.write_bytes(b"GIF89a not a png")
+
+    with pytest.raises(ValueError):
+        read_png_text(path)
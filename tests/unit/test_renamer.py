@@ -110,3 +110,25 @@ def test_renamer_disabled_by_enable_rename(tmp_path: Path) -> None:
 
     assert result.plan == []
     assert len(result.skipped) == 1
+
+
+def test_renamer_sharded_plan_matches_single_worker(tmp_path: Path) -> None:
+    files = []
+    for folder_index in range(6):
+        folder = tmp_path / f"folder_{folder_index}"
+        folder.mkdir()
+        (folder / "IMG_20240715_143000_0001.jpg").write_text("existing", encoding="utf-8")
+        for file_index in range(5):
+            path = folder / f"photo_{file_index}.jpg"
+            path.write_text(f"{folder_index}-{file_index}", encoding="utf-8")
+            files.append(_make_file(path, f"2024-07-15 14:30:0{file_index % 2}"))
+
+    def plan(workers: int) -> list[tuple[Path, Path]]:
+        config = ConfigManager()
+        config.set("enable_rename", True)
+        config.set("plan.workers", workers)
+        return [(item.src_path, item.dst_path) for item in Renamer(config).generate_plan(files).plan]
+
+    single = plan(1)
+    assert len(single) == 30
+    assert plan(4) == single
@@ -5,7 +5,7 @@ from PIL import Image
 import piexif
 
 from syno_photo_tidy.config import ConfigManager
-from syno_photo_tidy.core import FileScanner
+from syno_photo_tidy.core import FileScanner, Pipeline
 
 
 def _create_image(path: Path, size=(100, 100), exif_dt: str | None = None) -> None:
@@ -72,3 +72,41 @@ def test_scanner_timestamp_locking(tmp_path: Path) -> None:
     assert len(results) == 1
     assert results[0].timestamp_source == "exif"
     assert results[0].timestamp_locked == "2024-07-15 14:30:00"
+
+
+def test_scanner_fast_classify_defers_thumbnail_metadata(tmp_path: Path) -> None:
+    _create_image(tmp_path / "thumb.jpg", size=(200, 150), exif_dt="2024:07:15 14:30:00")
+    _create_image(tmp_path / "photo.jpg", size=(1200, 900), exif_dt="2024:07:15 14:30:00")
+
+    config = ConfigManager()
+    config.set("thumbnail.fast_classify", True)
+    scanner = FileScanner(config)
+    results = {item.path.name: item for item in scanner.scan_directory(tmp_path)}
+
+    thumb = results["thumb.jpg"]
+    assert thumb.metadata_deferred is True
+    assert thumb.resolution == (200, 150)
+    assert thumb.exif_datetime_original is None
+    assert thumb.timestamp_source == "created_time"
+    assert results["photo.jpg"].metadata_deferred is False
+    assert results["photo.jpg"].timestamp_source == "exif"
+
+    scanner.load_deferred_metadata(thumb)
+
+    assert thumb.metadata_deferred is False
+    assert thumb.exif_datetime_original == "2024:07:15 14:30:00"
+    assert (thumb.timestamp_locked, thumb.timestamp_source) == ("2024-07-15 14:30:00", "exif")
+    assert thumb.timestamp_datetime is not None and thumb.timestamp_datetime.year == 2024
+
+
+def test_pipeline_manifest_uses_exif_timestamp_for_fast_classified_thumbnail(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    _create_image(source_dir / "thumb.jpg", size=(200, 150), exif_dt="2024:07:15 14:30:00")
+
+    config = ConfigManager()
+    config.set("thumbnail.fast_classify", True)
+    result = Pipeline(config).run_dry_run(source_dir, tmp_path / "Processed_20260212_160000", mode="Full Run (Dry-run)")
+
+    (entry,) = [entry for entry in result.manifest_entries if entry.reason == "THUMBNAIL"]
+    assert (entry.timestamp_locked, entry.timestamp_source) == ("2024-07-15 14:30:00", "exif")
@@ -65,3 +65,41 @@ def test_screenshot_detector_relaxed_filename(tmp_path: Path) -> None:
     assert is_screenshot is True
     assert evidence is not None
     assert "filename" in evidence
+
+
+def test_screenshot_detector_applies_config_on_prepare(tmp_path: Path) -> None:
+    file_path = tmp_path / "capture.png"
+    image = Image.new("RGB", (20, 20), color=(255, 255, 255))
+    meta = PngImagePlugin.PngInfo()
+    meta.add_itxt("XML:com.adobe.xmp", "<exif:UserComment>Bildschirmfoto</exif:UserComment>", zip=True)
+    image.save(file_path, pnginfo=meta)
+
+    config = ConfigManager()
+    detector = ScreenshotDetector(config)
+    assert detector.is_screenshot(_make_file(file_path, ".png")) == (False, None)
+
+    config.set("screenshot_metadata_keywords", ["screenshot", "BILDSCHIRMFOTO"])
+    assert detector.is_screenshot(_make_file(file_path, ".png")) == (False, None)
+
+    detector.prepare()
+    assert detector.is_screenshot(_make_file(file_path, ".png")) == (
+        True,
+        "metadata_keyword_match:bildschirmfoto",
+    )
+
+
+def test_screenshot_detector_reports_first_configured_keyword(tmp_path: Path) -> None:
+    file_path = tmp_path / "capture.png"
+    image = Image.new("RGB", (20, 20), color=(255, 255, 255))
+    meta = PngImagePlugin.PngInfo()
+    meta.add_text("Software", "Bildschirmfoto tool")
+    meta.add_text("Description", "Screenshot")
+    image.save(file_path, pnginfo=meta)
+
+    config = ConfigManager()
+    config.set("screenshot_metadata_keywords", ["screenshot", "bildschirmfoto"])
+
+    assert ScreenshotDetector(config).is_screenshot(_make_file(file_path, ".png")) == (
+        True,
+        "metadata_keyword_match:screenshot",
+    )
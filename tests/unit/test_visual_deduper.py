@@ -1,9 +1,15 @@
+import random
 from pathlib import Path
+from unittest.mock import patch
 
+import pytest
 from PIL import Image
 
 from syno_photo_tidy.config import ConfigManager
 from syno_photo_tidy.core import FileScanner, VisualDeduper
+from syno_photo_tidy.models import ManifestEntry
+from syno_photo_tidy.utils import CancellationToken, CancelledError, image_utils
+from syno_photo_tidy.utils.hamming_index import hash_to_int
 
 
 def _create_image(path: Path, size=(100, 100), color=(0, 128, 255)) -> None:
@@ -45,3 +51,317 @@ def test_visual_deduper_skip_video(tmp_path: Path) -> None:
     assert len(result.groups) == 0
     assert len(result.duplicates) == 0
     assert len(result.keepers) == 1
+
+
+def test_visual_deduper_joins_earliest_matching_group(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    hashes = {
+        "a.jpg": "0000000000000000",
+        "b.jpg": "00000000000000ff",
+        "c.jpg": "000000000000000f",
+    }
+    for name in hashes:
+        _create_image(source_dir / name)
+
+    config = ConfigManager()
+    config.set("phash.threshold", 4)
+    config.set("phash.workers", 1)
+    scanned = sorted(FileScanner(config).scan_directory(source_dir), key=lambda item: item.path.name)
+
+    with patch(
+        "syno_photo_tidy.core.visual_deduper.image_utils.compute_image_hash_value",
+        side_effect=lambda path, *_args: (int(hashes[Path(path).name], 16), None),
+    ):
+        result = VisualDeduper(config).dedupe(scanned)
+
+    # c 與 a、b 都在門檻內，依原本的貪婪規則加入較早建立的 a 群組
+    assert len(result.groups) == 1
+    assert sorted(item.path.name for item in [result.groups[0].keeper, *result.groups[0].duplicates]) == [
+        "a.jpg",
+        "c.jpg",
+    ]
+
+
+def test_visual_deduper_cascade_confirms_prefilter_candidates(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    hashes = {
+        "dhash": {"a.jpg": 0x0, "b.jpg": 0x3, "c.jpg": 0x7, "d.jpg": 0xFFFF_FFFF},
+        "phash": {"a.jpg": 0x0, "b.jpg": 0x1, "c.jpg": 0xFF00},
+    }
+    for name in hashes["dhash"]:
+        _create_image(source_dir / name)
+
+    config = ConfigManager()
+    config.set("phash.cascade", True)
+    config.set("phash.threshold", 4)
+    config.set("phash.prefilter_threshold", 4)
+    config.set("phash.workers", 1)
+    scanned = sorted(FileScanner(config).scan_directory(source_dir), key=lambda item: item.path.name)
+    computed: list[tuple[str, str]] = []
+
+    def fake_hash(path, _draft_size, _source, kind):
+        computed.append((kind, Path(path).name))
+        return hashes[kind][Path(path).name], None
+
+    with patch(
+        "syno_photo_tidy.core.visual_deduper.image_utils.compute_image_hash_value",
+        side_effect=fake_hash,
+    ):
+        result = VisualDeduper(config).dedupe(scanned)
+
+    # d 在 dhash 階段即被排除，不必計算 pHash；c 的 pHash 與 a、b 差距過大
+    assert ("phash", "d.jpg") not in computed
+    assert [item.path.name for item in result.duplicates] == ["b.jpg"]
+    assert result.cascade_stats == {
+        "images": 4,
+        "pairs": 6,
+        "dhash_eliminated": 3,
+        "candidate_pairs": 3,
+        "phash_computed": 3,
+        "phash_eliminated": 2,
+        "confirmed_pairs": 1,
+    }
+
+
+def test_visual_deduper_union_find_is_order_independent(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    hashes = {"a.jpg": 0x0, "b.jpg": 0x7, "c.jpg": 0x3F, "d.jpg": 0xFFFF_0000}
+    for name in hashes:
+        _create_image(source_dir / name)
+
+    config = ConfigManager()
+    config.set("phash.threshold", 3)
+    config.set("phash.clustering", "union_find")
+    config.set("phash.workers", 1)
+    scanned = FileScanner(config).scan_directory(source_dir)
+
+    outcomes = []
+    with patch(
+        "syno_photo_tidy.core.visual_deduper.image_utils.compute_image_hash_value",
+        side_effect=lambda path, *_args: (hashes[Path(path).name], None),
+    ):
+        for reverse in (False, True):
+            ordered = sorted(scanned, key=lambda item: item.path.name, reverse=reverse)
+            result = VisualDeduper(config).dedupe(ordered)
+            outcomes.append(
+                [
+                    sorted(item.path.name for item in [group.keeper, *group.duplicates])
+                    for group in result.groups
+                ]
+            )
+
+    # a~b、b~c 串成一群，與輸入順序無關
+    assert outcomes[0] == outcomes[1] == [["a.jpg", "b.jpg", "c.jpg"]]
+
+
+def test_visual_deduper_engines_agree() -> None:
+    rng = random.Random(3)
+    keys = [rng.getrandbits(64) for _ in range(200)]
+    keys += [keys[index] ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for index in range(0, 200, 2)]
+    rng.shuffle(keys)
+
+    results = {}
+    for engine in ("numpy", "bktree"):
+        config = ConfigManager()
+        config.set("phash.engine", engine)
+        config.set("phash.block_size", 32)
+        results[engine] = VisualDeduper(config)._assign_groups(keys)
+
+    assert results["numpy"] == results["bktree"]
+    assert any(len(group) > 1 for group in results["numpy"])
+
+
+def test_visual_deduper_process_pool_matches_serial(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    _create_image(source_dir / "img_a.jpg")
+    _create_image(source_dir / "img_b.jpg")
+    _create_image(source_dir / "img_c.jpg", color=(255, 255, 0))
+    Image.new("RGB", (100, 100)).save(source_dir / "img_d.jpg", "jpeg")
+    (source_dir / "broken.jpg").write_bytes(b"not-an-image")
+
+    results = {}
+    for workers in (1, 2):
+        config = ConfigManager()
+        config.set("phash.workers", workers)
+        scanned = sorted(FileScanner(config).scan_directory(source_dir), key=lambda item: item.path.name)
+        progress: list[int] = []
+        result = VisualDeduper(config).dedupe(scanned, progress_callback=progress.append)
+        results[workers] = [
+            (group.hash_value, group.keeper.path.name, sorted(item.path.name for item in group.duplicates))
+            for group in result.groups
+        ]
+        assert progress[-1] == 5
+
+    assert results[1] == results[2]
+    assert results[1]
+
+
+def test_visual_deduper_cancel(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    _create_image(source_dir / "img_a.jpg")
+    _create_image(source_dir / "img_b.jpg")
+    token = CancellationToken()
+    token.set()
+
+    config = ConfigManager()
+    config.set("phash.workers", 2)
+    scanned = FileScanner(config).scan_directory(source_dir)
+
+    with pytest.raises(CancelledError):
+        VisualDeduper(config).dedupe(scanned, cancel_token=token)
+
+
+def test_draft_decode_reduces_size_and_keeps_hash_close(tmp_path: Path) -> None:
+    path = tmp_path / "large.jpg"
+    image = Image.linear_gradient("L").resize((2048, 1536)).convert("RGB")
+    image.save(path, "jpeg", quality=90)
+
+    draft = image_utils.load_hash_image(path, 128)
+    assert draft.mode == "L"
+    assert 128 <= min(draft.size) < 1536
+
+    config = ConfigManager()
+    config.set("phash.verify_sample", 1)
+    deduper = VisualDeduper(config)
+    scanned = FileScanner(config).scan_directory(tmp_path)
+    key = hash_to_int(image_utils.compute_phash(path, draft_size=128))
+    distances = deduper.measure_source_drift([(scanned[0], key)])
+
+    assert len(distances) == 1
+    assert distances[0] <= config.get("phash.threshold") // 2
+
+
+def _save_with_thumbnail(path: Path, image: Image.Image, thumbnail: Image.Image) -> None:
+    import io
+
+    import piexif
+
+    buffer = io.BytesIO()
+    thumbnail.resize((160, 120)).save(buffer, "jpeg")
+    exif = piexif.dump({"0th": {}, "Exif": {}, "1st": {piexif.ImageIFD.Compression: 6}, "thumbnail": buffer.getvalue()})
+    image.save(path, "jpeg", exif=exif)
+
+
+def test_read_exif_thumbnail(tmp_path: Path) -> None:
+    with_thumbnail = tmp_path / "with.jpg"
+    without_thumbnail = tmp_path / "without.jpg"
+    image = Image.linear_gradient("L").convert("RGB")
+    _save_with_thumbnail(with_thumbnail, image, image)
+    image.save(without_thumbnail, "jpeg")
+
+    thumbnail = image_utils.read_exif_thumbnail(with_thumbnail)
+
+    assert thumbnail is not None and thumbnail.startswith(b"\xff\xd8")
+    assert image_utils.read_exif_thumbnail(without_thumbnail) is None
+    assert image_utils.load_hash_image(with_thumbnail, source="exif_thumbnail").size == (160, 120)
+
+
+def test_visual_deduper_exif_thumbnail_source_falls_back_on_drift(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    original = Image.effect_mandelbrot((320, 240), (-2.0, -1.5, 1.0, 1.5), 50).convert("RGB")
+    # 兩張不同的原圖帶著相同（且與原圖不符）的內嵌縮圖
+    _save_with_thumbnail(source_dir / "a.jpg", original, Image.new("RGB", (160, 120), (255, 255, 255)))
+    _save_with_thumbnail(
+        source_dir / "b.jpg",
+        original.transpose(Image.Transpose.ROTATE_180),
+        Image.new("RGB", (160, 120), (255, 255, 255)),
+    )
+
+    config = ConfigManager()
+    config.set("phash.workers", 1)
+    config.set("phash.source", "exif_thumbnail")
+    scanned = FileScanner(config).scan_directory(source_dir)
+    assert len(VisualDeduper(config).dedupe(scanned).groups) == 1
+
+    config.set("phash.verify_sample", 2)
+    assert len(VisualDeduper(config).dedupe(scanned).groups) == 0
+
+
+def test_visual_deduper_index_reuses_hashes_and_matches_archive(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    image = Image.effect_mandelbrot((320, 240), (-2.0, -1.5, 1.0, 1.5), 50).convert("RGB")
+    image.save(source_dir / "a.jpg", "jpeg")
+
+    config = ConfigManager()
+    config.set("phash.workers", 1)
+    config.set("phash.index_path", str(tmp_path / "phash.sqlite"))
+    config.set("phash.match_archive", True)
+    deduper = VisualDeduper(config)
+    deduper.dedupe(FileScanner(config).scan_directory(source_dir))
+
+    with patch(
+        "syno_photo_tidy.core.visual_deduper.image_utils.compute_image_hash_value",
+        wraps=image_utils.compute_image_hash_value,
+    ) as compute:
+        deduper.dedupe(FileScanner(config).scan_directory(source_dir))
+    compute.assert_not_called()
+
+    archived = tmp_path / "out" / "KEEP" / "a.jpg"
+    archived.parent.mkdir(parents=True)
+    (source_dir / "a.jpg").rename(archived)
+    deduper.record_moves(
+        [ManifestEntry(action="ARCHIVE", src_path=str(source_dir / "a.jpg"), dst_path=str(archived), status="MOVED")],
+        tmp_path / "out",
+    )
+    # 與封存影像同解析度但檔案較小，封存影像勝出
+    image.save(source_dir / "a_copy.jpg", "jpeg", quality=40)
+
+    result = deduper.dedupe(FileScanner(config).scan_directory(source_dir))
+
+    assert [match.reference_path for match in result.archive_matches] == [archived]
+    assert [item.path.name for item in result.duplicates] == ["a_copy.jpg"]
+    assert result.keepers == []
+
+
+def test_visual_deduper_keeps_new_file_better_than_archive(tmp_path: Path) -> None:
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    image = Image.effect_mandelbrot((640, 480), (-2.0, -1.5, 1.0, 1.5), 50).convert("RGB")
+    archived = tmp_path / "out" / "KEEP" / "a.jpg"
+    archived.parent.mkdir(parents=True)
+    image.resize((320, 240)).save(source_dir / "a.jpg", "jpeg")
+
+    config = ConfigManager()
+    config.set("phash.workers", 1)
+    config.set("phash.index_path", str(tmp_path / "phash.sqlite"))
+    config.set("phash.match_archive", True)
+    deduper = VisualDeduper(config)
+    deduper.dedupe(FileScanner(config).scan_directory(source_dir))
+    (source_dir / "a.jpg").rename(archived)
+    deduper.record_moves(
+        [ManifestEntry(action="ARCHIVE", src_path=str(source_dir / "a.jpg"), dst_path=str(archived), status="MOVED")],
+        tmp_path / "out",
+    )
+    image.save(source_dir / "a_large.jpg", "jpeg")
+
+    result = deduper.dedupe(FileScanner(config).scan_directory(source_dir))
+
+    (match,) = result.archive_matches
+    assert match.reference_path == archived
+    assert match.supersedes
+    assert result.duplicates == []
+    assert [item.path.name for item in result.keepers] == ["a_large.jpg"]
+
+
+def test_visual_deduper_time_window_strategy() -> None:
+    config = ConfigManager()
+    config.set("phash.candidate_strategy", "time_window")
+    config.set("phash.time_window_sec", 600)
+    config.set("phash.validate_strategy", True)
+    deduper = VisualDeduper(config)
+    keys = [0x0, 0x1, 0x0, 0x3, 0xFFFF]
+    times = [1000, 1300, 1000 + 86400, None, 1000]
+
+    groups = deduper._assign_groups_time_window(keys, times)
+
+    # 相隔一天的相同 hash 不比較；時間未知的檔案與所有群組比較
+    assert groups == [[0, 1, 3], [2], [4]]
+    summary = deduper._validate_against_exhaustive(groups, keys)
+    assert "僅完整比對歸入群組的檔案 1 個" in summary